@@ -0,0 +1,13 @@
+from django.urls import path
+
+from . import async_views
+
+# Included ahead of impalawebsite.urls by website/asgi_urls.py; everything not
+# listed here (forms, writes, the rest of the API) resolves to the sync views.
+urlpatterns = [
+    path('', async_views.home, name='landing_page'),
+    path('list-articles/', async_views.article_list, name='article_list'),
+    path('<int:pk>/', async_views.article_detail, name='article_detail'),
+    path('api/articles/', async_views.api_article_list, name='article-list'),
+    path('api/articles/<int:pk>/', async_views.api_article_detail, name='article-detail'),
+]
@@ -0,0 +1,138 @@
+"""
+Async twins of the read-heavy views, routed by ``website/asgi_urls.py``.
+
+Under ASGI a synchronous view holds a worker thread for as long as it waits on
+SQLite; these load their data through the async ORM instead. Writes are left
+to the synchronous views: the API endpoints below hand anything but GET/HEAD
+straight to ``ArticleViewSet``.
+"""
+from asgiref.sync import sync_to_async
+from django.http import HttpResponse, JsonResponse
+from django.shortcuts import aget_object_or_404, render
+from django.views.decorators.csrf import csrf_exempt
+from rest_framework.exceptions import APIException, ValidationError
+from rest_framework.renderers import JSONRenderer
+
+from .caching import aresolve_user, cached_page, with_page_versions
+from .conditional import conditional_response
+from .models import Article
+from .pagination import akeyset_page
+from .views import (
+    ArticleViewSet,
+    _api_detail_validators,
+    _api_list_validators,
+    _article_cards,
+    _html_detail_validators,
+    _html_list_validators,
+)
+
+READ_METHODS = ('GET', 'HEAD')
+
+_viewset_list = ArticleViewSet.as_view({'get': 'list', 'post': 'create'})
+_viewset_detail = ArticleViewSet.as_view(
+    {'get': 'retrieve', 'put': 'update', 'patch': 'partial_update', 'delete': 'destroy'}
+)
+
+
+# =====================================================
+# 🌍 PAGES
+# =====================================================
+@cached_page('home')
+async def home(request):
+    await aresolve_user(request)
+    return render(request, 'landing/landing.html')
+
+
+@conditional_response(_html_list_validators)
+@cached_page('article_list')
+async def article_list(request):
+    await aresolve_user(request)
+    keyword = request.GET.get('keyword', '').strip()
+    articles, next_cursor = await akeyset_page(_article_cards(request), request.GET.get('cursor'))
+    return render(request, 'articles/article_list.html', {
+        'articles': await sync_to_async(with_page_versions)(articles),
+        'keyword': keyword,
+        'next_cursor': next_cursor,
+        'is_first_page': not request.GET.get('cursor'),
+    })
+
+
+@conditional_response(_html_detail_validators)
+@cached_page('article_detail')
+async def article_detail(request, pk):
+    await aresolve_user(request)
+    article = await aget_object_or_404(Article.objects.select_related('author', 'cover_renditions'), pk=pk)
+    return render(request, 'articles/article_detail.html', {'article': article})
+
+
+# =====================================================
+# 📰 ARTICLE API (reads)
+# =====================================================
+def _json(data, status=200):
+    return HttpResponse(JSONRenderer().render(data), status=status, content_type='application/json')
+
+
+def _viewset(request, action, **kwargs):
+    """
+    An ``ArticleViewSet`` set up for ``request`` as its ``dispatch()`` would (DRF
+    authenticators, parsers and negotiator), so queryset, serializer, paginator
+    and ``request.user`` match the sync API.
+    """
+    view = ArticleViewSet(action_map={'get': action, 'head': action}, format_kwarg=None, args=(), kwargs=kwargs)
+    view.request = view.initialize_request(request, **kwargs)
+    view.headers = view.default_response_headers
+    return view
+
+
+def _initial(view):
+    """Authenticate, check permissions and throttle as ``dispatch()`` does; the error response, or None."""
+    try:
+        view.initial(view.request, **view.kwargs)
+    except APIException as exc:
+        return view.finalize_response(view.request, view.handle_exception(exc)).render()
+    return None
+
+
+@conditional_response(_api_list_validators)
+async def _api_list(request):
+    view = _viewset(request, 'list')
+    if (error := await sync_to_async(_initial)(view)) is not None:
+        return error
+    try:
+        queryset = view.get_queryset()
+    except ValidationError as exc:
+        return _json(exc.detail, status=400)
+    # One thread hop for the page query (and its keyword prefetch); the cursor format is DRF's.
+    page = await sync_to_async(view.paginator.paginate_queryset)(queryset, view.request, view=view)
+    serializer = view.get_serializer(page, many=True)
+    return _json(view.paginator.get_paginated_response(serializer.data).data)
+
+
+@conditional_response(_api_detail_validators)
+async def _api_detail(request, pk):
+    view = _viewset(request, 'retrieve', pk=pk)
+    if (error := await sync_to_async(_initial)(view)) is not None:
+        return error
+    try:
+        queryset = view.get_queryset()
+    except ValidationError as exc:
+        return _json(exc.detail, status=400)
+    try:
+        article = await queryset.aget(pk=pk)
+    except Article.DoesNotExist:
+        return JsonResponse({"detail": "No Article matches the given query."}, status=404)
+    return _json(view.get_serializer(article).data)
+
+
+@csrf_exempt
+async def api_article_list(request):
+    if request.method not in READ_METHODS:
+        return await sync_to_async(_viewset_list)(request)
+    return await _api_list(request)
+
+
+@csrf_exempt
+async def api_article_detail(request, pk):
+    if request.method not in READ_METHODS:
+        return await sync_to_async(_viewset_detail)(request, pk=pk)
+    return await _api_detail(request, pk)
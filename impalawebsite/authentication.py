@@ -0,0 +1,108 @@
+"""
+Cached user, token and Basic-auth lookups, so an authenticated request on a
+warm cache costs no queries and no password hash.
+
+Cached users are dropped whenever the user row is saved or deleted (which
+covers password changes, ``last_login`` updates and deactivation) and on
+logout; cached tokens are dropped when the token is deleted. Writes that
+bypass ``save()`` (``QuerySet.update``) are picked up after AUTH_CACHE_TIMEOUT.
+Nothing is cached while AUTH_CACHE_ALIAS is a per-process LocMemCache (see
+``caching.shared_cache``).
+"""
+import hashlib
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.backends import ModelBackend
+from django.utils.crypto import salted_hmac
+from django.utils.translation import gettext_lazy as _
+from rest_framework import authentication, exceptions
+
+from .caching import shared_cache
+
+
+def auth_cache():
+    return shared_cache(getattr(settings, 'AUTH_CACHE_ALIAS', 'default'))
+
+
+def _timeout():
+    return getattr(settings, 'AUTH_CACHE_TIMEOUT', 300)
+
+
+def _user_key(user_id):
+    return f'auth:user:{user_id}'
+
+
+def _token_key(key):
+    return f'auth:token:{hashlib.sha256(key.encode()).hexdigest()}'
+
+
+def cached_user(user_id):
+    """The user with primary key ``user_id`` (active or not), or ``None``."""
+    cache = auth_cache()
+    user = cache.get(_user_key(user_id))
+    if user is None:
+        user = get_user_model()._default_manager.filter(pk=user_id).first()
+        if user is not None:
+            cache.set(_user_key(user_id), user, _timeout())
+    return user
+
+
+def forget_user(user_id):
+    auth_cache().delete(_user_key(user_id))
+
+
+def forget_token(key):
+    auth_cache().delete(_token_key(key))
+
+
+class CachedModelBackend(ModelBackend):
+    """ModelBackend whose per-request session user lookup is served from the cache."""
+
+    def get_user(self, user_id):
+        user = cached_user(user_id)
+        return user if user is not None and self.user_can_authenticate(user) else None
+
+    async def aget_user(self, user_id):
+        return await sync_to_async(self.get_user)(user_id)
+
+
+class CachedTokenAuthentication(authentication.TokenAuthentication):
+    def authenticate_credentials(self, key):
+        cache = auth_cache()
+        user_id = cache.get(_token_key(key))
+        if user_id is None:
+            user_id = self.get_model().objects.filter(key=key).values_list('user_id', flat=True).first()
+            if user_id is None:
+                raise exceptions.AuthenticationFailed(_('Invalid token.'))
+            cache.set(_token_key(key), user_id, _timeout())
+
+        user = cached_user(user_id)
+        if user is None or not user.is_active:
+            raise exceptions.AuthenticationFailed(_('User inactive or deleted.'))
+        # request.auth stays a Token, as with TokenAuthentication; it is not re-read from the database.
+        return (user, self.get_model()(key=key, user=user))
+
+
+class CachedBasicAuthentication(authentication.BasicAuthentication):
+    """
+    BasicAuthentication that remembers a successful check instead of running
+    the password hasher on every request. The entry is keyed by an HMAC of the
+    credentials and holds the password hash it was verified against, so it
+    stops matching as soon as the password changes.
+    """
+
+    def authenticate_credentials(self, userid, password, request=None):
+        cache = auth_cache()
+        key = 'auth:basic:' + salted_hmac(__name__, f'{userid}\0{password}').hexdigest()
+        verified = cache.get(key)
+        if verified is not None:
+            user_id, password_hash = verified
+            user = cached_user(user_id)
+            if user is not None and user.is_active and user.password == password_hash:
+                return (user, None)
+
+        user, auth = super().authenticate_credentials(userid, password, request)
+        cache.set(key, (user.pk, user.password), _timeout())
+        return (user, auth)
@@ -0,0 +1,82 @@
+from django.conf import settings
+from django.db import transaction
+
+from . import prerender
+from .caching import invalidate_articles
+from .keywords import link_new_articles
+from .models import Article, ContactMessage
+from .rendering import render_article_body
+from .search import index_articles
+from .signals import articles_bulk_created, contacts_bulk_created
+from .subscribers import subscribe_contacts
+
+
+def bulk_batch_size():
+    return getattr(settings, 'BULK_CREATE_BATCH_SIZE', 500)
+
+
+def bulk_max_rows():
+    return getattr(settings, 'BULK_CREATE_MAX_ROWS', 5000)
+
+
+class BulkPayloadError(ValueError):
+    pass
+
+
+def validate_rows(serializer_class, rows, context, skip_invalid=False):
+    """
+    Validate ``rows`` with ``many=True``.
+
+    Returns ``(valid, errors)``: ``valid`` is ``[(index, validated_data)]`` and
+    ``errors`` is ``[{'index': i, 'errors': {...}}]``. Unless ``skip_invalid``
+    is set, any error leaves ``valid`` empty so nothing is inserted.
+    """
+    if not isinstance(rows, list):
+        raise BulkPayloadError("Expected a JSON list of objects.")
+    if len(rows) > bulk_max_rows():
+        raise BulkPayloadError(f"At most {bulk_max_rows()} rows per request.")
+
+    serializer = serializer_class(data=rows, many=True, context=context)
+    if serializer.is_valid():
+        return list(enumerate(serializer.validated_data)), []
+
+    row_errors = serializer.errors
+    # Older DRF returns one (possibly empty) dict per row, newer only the failing rows by index.
+    pairs = row_errors.items() if isinstance(row_errors, dict) else enumerate(row_errors)
+    errors = [{'index': index, 'errors': detail} for index, detail in sorted(pairs) if detail]
+    if not skip_invalid:
+        return [], errors
+    failed = {error['index'] for error in errors}
+    indexes = [index for index in range(len(rows)) if index not in failed]
+    serializer = serializer_class(data=[rows[index] for index in indexes], many=True, context=context)
+    serializer.is_valid(raise_exception=True)
+    return list(zip(indexes, serializer.validated_data)), errors
+
+
+@transaction.atomic
+def create_articles(validated_rows, author, notify=True):
+    """
+    Insert articles with chunked ``bulk_create`` and do in bulk what ``save()`` and
+    the ``post_save`` receivers do per row: render bodies, link keywords, index
+    for search, invalidate cached pages and queue pre-rendering. Subscribers get one digest email
+    through ``articles_bulk_created`` instead of one email per article.
+    """
+    articles = [render_article_body(Article(author=author, **data)) for data in validated_rows]
+    Article.objects.bulk_create(articles, batch_size=bulk_batch_size())
+    link_new_articles(articles)
+    index_articles(articles)
+    invalidate_articles(article.pk for article in articles)
+    prerender.queue([article.pk for article in articles], 0, shifted=True)
+    if notify:
+        transaction.on_commit(lambda: articles_bulk_created.send(sender=Article, articles=articles))
+    return articles
+
+
+@transaction.atomic
+def create_contacts(validated_rows, notify=True):
+    contacts = [ContactMessage(**data) for data in validated_rows]
+    ContactMessage.objects.bulk_create(contacts, batch_size=bulk_batch_size())
+    subscribe_contacts(contacts)
+    if notify:
+        transaction.on_commit(lambda: contacts_bulk_created.send(sender=ContactMessage, contacts=contacts))
+    return contacts
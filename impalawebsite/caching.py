@@ -0,0 +1,194 @@
+import hashlib
+import re
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.http import HttpResponse
+from django.middleware.csrf import get_token
+
+PAGE_CACHE_ALIAS = 'pages'
+NAMESPACES = ('home', 'article_list', 'article_detail', 'feeds', 'sitemap')
+
+# The footer renders {% csrf_token %}; cached copies keep a placeholder that is
+# swapped for the visitor's own token on every hit.
+_CSRF_INPUT_RE = re.compile(r'(name="csrfmiddlewaretoken" value=")[^"]*(")')
+CSRF_PLACEHOLDER = '__impala_csrf_token__'
+
+_GENERATION_KEY = 'pages:generation'
+_LIST_VERSION_KEY = 'pages:articles:list'
+
+
+def without_csrf_token(html):
+    """``html`` with the CSRF token of the request that rendered it replaced by CSRF_PLACEHOLDER."""
+    return _CSRF_INPUT_RE.sub(rf'\g<1>{CSRF_PLACEHOLDER}\g<2>', html)
+
+
+def shared_cache(alias):
+    """
+    ``caches[alias]`` for state that every worker must drop at once (sessions,
+    users, tokens). A LocMemCache is private to one process, so a logout or
+    password change would only reach the worker that handled it; a DummyCache
+    is returned instead and callers fall back to the database every time.
+    """
+    cache = caches[alias]
+    return DummyCache(alias, {}) if isinstance(cache, LocMemCache) else cache
+
+
+def page_cache():
+    return caches[PAGE_CACHE_ALIAS]
+
+
+def page_timeout():
+    return getattr(settings, 'PAGE_CACHE_TIMEOUT', 60 * 60)
+
+
+def _article_version_key(pk):
+    return f'pages:article:{pk}'
+
+
+def _bump(*keys):
+    cache = page_cache()
+    for key in keys:
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, 2, None)
+
+
+def invalidate_article(pk):
+    """Drop the detail page of ``pk`` and every article listing (list view, home)."""
+    _bump(_article_version_key(pk), _LIST_VERSION_KEY)
+
+
+def invalidate_articles(pks):
+    """Bulk variant of :func:`invalidate_article` for batch updates that skip signals."""
+    pks = list(pks)
+    if pks:
+        _bump(*[_article_version_key(pk) for pk in pks], _LIST_VERSION_KEY)
+
+
+def invalidate_all():
+    _bump(_GENERATION_KEY)
+
+
+def _record(namespace, outcome):
+    _bump(f'pages:stats:{namespace}:{outcome}')
+
+
+def stats():
+    """``{namespace: {'hits', 'misses', 'hit_ratio'}}`` for the monitoring endpoint."""
+    keys = [f'pages:stats:{ns}:{outcome}' for ns in NAMESPACES for outcome in ('hit', 'miss')]
+    values = page_cache().get_many(keys)
+    report = {}
+    for namespace in NAMESPACES:
+        # Counters start at 2 on first bump (see _bump), so subtract the offset.
+        hits = max(0, values.get(f'pages:stats:{namespace}:hit', 1) - 1)
+        misses = max(0, values.get(f'pages:stats:{namespace}:miss', 1) - 1)
+        total = hits + misses
+        report[namespace] = {'hits': hits, 'misses': misses, 'hit_ratio': hits / total if total else None}
+    return report
+
+
+def version_token(pk=None):
+    """Current cache version of article ``pk``'s pages, or of the listings when ``pk`` is None."""
+    version_keys = [_GENERATION_KEY, _LIST_VERSION_KEY if pk is None else _article_version_key(pk)]
+    versions = page_cache().get_many(version_keys)
+    return '.'.join(str(versions.get(key, 1)) for key in version_keys)
+
+
+def with_page_versions(articles):
+    """
+    Set ``article.page_version`` (see :func:`version_token`) on each article with
+    one cache round trip; card fragments are keyed on it because re-rendering
+    bodies updates excerpts without touching ``updated_at``.
+    """
+    keys = {article.pk: _article_version_key(article.pk) for article in articles}
+    versions = page_cache().get_many([_GENERATION_KEY, *keys.values()])
+    generation = versions.get(_GENERATION_KEY, 1)
+    for article in articles:
+        article.page_version = f'{generation}.{versions.get(keys[article.pk], 1)}'
+    return articles
+
+
+def page_variant(request):
+    # Authors see edit/delete buttons, so each signed-in user gets their own copy.
+    return f'u{request.user.pk}' if request.user.is_authenticated else 'anon'
+
+
+async def aresolve_user(request):
+    """
+    Load the user through the async ORM and pin it on ``request.user``, so the
+    synchronous code an async view still runs (templates, validators) never
+    queries from the event loop.
+    """
+    request.user = await request.auser()
+    return request.user
+
+
+def _page_key(namespace, request, pk):
+    path = hashlib.md5(request.get_full_path().encode()).hexdigest()
+    return f'pages:{namespace}:{version_token(pk)}:{page_variant(request)}:{path}'
+
+
+def _lookup(namespace, request, pk):
+    """``(key, (content, content_type) or None)`` for this request; counts the hit or miss."""
+    key = _page_key(namespace, request, pk)
+    cached = page_cache().get(key)
+    _record(namespace, 'miss' if cached is None else 'hit')
+    return key, cached
+
+
+def _hit(request, cached):
+    content, content_type = cached
+    if CSRF_PLACEHOLDER in content:  # get_token() sets the CSRF cookie; feeds and sitemaps need none
+        content = content.replace(CSRF_PLACEHOLDER, get_token(request))
+    response = HttpResponse(content, content_type=content_type)
+    response['X-Page-Cache'] = 'hit'
+    return response
+
+
+def _store(key, response):
+    if response.status_code == 200 and not response.streaming and not response.cookies:
+        content = without_csrf_token(response.content.decode(response.charset))
+        page_cache().set(key, (content, response['Content-Type']), page_timeout())
+    response['X-Page-Cache'] = 'miss'
+    return response
+
+
+def cached_page(namespace):
+    """
+    Cache a GET view's HTML until an article it shows changes.
+
+    Detail pages are keyed on the ``pk`` URL argument and listings on a shared
+    list version; the signal handlers in ``signals.py`` bump those versions.
+    Async views get an async wrapper that does the lookup and the store in one
+    thread hop each.
+    """
+    def decorator(view):
+        if iscoroutinefunction(view):
+            @wraps(view)
+            async def async_wrapper(request, *args, **kwargs):
+                if request.method != 'GET':
+                    return await view(request, *args, **kwargs)
+                await aresolve_user(request)
+                key, cached = await sync_to_async(_lookup)(namespace, request, kwargs.get('pk'))
+                if cached is not None:
+                    return _hit(request, cached)
+                response = await view(request, *args, **kwargs)
+                return await sync_to_async(_store)(key, response)
+            return async_wrapper
+
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if request.method != 'GET':
+                return view(request, *args, **kwargs)
+            key, cached = _lookup(namespace, request, kwargs.get('pk'))
+            if cached is not None:
+                return _hit(request, cached)
+            return _store(key, view(request, *args, **kwargs))
+        return wrapper
+    return decorator
@@ -0,0 +1,106 @@
+import hashlib
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction, sync_to_async
+from django.conf import settings
+from django.db.models import Count, Max
+from django.utils.cache import get_conditional_response, patch_cache_control, patch_vary_headers
+from django.utils.http import http_date, quote_etag
+
+from .caching import aresolve_user, page_variant, version_token
+from .models import Article
+
+
+def cache_control_policy(request):
+    """``Cache-Control`` directives for article responses; everything revalidates via ETag."""
+    policy = dict(getattr(settings, 'ARTICLE_CACHE_CONTROL', {'no_cache': True}))
+    if request.user.is_authenticated:
+        policy['private'] = True
+    else:
+        policy['public'] = True
+    return policy
+
+
+def _etag(*parts):
+    return quote_etag(hashlib.md5(':'.join(str(part) for part in parts).encode()).hexdigest())
+
+
+def article_validators(request, pk, representation, per_user=False):
+    """
+    ``(etag, last_modified)`` of one article from a single ``updated_at`` lookup.
+
+    The page-cache version is mixed in because re-rendering bodies and finishing
+    cover renditions change the output without touching ``updated_at``.
+    """
+    rows = Article.objects.filter(pk=pk).order_by().values_list('updated_at', flat=True)[:1]
+    if not rows:
+        return None, None
+    updated_at = rows[0]
+    variant = page_variant(request) if per_user else ''
+    etag = _etag(representation, request.get_full_path(), updated_at.isoformat(), version_token(pk), variant)
+    return etag, updated_at
+
+
+def collection_validators(request, queryset, representation, per_user=False):
+    """
+    ``(etag, last_modified)`` of a listing: newest ``updated_at`` plus the row count,
+    so deletions also produce a new ETag.
+    """
+    summary = queryset.order_by().aggregate(latest=Max('updated_at'), count=Count('pk'))
+    variant = page_variant(request) if per_user else ''
+    etag = _etag(
+        representation, request.get_full_path(), summary['latest'] and summary['latest'].isoformat(),
+        summary['count'], version_token(), variant,
+    )
+    return etag, summary['latest']
+
+
+def _finalize(request, response, etag, timestamp):
+    if response.status_code not in (200, 304):
+        return response
+    if etag and not response.has_header('ETag'):
+        response['ETag'] = etag
+    if timestamp and not response.has_header('Last-Modified'):
+        response['Last-Modified'] = http_date(timestamp)
+    patch_cache_control(response, **cache_control_policy(request))
+    patch_vary_headers(response, ('Cookie', 'Authorization'))
+    return response
+
+
+def conditional_response(validators):
+    """
+    Answer ``If-None-Match``/``If-Modified-Since`` with 304 before the view runs.
+
+    ``validators(request, *args, **kwargs)`` returns ``(etag, last_modified)``;
+    either may be None. Unlike ``django.views.decorators.http.condition`` it is
+    called once, so both validators come from the same query. For async views
+    the validators run in a single ``sync_to_async`` hop.
+    """
+    def decorator(view):
+        if iscoroutinefunction(view):
+            @wraps(view)
+            async def async_wrapper(request, *args, **kwargs):
+                if request.method not in ('GET', 'HEAD'):
+                    return await view(request, *args, **kwargs)
+                await aresolve_user(request)
+                etag, last_modified = await sync_to_async(validators)(request, *args, **kwargs)
+                timestamp = int(last_modified.timestamp()) if last_modified else None
+                response = get_conditional_response(request, etag=etag, last_modified=timestamp)
+                if response is None:
+                    response = await view(request, *args, **kwargs)
+                return _finalize(request, response, etag, timestamp)
+            return async_wrapper
+
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if request.method not in ('GET', 'HEAD'):
+                return view(request, *args, **kwargs)
+
+            etag, last_modified = validators(request, *args, **kwargs)
+            timestamp = int(last_modified.timestamp()) if last_modified else None
+            response = get_conditional_response(request, etag=etag, last_modified=timestamp)
+            if response is None:
+                response = view(request, *args, **kwargs)
+            return _finalize(request, response, etag, timestamp)
+        return wrapper
+    return decorator
@@ -0,0 +1,19 @@
+"""SQLite connection tuning, applied to every new connection from ``signals.py``."""
+from django.conf import settings
+
+
+def pragma_statements(alias=None):
+    """``PRAGMA`` statements for a new connection to ``alias`` (SQLITE_PRAGMAS)."""
+    pragmas = dict(getattr(settings, 'SQLITE_PRAGMAS', {}))
+    if alias is not None and alias == getattr(settings, 'DATABASE_READ_REPLICA', None):
+        # Only the replication tool may write to the replica; a stray write would make it diverge.
+        pragmas['query_only'] = 'ON'
+    return [f'PRAGMA {name} = {value}' for name, value in pragmas.items()]
+
+
+def tune_connection(connection):
+    if connection.vendor != 'sqlite':
+        return
+    with connection.cursor() as cursor:
+        for statement in pragma_statements(connection.alias):
+            cursor.execute(statement)
@@ -0,0 +1,130 @@
+import csv
+import datetime
+import json
+
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+
+from .models import ContactMessage
+
+CONTACT_FIELDS = ('id', 'name', 'email', 'phone', 'message', 'consent_email_updates', 'submitted_at')
+DEFAULT_CHUNK_SIZE = 2000
+
+TRUE_VALUES = {'1', 'true', 'yes'}
+FALSE_VALUES = {'0', 'false', 'no'}
+
+# Spreadsheet apps evaluate cells starting with these characters as formulas.
+_FORMULA_PREFIXES = ('=', '+', '-', '@', '\t', '\r')
+
+
+def parse_moment(value):
+    """Accept an ISO datetime or a bare date (midnight in the current time zone)."""
+    moment = parse_datetime(value)
+    if moment is None:
+        day = parse_date(value)
+        if day is None:
+            raise ValueError(f"Not an ISO date or datetime: {value!r}")
+        moment = datetime.datetime.combine(day, datetime.time.min)
+    if timezone.is_naive(moment):
+        moment = timezone.make_aware(moment)
+    return moment
+
+
+def parse_consent(value):
+    value = value.strip().lower()
+    if value in TRUE_VALUES:
+        return True
+    if value in FALSE_VALUES:
+        return False
+    raise ValueError(f"consent must be true or false, not {value!r}")
+
+
+def contact_queryset(since=None, until=None, consent=None):
+    """Contacts submitted in ``[since, until)``, optionally only (non-)consenting ones."""
+    queryset = ContactMessage.objects.order_by('pk')
+    if since is not None:
+        queryset = queryset.filter(submitted_at__gte=since)
+    if until is not None:
+        queryset = queryset.filter(submitted_at__lt=until)
+    if consent is not None:
+        queryset = queryset.filter(consent_email_updates=consent)
+    return queryset
+
+
+def filters_from_params(params):
+    """``since``/``until``/``consent`` query parameters -> ``contact_queryset`` kwargs."""
+    filters = {}
+    for name in ('since', 'until'):
+        if params.get(name):
+            filters[name] = parse_moment(params[name])
+    if params.get('consent'):
+        filters['consent'] = parse_consent(params['consent'])
+    return filters
+
+
+def _rows(queryset, chunk_size):
+    # values_list + iterator(): rows are fetched chunk by chunk and never become model instances.
+    return queryset.values_list(*CONTACT_FIELDS).iterator(chunk_size=chunk_size)
+
+
+def _plain(value):
+    if isinstance(value, datetime.datetime):
+        return value.isoformat()
+    return value
+
+
+def _csv_text(value):
+    return "'" + value if value.startswith(_FORMULA_PREFIXES) else value
+
+
+def _csv_row(row):
+    # Unrolled for CONTACT_FIELDS: this runs once per exported row.
+    pk, name, email, phone, message, consent, submitted_at = row
+    return (
+        pk, _csv_text(name), _csv_text(email), _csv_text(phone), _csv_text(message),
+        'true' if consent else 'false', submitted_at.isoformat(),
+    )
+
+
+class _Echo:
+    """csv.writer target that hands each formatted line straight back."""
+
+    def write(self, value):
+        return value
+
+
+def _chunked(lines, chunk_size):
+    buffer = []
+    for line in lines:
+        buffer.append(line)
+        if len(buffer) >= chunk_size:
+            yield ''.join(buffer)
+            buffer = []
+    if buffer:
+        yield ''.join(buffer)
+
+
+def contacts_csv(queryset, chunk_size=DEFAULT_CHUNK_SIZE):
+    writer = csv.writer(_Echo())
+    yield writer.writerow(CONTACT_FIELDS)
+    yield from _chunked(
+        (writer.writerow(_csv_row(row)) for row in _rows(queryset, chunk_size)),
+        chunk_size,
+    )
+
+
+def contacts_ndjson(queryset, chunk_size=DEFAULT_CHUNK_SIZE):
+    yield from _chunked(
+        (
+            json.dumps(dict(zip(CONTACT_FIELDS, map(_plain, row))), ensure_ascii=False) + '\n'
+            for row in _rows(queryset, chunk_size)
+        ),
+        chunk_size,
+    )
+
+
+# format name -> (generator, content type, file extension)
+FORMATS = {
+    'csv': (contacts_csv, 'text/csv; charset=utf-8', 'csv'),
+    'ndjson': (contacts_ndjson, 'application/x-ndjson; charset=utf-8', 'ndjson'),
+}
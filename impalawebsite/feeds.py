@@ -0,0 +1,128 @@
+"""
+RSS/Atom feeds and the XML sitemap for articles.
+
+Views wrap these builders in ``cached_page`` and ``conditional_response``
+like the article list: a document is built once per listing version (bumped
+by every article save or delete), every other request is a cache read, and a
+revalidation is a 304 from one aggregate query.
+
+Builders read only the columns they print. Feeds use ``excerpt``, never the
+body, of the newest FEED_ITEMS articles; the sitemap streams
+``(pk, updated_at)`` rows with ``iterator()``. Past SITEMAP_LIMIT articles
+``/sitemap.xml`` becomes a sitemap index of ``/sitemap-<n>.xml`` sections,
+each with at most that many URLs.
+"""
+import math
+
+from django.conf import settings
+from django.urls import reverse
+from django.utils.feedgenerator import Atom1Feed, Rss201rev2Feed
+from django.utils.xmlutils import SimplerXMLGenerator
+
+from .models import Article
+
+SITEMAP_NS = 'http://www.sitemaps.org/schemas/sitemap/0.9'
+FEED_TYPES = {'rss': Rss201rev2Feed, 'atom': Atom1Feed}
+STREAM_CHUNK = 2000
+STATIC_PAGES = ('landing_page', 'article_list')  # listed in /sitemap.xml or its first section
+
+
+def site_url():
+    return getattr(settings, 'SITE_URL', 'http://127.0.0.1:8000')
+
+
+def feed_items():
+    return getattr(settings, 'FEED_ITEMS', 20)
+
+
+def sitemap_limit():
+    # The sitemap protocol allows at most 50,000 URLs per file.
+    return min(getattr(settings, 'SITEMAP_LIMIT', 50_000), 50_000)
+
+
+def _per_section():
+    return sitemap_limit() - len(STATIC_PAGES)
+
+
+def article_url(pk):
+    return site_url() + reverse('article_detail', args=[pk])
+
+
+def build_feed(kind, output):
+    """Write the ``kind`` ('rss' or 'atom') feed of the newest articles to ``output``."""
+    feed = FEED_TYPES[kind](
+        title="Impala Health Tech Research articles",
+        link=site_url() + reverse('article_list'),
+        description="New articles from Impala Health Tech Research Limited.",
+        feed_url=site_url() + reverse(f'feed_{kind}'),
+        language='en',
+    )
+    articles = (
+        Article.objects.select_related('author')
+        .only('title', 'excerpt', 'created_at', 'updated_at', 'author__first_name', 'author__surname')
+        .order_by('-created_at', '-pk')[:feed_items()]
+    )
+    for article in articles:
+        link = article_url(article.pk)
+        feed.add_item(
+            title=article.title,
+            link=link,
+            description=article.excerpt,
+            unique_id=link,
+            unique_id_is_permalink=True,
+            pubdate=article.created_at,
+            updateddate=article.updated_at,
+            author_name=f"{article.author.first_name} {article.author.surname}".strip(),
+        )
+    feed.write(output, 'utf-8')
+
+
+def sitemap_sections():
+    """Number of ``/sitemap-<n>.xml`` files; 0 means ``/sitemap.xml`` lists every URL itself."""
+    count = Article.objects.count()
+    return 0 if count <= _per_section() else math.ceil(count / _per_section())
+
+
+def build_sitemap(output, section=None):
+    """
+    Write ``/sitemap.xml`` (``section`` None) or ``/sitemap-<section>.xml`` to
+    ``output``. Returns False if that section does not exist.
+    """
+    limit, sections = _per_section(), sitemap_sections()
+    if section is not None and not 1 <= section <= sections:
+        return False
+    rows = Article.objects.order_by('pk').values_list('pk', 'updated_at')
+    xml = SimplerXMLGenerator(output, 'utf-8')
+    xml.startDocument()
+
+    if section is None and sections:
+        xml.startElement('sitemapindex', {'xmlns': SITEMAP_NS})
+        lastmods = []
+        for index, updated_at in enumerate(rows.values_list('updated_at', flat=True).iterator(STREAM_CHUNK)):
+            if index % limit == 0:
+                lastmods.append(updated_at)
+            lastmods[-1] = max(lastmods[-1], updated_at)
+        for number, lastmod in enumerate(lastmods, start=1):
+            xml.startElement('sitemap', {})
+            xml.addQuickElement('loc', site_url() + reverse('sitemap_section', args=[number]))
+            xml.addQuickElement('lastmod', lastmod.isoformat())
+            xml.endElement('sitemap')
+        xml.endElement('sitemapindex')
+        return True
+
+    if section is not None:
+        rows = rows[(section - 1) * limit:section * limit]
+
+    xml.startElement('urlset', {'xmlns': SITEMAP_NS})
+    if section in (None, 1):
+        for name in STATIC_PAGES:
+            xml.startElement('url', {})
+            xml.addQuickElement('loc', site_url() + reverse(name))
+            xml.endElement('url')
+    for pk, updated_at in rows.iterator(STREAM_CHUNK):
+        xml.startElement('url', {})
+        xml.addQuickElement('loc', article_url(pk))
+        xml.addQuickElement('lastmod', updated_at.isoformat())
+        xml.endElement('url')
+    xml.endElement('urlset')
+    return True
@@ -18,6 +18,18 @@ ALLOWED_ATTRIBUTES = {
     'source': ['src', 'type']
 }
 
+def clean_html(value):
+    """
+    Clean HTML using bleach compatible with bleach 6+.
+    """
+    return bleach.clean(
+        value,
+        tags=ALLOWED_TAGS,
+        attributes=ALLOWED_ATTRIBUTES,
+        strip=True
+    )
+
+
 class SafeSummernoteField(models.TextField):
     """
     A TextField that uses Summernote in forms and cleans HTML safely with bleach 6+.
@@ -28,12 +40,4 @@ class SafeSummernoteField(models.TextField):
         return super().formfield(**defaults)
 
     def clean_html(self, value):
-        """
-        Clean HTML using bleach compatible with bleach 6+.
-        """
-        return bleach.clean(
-            value,
-            tags=ALLOWED_TAGS,
-            attributes=ALLOWED_ATTRIBUTES,
-            strip=True
-        )
+        return clean_html(value)
@@ -0,0 +1,209 @@
+import io
+import logging
+import re
+from urllib.parse import unquote, urlsplit
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.utils import timezone
+from django.utils.html import escape
+from PIL import Image, ImageOps, UnidentifiedImageError
+
+from .models import ImageRenditionSet
+from .storage import file_sha256
+
+logger = logging.getLogger(__name__)
+
+RENDITION_ROOT = 'renditions'
+
+# Pillow format name and MIME type for each rendition extension.
+FORMATS = {
+    'webp': ('WEBP', 'image/webp'),
+    'jpg': ('JPEG', 'image/jpeg'),
+}
+
+
+def rendition_widths():
+    return sorted(getattr(settings, 'IMAGE_RENDITION_WIDTHS', [320, 640, 960, 1280]))
+
+
+def rendition_quality():
+    return getattr(settings, 'IMAGE_RENDITION_QUALITY', 80)
+
+
+def rendition_name(source_hash, width, ext):
+    return f"{RENDITION_ROOT}/{source_hash[:2]}/{source_hash}/{width}.{ext}"
+
+
+def rendition_url(source_hash, width, ext):
+    return default_storage.url(rendition_name(source_hash, width, ext))
+
+
+def enqueue(source):
+    """Register a stored image for processing; cheap enough to call from a request or signal."""
+    if not source:
+        return None
+    renditions, _ = ImageRenditionSet.objects.get_or_create(source=source)
+    return renditions
+
+
+def _flatten(image):
+    """JPEG has no alpha channel; composite transparent images onto white."""
+    if image.mode in ('RGBA', 'LA') or (image.mode == 'P' and 'transparency' in image.info):
+        image = image.convert('RGBA')
+        background = Image.new('RGB', image.size, (255, 255, 255))
+        background.paste(image, mask=image.getchannel('A'))
+        return background
+    return image.convert('RGB')
+
+
+def _target_widths(original_width):
+    widths = [w for w in rendition_widths() if w < original_width]
+    if len(widths) < len(rendition_widths()):
+        # Narrower than the largest configured size: its own width becomes the
+        # top rendition, so small images still get a WebP copy but are never upscaled.
+        widths.append(original_width)
+    return widths
+
+
+def generate(renditions):
+    """
+    Produce the WebP/JPEG renditions for one ImageRenditionSet.
+
+    Files are keyed by the source's SHA-256, so re-uploads of the same picture
+    reuse the renditions already on disk instead of resizing again.
+    """
+    with default_storage.open(renditions.source, 'rb') as fp:
+        source_hash = file_sha256(fp)
+        twin = (
+            ImageRenditionSet.objects
+            .filter(source_hash=source_hash, status=ImageRenditionSet.Status.READY)
+            .exclude(pk=renditions.pk)
+            .first()
+        )
+        if twin is not None:
+            renditions.width, renditions.height, renditions.widths = twin.width, twin.height, twin.widths
+        else:
+            fp.seek(0)
+            with Image.open(fp) as image:
+                image = ImageOps.exif_transpose(image)
+                renditions.width, renditions.height = image.size
+                renditions.widths = _write_renditions(image, source_hash)
+
+    renditions.source_hash = source_hash
+    renditions.status = ImageRenditionSet.Status.READY
+    renditions.error = ''
+    renditions.processed_at = timezone.now()
+    renditions.save()
+    return renditions
+
+
+def _write_renditions(image, source_hash):
+    widths = _target_widths(image.width)
+    for width in widths:
+        height = max(1, round(image.height * width / image.width))
+        resized = image.resize((width, height), Image.LANCZOS) if width != image.width else image
+        for ext, (pil_format, _) in FORMATS.items():
+            name = rendition_name(source_hash, width, ext)
+            if default_storage.exists(name):
+                continue
+            if pil_format == 'JPEG':
+                frame = _flatten(resized)
+            else:
+                frame = resized if resized.mode in ('RGB', 'RGBA') else resized.convert('RGBA')
+            buffer = io.BytesIO()
+            frame.save(buffer, pil_format, quality=rendition_quality(), optimize=True)
+            default_storage.save(name, ContentFile(buffer.getvalue()))
+    return widths
+
+
+def process_pending(limit=None):
+    """Generate renditions for queued images; returns ``(ready, failed)`` counts."""
+    queryset = ImageRenditionSet.objects.filter(status=ImageRenditionSet.Status.PENDING).order_by('pk')
+    if limit:
+        queryset = queryset[:limit]
+    ready = failed = 0
+    for renditions in queryset:
+        try:
+            generate(renditions)
+            ready += 1
+        except (OSError, UnidentifiedImageError, Image.DecompressionBombError) as exc:
+            logger.warning("Could not render %s: %s", renditions.source, exc)
+            renditions.status = ImageRenditionSet.Status.FAILED
+            renditions.error = f"{type(exc).__name__}: {exc}"
+            renditions.processed_at = timezone.now()
+            renditions.save(update_fields=['status', 'error', 'processed_at'])
+            failed += 1
+    return ready, failed
+
+
+def candidates(renditions):
+    """Return ``{ext: [(url, width), ...]}`` for a READY set, else ``{}``."""
+    if renditions is None or renditions.status != ImageRenditionSet.Status.READY:
+        return {}
+    return {
+        ext: [(rendition_url(renditions.source_hash, w, ext), w) for w in renditions.widths]
+        for ext in FORMATS
+    }
+
+
+def srcsets(renditions):
+    """Return ``{ext: "url 320w, url 640w"}`` ready for a ``srcset`` attribute."""
+    return {
+        ext: ", ".join(f"{url} {width}w" for url, width in urls)
+        for ext, urls in candidates(renditions).items()
+    }
+
+
+_IMG_TAG_RE = re.compile(r'<img\b[^>]*>', re.IGNORECASE)
+_SRC_RE = re.compile(r'\ssrc\s*=\s*(["\'])(.*?)\1', re.IGNORECASE | re.DOTALL)
+
+
+def _storage_name(url):
+    media_url = settings.MEDIA_URL
+    path = urlsplit(url).path
+    if media_url and path.startswith(media_url):
+        return unquote(path[len(media_url):])
+    return None
+
+
+def add_srcset_to_html(html, sizes='(max-width: 768px) 100vw, 768px'):
+    """
+    Give every ``<img>`` pointing at a processed upload a WebP ``srcset`` and lazy loading.
+
+    One query resolves all images in the document; images that are external or
+    not processed yet only get ``loading="lazy"``.
+    """
+    if not html or '<img' not in html.lower():
+        return html
+    tags = _IMG_TAG_RE.findall(html)
+    names = {}
+    for tag in tags:
+        match = _SRC_RE.search(tag)
+        if match and _storage_name(match.group(2)):
+            names[match.group(2)] = _storage_name(match.group(2))
+    ready = {
+        renditions.source: renditions
+        for renditions in ImageRenditionSet.objects.filter(
+            source__in=set(names.values()), status=ImageRenditionSet.Status.READY
+        )
+    } if names else {}
+
+    def rewrite(match):
+        tag = match.group(0)
+        lowered = tag.lower()
+        extra = []
+        src = _SRC_RE.search(tag)
+        renditions = ready.get(names.get(src.group(2))) if src else None
+        if renditions is not None and 'srcset' not in lowered:
+            extra.append(f'srcset="{escape(srcsets(renditions)["webp"])}"')
+            extra.append(f'sizes="{escape(sizes)}"')
+        if 'loading=' not in lowered:
+            extra.append('loading="lazy"')
+        if not extra:
+            return tag
+        end = -2 if tag.endswith('/>') else -1
+        return f"{tag[:end].rstrip()} {' '.join(extra)}{tag[end:]}"
+
+    return _IMG_TAG_RE.sub(rewrite, html)
@@ -0,0 +1,176 @@
+"""
+Per-request timing: SQL query count and time, template render time and total
+time, reported on the ``impalawebsite.performance`` logger and in a
+``Server-Timing`` header (for superusers, or everyone with PERF_SERVER_TIMING).
+
+The numbers for the request being served live in a ContextVar, which asgiref
+copies into ``sync_to_async`` threads, so async views are measured too. Every
+database connection gets ``record_query`` as an execute wrapper when it is
+opened (see ``signals.py``); outside a tracked request it only reads the
+ContextVar, which keeps the instrumentation cheap enough to leave on.
+"""
+import json
+import logging
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.template import TemplateDoesNotExist
+from django.template.backends.django import DjangoTemplates, Template, reraise
+
+logger = logging.getLogger('impalawebsite.performance')
+
+_current = ContextVar('request_metrics', default=None)
+
+
+@dataclass
+class RequestMetrics:
+    started: float = field(default_factory=time.perf_counter)
+    queries: list = field(default_factory=list)  # [(sql, milliseconds)]
+    db_ms: float = 0.0
+    template_ms: float = 0.0
+    total_ms: float = 0.0
+    rendering: int = 0  # template nesting depth, so includes rendered through the backend count once
+
+    def duplicate_queries(self, threshold=None):
+        """``{sql: count}`` for statements run at least ``threshold`` times: the N+1 pattern."""
+        if threshold is None:
+            threshold = getattr(settings, 'PERF_N_PLUS_ONE_THRESHOLD', 5)
+        counts = Counter(sql for sql, _ in self.queries)
+        return {sql: count for sql, count in counts.items() if count >= threshold}
+
+    def server_timing(self):
+        return (
+            f'db;dur={self.db_ms:.1f};desc="{len(self.queries)} queries", '
+            f'tpl;dur={self.template_ms:.1f}, total;dur={self.total_ms:.1f}'
+        )
+
+
+@contextmanager
+def track():
+    """Collect ``RequestMetrics`` for everything run inside the block."""
+    metrics = RequestMetrics()
+    token = _current.set(metrics)
+    try:
+        yield metrics
+    finally:
+        metrics.total_ms = (time.perf_counter() - metrics.started) * 1000
+        _current.reset(token)
+
+
+def record_query(execute, sql, params, many, context):
+    metrics = _current.get()
+    if metrics is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        elapsed = (time.perf_counter() - started) * 1000
+        metrics.db_ms += elapsed
+        metrics.queries.append((sql, elapsed))
+
+
+def instrument_connection(connection):
+    # connection_created fires again whenever a wrapper reconnects (CONN_MAX_AGE).
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_query)
+
+
+class TimedTemplate(Template):
+    def render(self, context=None, request=None):
+        metrics = _current.get()
+        if metrics is None:
+            return super().render(context, request)
+        metrics.rendering += 1
+        started = time.perf_counter()
+        try:
+            return super().render(context, request)
+        finally:
+            metrics.rendering -= 1
+            if not metrics.rendering:
+                metrics.template_ms += (time.perf_counter() - started) * 1000
+
+
+class TimedDjangoTemplates(DjangoTemplates):
+    """The Django template backend, with render time added to the request's metrics."""
+
+    def from_string(self, template_code):
+        return TimedTemplate(self.engine.from_string(template_code), self)
+
+    def get_template(self, template_name):
+        try:
+            return TimedTemplate(self.engine.get_template(template_name), self)
+        except TemplateDoesNotExist as exc:
+            reraise(exc, self)
+
+
+class PerformanceMiddleware:
+    """
+    Put first in MIDDLEWARE so the total covers the other middleware. Times
+    stop when the response is returned; a streaming body is not included.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        with track() as metrics:
+            response = self.get_response(request)
+        self.report(request, response, metrics)
+        return response
+
+    async def __acall__(self, request):
+        with track() as metrics:
+            response = await self.get_response(request)
+        self.report(request, response, metrics)
+        return response
+
+    @staticmethod
+    def is_superuser(request):
+        # Only a user the request already loaded: no query, and safe in async views.
+        user = getattr(request, '_cached_user', None)
+        return bool(user and user.is_superuser)
+
+    def report(self, request, response, metrics):
+        if getattr(settings, 'PERF_SERVER_TIMING', False) or self.is_superuser(request):
+            response['Server-Timing'] = metrics.server_timing()
+
+        duplicates = metrics.duplicate_queries()
+        record = {
+            'method': request.method,
+            'path': request.path,
+            'status': response.status_code,
+            'total_ms': round(metrics.total_ms, 1),
+            'db_ms': round(metrics.db_ms, 1),
+            'template_ms': round(metrics.template_ms, 1),
+            'queries': len(metrics.queries),
+            'duplicate_queries': sum(duplicates.values()),
+        }
+        if logger.isEnabledFor(logging.INFO):  # off by default; skip the json.dumps on every request
+            logger.info("request %s", json.dumps(record), extra={'performance': record})
+
+        for sql, count in duplicates.items():
+            logger.warning(
+                "Possible N+1 on %s %s: %d identical queries: %s", request.method, request.path, count, sql,
+                extra={'performance': record},
+            )
+        if metrics.total_ms >= getattr(settings, 'PERF_SLOW_REQUEST_MS', 1000):
+            slowest = sorted(metrics.queries, key=lambda query: query[1], reverse=True)[:10]
+            logger.warning(
+                "Slow request %s %s: %.0fms (%d queries, %.0fms in the database)\n%s",
+                request.method, request.path, metrics.total_ms, len(metrics.queries), metrics.db_ms,
+                "\n".join(f"  {ms:8.1f}ms  {sql}" for sql, ms in slowest),
+                extra={'performance': record},
+            )
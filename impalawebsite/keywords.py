@@ -0,0 +1,77 @@
+from collections import Counter, defaultdict
+
+from django.db import transaction
+from django.db.models import F
+
+from .models import ArticleKeyword, Keyword
+
+
+def get_or_create_keywords(names):
+    """Return ``{slug: Keyword}`` for ``names``, creating missing rows in one INSERT."""
+    wanted = {Keyword.make_slug(name): name for name in names}
+    existing = Keyword.objects.in_bulk(list(wanted), field_name='slug')
+    missing = [Keyword(name=name, slug=slug) for slug, name in wanted.items() if slug not in existing]
+    if missing:
+        Keyword.objects.bulk_create(missing, ignore_conflicts=True)
+        existing = Keyword.objects.in_bulk(list(wanted), field_name='slug')
+    return existing
+
+
+@transaction.atomic
+def sync_article_keywords(article):
+    """
+    Bring ``article``'s ArticleKeyword rows in line with its ``keywords`` string.
+
+    Only the difference is written, and ``Keyword.article_count`` is adjusted
+    with ``F()`` updates for the keywords that were actually added or removed.
+    """
+    names = Keyword.parse(article.keywords)
+    keywords = get_or_create_keywords(names)
+    wanted = {keywords[Keyword.make_slug(name)].pk: position for position, name in enumerate(names)}
+
+    current = dict(
+        ArticleKeyword.objects.filter(article=article).values_list('keyword_id', 'position')
+    )
+    removed = set(current) - set(wanted)
+    added = set(wanted) - set(current)
+    moved = [pk for pk in set(wanted) & set(current) if wanted[pk] != current[pk]]
+
+    if removed:
+        ArticleKeyword.objects.filter(article=article, keyword_id__in=removed).delete()
+        Keyword.objects.filter(pk__in=removed).update(article_count=F('article_count') - 1)
+    if added:
+        ArticleKeyword.objects.bulk_create([
+            ArticleKeyword(article=article, keyword_id=pk, position=wanted[pk]) for pk in added
+        ])
+        Keyword.objects.filter(pk__in=added).update(article_count=F('article_count') + 1)
+    for pk in moved:
+        ArticleKeyword.objects.filter(article=article, keyword_id=pk).update(position=wanted[pk])
+
+
+@transaction.atomic
+def link_new_articles(articles):
+    """
+    Bulk counterpart of ``sync_article_keywords`` for freshly inserted articles.
+
+    One INSERT for all links and one ``F()`` update per distinct count delta.
+    """
+    parsed = {article.pk: Keyword.parse(article.keywords) for article in articles}
+    keywords = get_or_create_keywords({name for names in parsed.values() for name in names})
+    links, counts = [], Counter()
+    for pk, names in parsed.items():
+        for position, name in enumerate(names):
+            keyword = keywords[Keyword.make_slug(name)]
+            links.append(ArticleKeyword(article_id=pk, keyword=keyword, position=position))
+            counts[keyword.pk] += 1
+    ArticleKeyword.objects.bulk_create(links, batch_size=500)
+
+    by_delta = defaultdict(list)
+    for pk, delta in counts.items():
+        by_delta[delta].append(pk)
+    for delta, pks in by_delta.items():
+        Keyword.objects.filter(pk__in=pks).update(article_count=F('article_count') + delta)
+
+
+def release_article_keywords(article):
+    """Decrement counts for an article that is about to be deleted (links cascade)."""
+    Keyword.objects.filter(article_links__article=article).update(article_count=F('article_count') - 1)
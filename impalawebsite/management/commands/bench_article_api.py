@@ -0,0 +1,76 @@
+import gzip
+import random
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from impalawebsite.models import Article, CustomUser, ImageRenditionSet
+from impalawebsite.seeding import VOCABULARY
+from impalawebsite.serializers import ArticleListSerializer, ArticleSerializer
+
+from .bench_search import percentile
+
+
+def synthetic_articles(rng, count, paragraphs):
+    author = CustomUser(pk=1, email="author@example.com", first_name="Bench", surname="Author")
+    cover = ImageRenditionSet(
+        pk=1, source="article_covers/ab/cover.jpg", source_hash="ab" * 32,
+        status=ImageRenditionSet.Status.READY, widths=[320, 640, 960, 1280],
+    )
+    now = timezone.now()
+    articles = []
+    for pk in range(1, count + 1):
+        body = "".join(
+            f"<p>{' '.join(rng.choices(VOCABULARY, k=60))} <strong>{rng.choice(VOCABULARY)}</strong></p>"
+            for _ in range(paragraphs)
+        )
+        articles.append(Article(
+            pk=pk, author=author, title=" ".join(rng.choices(VOCABULARY, k=6)).title(),
+            body=body, body_html=body, excerpt=body[3:300], reading_time=paragraphs // 3 + 1,
+            featured_image="article_covers/ab/cover.jpg", cover_renditions=cover,
+            keywords=", ".join(rng.sample(VOCABULARY, 3)), created_at=now, updated_at=now,
+        ))
+    return articles
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare payload size and serialization time of the full article serializer, "
+        "the compact list serializer and a ?fields= sparse fieldset on synthetic "
+        "in-memory articles. Never touches the database."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--page-size', type=int, default=12)
+        parser.add_argument('--paragraphs', type=int, default=15, help="Paragraphs per synthetic body.")
+        parser.add_argument('--rounds', type=int, default=200)
+        parser.add_argument('--fields', default='id,title,excerpt,created_at')
+        parser.add_argument('--seed', type=int, default=42)
+
+    def handle(self, *args, **options):
+        articles = synthetic_articles(random.Random(options['seed']), options['page_size'], options['paragraphs'])
+        sparse_request = Request(APIRequestFactory().get('/api/articles/', {'fields': options['fields']}))
+        variants = [
+            ("ArticleSerializer (full)", ArticleSerializer, {}),
+            ("ArticleListSerializer", ArticleListSerializer, {}),
+            (f"?fields={options['fields']}", ArticleListSerializer, {'request': sparse_request}),
+        ]
+
+        renderer = JSONRenderer()
+        self.stdout.write(f"{options['page_size']} articles per page, {options['rounds']} rounds")
+        for label, serializer_class, context in variants:
+            timings = []
+            for _ in range(options['rounds']):
+                started = time.perf_counter()
+                payload = renderer.render(serializer_class(articles, many=True, context=context).data)
+                timings.append((time.perf_counter() - started) * 1000)
+            self.stdout.write(
+                f"{label:<40} {len(payload) / 1024:8.1f} KiB "
+                f"(gzip {len(gzip.compress(payload)) / 1024:6.1f} KiB)  "
+                f"p50={statistics.median(timings):.2f}ms p95={percentile(timings, 95):.2f}ms"
+            )
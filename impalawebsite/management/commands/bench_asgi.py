@@ -0,0 +1,128 @@
+import asyncio
+import itertools
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.test import AsyncClient, Client
+from django.test.utils import override_settings
+
+from impalawebsite.seeding import seed, throwaway_database
+
+from .bench_search import percentile
+
+DUMMY_CACHE = {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'}
+
+
+class Command(BaseCommand):
+    help = (
+        "Load-test the article read endpoints through the sync WSGI stack (a pool of "
+        "worker threads, like gunicorn --threads) and the async ASGI stack (one event "
+        "loop, like uvicorn) with the same number of concurrent clients, and report "
+        "throughput and latency percentiles. Requests are driven in-process, so no "
+        "server needs to be installed. Runs against a throwaway SQLite database filled "
+        "with synthetic articles; never touches the project database."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--concurrency', type=int, default=64, help="Clients with a request in flight.")
+        parser.add_argument('--requests', type=int, default=2000, help="Requests per mode.")
+        parser.add_argument('--threads', type=int, default=8, help="WSGI worker threads.")
+        parser.add_argument(
+            '--page-cache', action='store_true',
+            help="Keep the page cache on; by default it is disabled so every request runs the view.",
+        )
+        parser.add_argument('--articles', type=int, default=200)
+        parser.add_argument('--path', action='append', dest='paths', help="Path to request (repeatable).")
+        parser.add_argument('--seed', type=int, default=42)
+
+    def handle(self, *args, **options):
+        with throwaway_database():
+            articles = seed(users=5, articles=options['articles'], contacts=0, seed=options['seed'])['articles']
+            self.bench(options['paths'] or self.default_paths(articles[-1].pk), options)
+
+    def bench(self, paths, options):
+        overrides = {'DEBUG': False, 'ALLOWED_HOSTS': [*settings.ALLOWED_HOSTS, 'testserver']}
+        if not options['page_cache']:
+            overrides['CACHES'] = {**settings.CACHES, 'pages': DUMMY_CACHE, 'template_fragments': DUMMY_CACHE}
+
+        self.stdout.write(
+            f"{options['requests']} requests per mode, {options['concurrency']} concurrent clients, "
+            f"page cache {'on' if options['page_cache'] else 'off'}"
+        )
+        for path in paths:
+            self.stdout.write(f"  GET {path}")
+
+        runs = [
+            (f"WSGI, sync views ({options['threads']} threads)", 'website.urls', self.run_wsgi),
+            ("ASGI, async views (event loop)", 'website.asgi_urls', self.run_asgi),
+        ]
+        for label, urlconf, run in runs:
+            with override_settings(ROOT_URLCONF=urlconf, **overrides):
+                run(paths, min(len(paths) * 2, options['requests']), options)  # warm up
+                started = time.perf_counter()
+                timings, errors = run(paths, options['requests'], options)
+                elapsed = time.perf_counter() - started
+            self.stdout.write(
+                f"{label:<34} {len(timings) / elapsed:8.1f} req/s  "
+                f"p50={percentile(timings, 50):.1f}ms p95={percentile(timings, 95):.1f}ms "
+                f"p99={percentile(timings, 99):.1f}ms max={max(timings):.1f}ms errors={errors}"
+            )
+
+    def default_paths(self, pk):
+        return ['/list-articles/', f'/{pk}/', '/api/articles/', f'/api/articles/{pk}/']
+
+    def run_wsgi(self, paths, total, options):
+        """
+        ``concurrency`` client threads feeding a pool of ``threads`` workers in
+        arrival order, like a threaded WSGI server's accept queue; time spent
+        queued counts as latency.
+        """
+        schedule = itertools.cycle(paths)
+        counter = itertools.count()
+        lock = threading.Lock()
+        timings, errors = [], []
+
+        with ThreadPoolExecutor(max_workers=options['threads']) as workers:
+            def client_loop():
+                client = Client(raise_request_exception=False)
+                while next(counter) < total:
+                    with lock:
+                        path = next(schedule)
+                    started = time.perf_counter()
+                    response = workers.submit(client.get, path).result()
+                    with lock:
+                        timings.append((time.perf_counter() - started) * 1000)
+                        if response.status_code != 200:
+                            errors.append(path)
+
+            clients = [threading.Thread(target=client_loop) for _ in range(options['concurrency'])]
+            for thread in clients:
+                thread.start()
+            for thread in clients:
+                thread.join()
+        return timings, len(errors)
+
+    def run_asgi(self, paths, total, options):
+        """``concurrency`` client coroutines on one event loop, as under uvicorn or daphne."""
+        schedule = itertools.cycle(paths)
+        counter = itertools.count()
+        timings, errors = [], []
+
+        async def client_loop():
+            client = AsyncClient(raise_request_exception=False)
+            while next(counter) < total:
+                path = next(schedule)
+                started = time.perf_counter()
+                response = await client.get(path)
+                timings.append((time.perf_counter() - started) * 1000)
+                if response.status_code != 200:
+                    errors.append(path)
+
+        async def main():
+            await asyncio.gather(*(client_loop() for _ in range(options['concurrency'])))
+
+        asyncio.run(main())
+        return timings, len(errors)
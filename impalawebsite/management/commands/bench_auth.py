@@ -0,0 +1,112 @@
+import base64
+import tempfile
+import time
+from contextlib import ExitStack, contextmanager, nullcontext
+from unittest import mock
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client
+from django.test.utils import override_settings
+from rest_framework import authentication
+from rest_framework.authtoken.models import Token
+from rest_framework.views import APIView
+
+from impalawebsite.models import CustomUser
+from impalawebsite.seeding import seed, throwaway_database
+
+from .bench_search import percentile
+
+DUMMY_CACHE = {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'}
+FILE_CACHE = 'django.core.cache.backends.filebased.FileBasedCache'
+PASSWORD = 'bench-auth-password'
+
+
+@contextmanager
+def stock_auth():
+    """Django's database sessions and ModelBackend, DRF's own authentication classes."""
+    with ExitStack() as stack:
+        stack.enter_context(override_settings(
+            SESSION_ENGINE='django.contrib.sessions.backends.db',
+            AUTHENTICATION_BACKENDS=['django.contrib.auth.backends.ModelBackend'],
+        ))
+        # APIView subclasses read the class attribute DRF filled in from settings at import.
+        stack.enter_context(mock.patch.object(APIView, 'authentication_classes', [
+            authentication.SessionAuthentication,
+            authentication.BasicAuthentication,
+            authentication.TokenAuthentication,
+        ]))
+        yield
+
+
+class Command(BaseCommand):
+    help = (
+        "Queries and latency per authenticated request to /api/articles/ with session, "
+        "token and Basic authentication, using the stock database sessions and DRF "
+        "authentication classes and then the cached ones from settings. Runs against "
+        "a throwaway database; never touches the project database."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=100, help="Timed requests per scheme.")
+        parser.add_argument(
+            '--basic-requests', type=int, default=5,
+            help="Timed requests for stock Basic auth, which hashes the password every time.",
+        )
+        parser.add_argument('--articles', type=int, default=50)
+
+    def handle(self, *args, **options):
+        caches = {**settings.CACHES, 'pages': DUMMY_CACHE, 'template_fragments': DUMMY_CACHE}
+        with throwaway_database(), tempfile.TemporaryDirectory() as cache_dir, override_settings(
+            # The auth caches are bypassed on a per-process LocMemCache, so measure a shared one.
+            CACHES={**caches, 'sessions': {'BACKEND': FILE_CACHE, 'LOCATION': cache_dir}},
+            THROTTLE_RATES={}, ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, 'testserver'],
+        ):
+            seed(users=1, articles=options['articles'], contacts=0)
+            user = CustomUser.objects.create_user('bench-auth@example.com', 'Bench', 'Auth', PASSWORD)
+            token = Token.objects.create(user=user)
+
+            self.stdout.write(f"{'':<8} {'scheme':<10} {'queries/req':>11} {'auth queries':>12} {'p50':>10} {'p95':>10}")
+            for label, config in (("stock", stock_auth), ("cached", nullcontext)):
+                with config():
+                    baseline = None
+                    for scheme in ('anonymous', 'session', 'token', 'basic'):
+                        count = options['requests']
+                        if label == 'stock' and scheme == 'basic':
+                            count = options['basic_requests']
+                        queries, timings = self.measure(self.client_for(scheme, user, token), count)
+                        baseline = queries if baseline is None else baseline
+                        self.stdout.write(
+                            f"{label:<8} {scheme:<10} {queries:11.2f} {queries - baseline:12.2f} "
+                            f"{percentile(timings, 50):8.2f}ms {percentile(timings, 95):8.2f}ms"
+                        )
+
+    def client_for(self, scheme, user, token):
+        if scheme == 'session':
+            client = Client()
+            client.force_login(user)
+            return client
+        if scheme == 'token':
+            return Client(headers={'authorization': f'Token {token.key}'})
+        if scheme == 'basic':
+            credentials = base64.b64encode(f'{user.email}:{PASSWORD}'.encode()).decode()
+            return Client(headers={'authorization': f'Basic {credentials}'})
+        return Client()
+
+    def measure(self, client, count):
+        """Mean queries per request and request timings, after one warm-up request."""
+        url = '/api/articles/?fields=id,title'
+        self.check_response(client.get(url), url)
+        queries, timings = [], []
+        with connection.execute_wrapper(lambda execute, sql, *args: queries.append(sql) or execute(sql, *args)):
+            for _ in range(count):
+                started = time.perf_counter()
+                response = client.get(url)
+                timings.append((time.perf_counter() - started) * 1000)
+                self.check_response(response, url)
+        return len(queries) / count, timings
+
+    def check_response(self, response, url):
+        if response.status_code != 200:
+            raise CommandError(f"GET {url} returned {response.status_code}")
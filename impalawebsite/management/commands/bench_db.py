@@ -0,0 +1,143 @@
+import random
+import sqlite3
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from django.core.management.base import BaseCommand
+
+from impalawebsite.db import pragma_statements
+
+from .bench_search import percentile, synthetic_article
+
+SCHEMA_SQL = """
+CREATE TABLE article (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    title TEXT NOT NULL,
+    excerpt TEXT NOT NULL,
+    body_html TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX article_created_idx ON article (created_at DESC, id DESC);
+"""
+INSERT_SQL = "INSERT INTO article (title, excerpt, body_html, created_at, updated_at) VALUES (?, ?, ?, ?, ?)"
+UPDATE_SQL = "UPDATE article SET body_html = ?, updated_at = ? WHERE id = ?"
+# The shape of the article list and detail queries.
+LIST_SQL = "SELECT id, title, excerpt, created_at FROM article ORDER BY created_at DESC, id DESC LIMIT 12"
+DETAIL_SQL = "SELECT id, title, body_html, updated_at FROM article WHERE id = ?"
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure article read throughput while a writer keeps saving articles, with "
+        "SQLite's defaults, with the SQLITE_PRAGMAS from settings (WAL etc.) and with "
+        "readers on a separate replica file. Runs against throwaway databases; never "
+        "touches the project database."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--articles', type=int, default=20_000)
+        parser.add_argument('--readers', type=int, default=8, help="Concurrent reader threads.")
+        parser.add_argument('--seconds', type=float, default=5.0, help="Duration of each run.")
+        parser.add_argument('--seed', type=int, default=42)
+
+    def handle(self, *args, **options):
+        tuned = pragma_statements()
+        modes = [
+            ("defaults (rollback journal)", [], False),
+            ("SQLITE_PRAGMAS (WAL)", tuned, False),
+            ("SQLITE_PRAGMAS + read replica", tuned, True),
+        ]
+        self.stdout.write(
+            f"{options['articles']} articles, {options['readers']} readers and 1 writer, "
+            f"{options['seconds']:.0f}s per run"
+        )
+        for label, pragmas, use_replica in modes:
+            with tempfile.TemporaryDirectory() as tmp:
+                primary = Path(tmp) / "primary.sqlite3"
+                self.seed(primary, random.Random(options['seed']), options['articles'], pragmas)
+                replica = primary
+                if use_replica:
+                    replica = Path(tmp) / "replica.sqlite3"
+                    with self.connect(primary, pragmas) as source, self.connect(replica, pragmas) as target:
+                        source.backup(target)
+                result = self.run(primary, replica, pragmas, options)
+            reads = result['reads']
+            self.stdout.write(
+                f"{label:<32} {len(reads) / options['seconds']:9.0f} reads/s  "
+                f"p50={percentile(reads, 50):.2f}ms p99={percentile(reads, 99):.2f}ms  "
+                f"{result['writes'] / options['seconds']:6.0f} writes/s  locked={result['locked']}"
+            )
+
+    def connect(self, path, pragmas):
+        db = sqlite3.connect(path, timeout=20, check_same_thread=False, isolation_level=None)
+        for statement in pragmas:
+            db.execute(statement)
+        return db
+
+    def seed(self, path, rng, count, pragmas):
+        db = self.connect(path, pragmas)
+        db.executescript(SCHEMA_SQL)
+        now = time.time()
+        db.execute("BEGIN")
+        db.executemany(INSERT_SQL, (
+            (title, body[:300], f"<p>{body}</p>" * 8, now - pk, now - pk)
+            for pk, (title, body, _) in enumerate(synthetic_article(rng) for _ in range(count))
+        ))
+        db.execute("COMMIT")
+        db.close()
+
+    def run(self, primary, replica, pragmas, options):
+        stop = threading.Event()
+        lock = threading.Lock()
+        result = {'reads': [], 'writes': 0, 'locked': 0}
+
+        def reader(seed):
+            rng = random.Random(seed)
+            db = self.connect(replica, pragmas)
+            timings = []
+            while not stop.is_set():
+                started = time.perf_counter()
+                try:
+                    db.execute(LIST_SQL).fetchall()
+                    db.execute(DETAIL_SQL, (rng.randint(1, options['articles']),)).fetchall()
+                except sqlite3.OperationalError:
+                    with lock:
+                        result['locked'] += 1
+                    continue
+                timings.append((time.perf_counter() - started) * 1000)
+            db.close()
+            with lock:
+                result['reads'].extend(timings)
+
+        def writer():
+            rng = random.Random(options['seed'])
+            db = self.connect(primary, pragmas)
+            while not stop.is_set():
+                title, body, _ = synthetic_article(rng)
+                now = time.time()
+                try:
+                    # An article save: the row itself plus an edit to another one, in one transaction.
+                    db.execute("BEGIN IMMEDIATE")
+                    db.execute(INSERT_SQL, (title, body[:300], f"<p>{body}</p>" * 8, now, now))
+                    db.execute(UPDATE_SQL, (f"<p>{body}</p>" * 8, now, rng.randint(1, options['articles'])))
+                    db.execute("COMMIT")
+                except sqlite3.OperationalError:
+                    db.execute("ROLLBACK")
+                    with lock:
+                        result['locked'] += 1
+                    continue
+                result['writes'] += 1
+            db.close()
+
+        threads = [threading.Thread(target=writer)]
+        threads += [threading.Thread(target=reader, args=(seed,)) for seed in range(options['readers'])]
+        for thread in threads:
+            thread.start()
+        time.sleep(options['seconds'])
+        stop.set()
+        for thread in threads:
+            thread.join()
+        return result
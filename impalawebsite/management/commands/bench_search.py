@@ -0,0 +1,67 @@
+import random
+import sqlite3
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+from django.core.management.base import BaseCommand
+
+from impalawebsite.search import CREATE_FTS_SQL, SEARCH_SQL, UPSERT_SQL, build_match_query
+from impalawebsite.seeding import VOCABULARY, synthetic_article
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, round(pct / 100 * (len(ordered) - 1)))
+    return ordered[index]
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark the article FTS5 search query against a throwaway SQLite database "
+        "filled with synthetic articles. Never touches the project database."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--articles', type=int, default=100_000)
+        parser.add_argument('--queries', type=int, default=200)
+        parser.add_argument('--page-size', type=int, default=10)
+        parser.add_argument('--seed', type=int, default=42)
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        # The production SQL uses Django's %s placeholders; sqlite3 wants ?.
+        upsert_sql = UPSERT_SQL.replace('%s', '?')
+        search_sql = SEARCH_SQL.replace('%s', '?')
+
+        with tempfile.TemporaryDirectory() as tmp:
+            db = sqlite3.connect(Path(tmp) / "bench.sqlite3")
+            db.execute(CREATE_FTS_SQL)
+
+            started = time.perf_counter()
+            with db:
+                db.executemany(upsert_sql, (
+                    (pk, *synthetic_article(rng)) for pk in range(1, options['articles'] + 1)
+                ))
+            index_seconds = time.perf_counter() - started
+            self.stdout.write(f"Indexed {options['articles']} articles in {index_seconds:.1f}s")
+
+            queries = [
+                " ".join(rng.sample(VOCABULARY, rng.randint(1, 3)))
+                for _ in range(options['queries'])
+            ]
+            timings = []
+            for query in queries:
+                started = time.perf_counter()
+                db.execute(search_sql, (build_match_query(query), options['page_size'], 0)).fetchall()
+                timings.append((time.perf_counter() - started) * 1000)
+            db.close()
+
+        self.stdout.write(
+            f"{len(timings)} ranked queries: "
+            f"p50={statistics.median(timings):.1f}ms "
+            f"p95={percentile(timings, 95):.1f}ms "
+            f"p99={percentile(timings, 99):.1f}ms "
+            f"max={max(timings):.1f}ms"
+        )
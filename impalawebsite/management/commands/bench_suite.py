@@ -0,0 +1,220 @@
+import itertools
+import json
+import platform
+import sqlite3
+import statistics
+import subprocess
+import time
+import tracemalloc
+
+import django
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client
+from django.test.utils import override_settings
+from django.utils import timezone
+
+from impalawebsite.models import Article
+from impalawebsite.seeding import SEED_PASSWORD, seed, throwaway_database
+
+from .bench_search import percentile
+
+DUMMY_CACHE = {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'}
+# Relative growth in these metrics counts as a regression; query counts may not grow at all.
+COMPARED = ('p50_ms', 'p95_ms', 'p99_ms', 'peak_kib')
+
+
+def git_revision():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def regressions(baseline, current, threshold):
+    """``[(scenario, metric, old, new)]`` where ``current`` is worse than ``baseline``."""
+    found = []
+    for name, metrics in current['scenarios'].items():
+        old = baseline['scenarios'].get(name)
+        if old is None:
+            continue
+        if metrics['queries'] > old['queries']:
+            found.append((name, 'queries', old['queries'], metrics['queries']))
+        for metric in COMPARED:
+            if old[metric] and metrics[metric] > old[metric] * (1 + threshold):
+                found.append((name, metric, old[metric], metrics[metric]))
+    return found
+
+
+class Command(BaseCommand):
+    help = (
+        "Reproducible benchmark of the article pages, the article API, signup/login "
+        "and the new-article newsletter signal, run through the test client against a "
+        "throwaway seeded database. Records latency percentiles, queries and memory "
+        "allocated per request; --output saves a JSON baseline and --compare checks "
+        "a run against one."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=20)
+        parser.add_argument('--articles', type=int, default=1000)
+        parser.add_argument('--contacts', type=int, default=5000)
+        parser.add_argument('--images', type=int, default=0)
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument('--iterations', type=int, default=200, help="Timed requests per scenario.")
+        parser.add_argument(
+            '--auth-iterations', type=int, default=10,
+            help="Timed requests for signup/login, which spend most of their time hashing passwords.",
+        )
+        parser.add_argument('--page-cache', action='store_true', help="Keep the page cache on.")
+        parser.add_argument('--only', action='append', help="Run just this scenario (repeatable).")
+        parser.add_argument('--output', '-o', help="Write the results to this JSON file.")
+        parser.add_argument('--compare', help="Baseline JSON file to compare against.")
+        parser.add_argument('--threshold', type=float, default=0.10, help="Allowed relative slowdown.")
+        parser.add_argument('--fail-on-regression', action='store_true')
+
+    def handle(self, *args, **options):
+        baseline = None
+        if options['compare']:
+            with open(options['compare'], encoding='utf-8') as source:
+                baseline = json.load(source)
+
+        overrides = {'THROTTLE_RATES': {}, 'ALLOWED_HOSTS': [*settings.ALLOWED_HOSTS, 'testserver']}
+        if not options['page_cache']:
+            overrides['CACHES'] = {**settings.CACHES, 'pages': DUMMY_CACHE, 'template_fragments': DUMMY_CACHE}
+        with throwaway_database(), override_settings(**overrides):
+            seeded = seed(
+                users=options['users'], articles=options['articles'], contacts=options['contacts'],
+                images=options['images'], seed=options['seed'],
+            )
+            scenarios = self.scenarios(seeded)
+            if options['only']:
+                unknown = set(options['only']) - set(scenarios)
+                if unknown:
+                    raise CommandError(f"Unknown scenario(s): {', '.join(sorted(unknown))}")
+                scenarios = {name: run for name, run in scenarios.items() if name in options['only']}
+
+            results = {}
+            for name, (request, auth) in scenarios.items():
+                iterations = options['auth_iterations'] if auth else options['iterations']
+                results[name] = self.measure(request, iterations)
+                self.report(name, results[name], baseline)
+
+        report = {
+            'meta': {
+                'created': timezone.now().isoformat(),
+                'revision': git_revision(),
+                'python': platform.python_version(),
+                'django': django.get_version(),
+                'sqlite': sqlite3.sqlite_version,
+                'options': {
+                    name: options[name] for name in (
+                        'users', 'articles', 'contacts', 'images', 'seed',
+                        'iterations', 'auth_iterations', 'page_cache',
+                    )
+                },
+            },
+            'scenarios': results,
+        }
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as target:
+                json.dump(report, target, indent=2, sort_keys=True)
+                target.write('\n')
+            self.stdout.write(f"Wrote {options['output']}")
+
+        if baseline is not None:
+            if baseline['meta'].get('options') != report['meta']['options']:
+                self.stdout.write(self.style.WARNING("Baseline was recorded with different options."))
+            found = regressions(baseline, report, options['threshold'])
+            for name, metric, old, new in found:
+                self.stdout.write(self.style.ERROR(f"Regression in {name}: {metric} {old} -> {new}"))
+            if found and options['fail_on_regression']:
+                raise CommandError(f"{len(found)} regression(s) against {options['compare']}.")
+
+    def scenarios(self, seeded):
+        """``{name: (request, is_auth)}``; each ``request()`` performs one operation."""
+        anonymous = Client()
+        pks = itertools.cycle([article.pk for article in seeded['articles'][-50:]])
+        login_email = seeded['users'][0].email
+        signups = itertools.count()
+        newsletters = itertools.count()
+        author = seeded['users'][0]
+
+        def signup():
+            number = next(signups)
+            return Client().post('/api/signup/', {
+                'email': f"bench-signup{number}@example.com", 'first_name': "Bench", 'surname': "Signup",
+                'password1': "Bench-pass-9472", 'password2': "Bench-pass-9472",
+            }, content_type='application/json')
+
+        def newsletter():
+            # A single save: rendering, keyword/search sync and one queued email per subscriber.
+            Article.objects.create(
+                author=author, title=f"Newsletter {next(newsletters)}", keywords="health, data",
+                body="<p>" + "news " * 200 + "</p>",
+            )
+
+        return {
+            'article_list': (lambda: anonymous.get('/list-articles/'), False),
+            'article_detail': (lambda: anonymous.get(f'/{next(pks)}/'), False),
+            'api_article_list': (lambda: anonymous.get('/api/articles/'), False),
+            'api_article_retrieve': (lambda: anonymous.get(f'/api/articles/{next(pks)}/'), False),
+            'signup_api': (signup, True),
+            'login_api': (lambda: Client().post(
+                '/api/login/', {'username': login_email, 'password': SEED_PASSWORD}, content_type='application/json'
+            ), True),
+            'newsletter_signal': (newsletter, False),
+        }
+
+    def measure(self, request, iterations):
+        self.check_response(request())  # warm up
+
+        # Counted with a wrapper rather than CaptureQueriesContext: request_started
+        # resets connection.queries_log mid-capture.
+        queries = []
+        with connection.execute_wrapper(lambda execute, sql, *args: queries.append(sql) or execute(sql, *args)):
+            self.check_response(request())
+
+        peaks, retained = [], []
+        for _ in range(min(5, iterations)):
+            tracemalloc.start()
+            before = tracemalloc.get_traced_memory()[0]
+            self.check_response(request())
+            current, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            peaks.append((peak - before) / 1024)
+            retained.append((current - before) / 1024)
+
+        timings = []
+        for _ in range(iterations):
+            started = time.perf_counter()
+            self.check_response(request())
+            timings.append((time.perf_counter() - started) * 1000)
+
+        return {
+            'iterations': iterations,
+            'mean_ms': round(statistics.fmean(timings), 3),
+            'p50_ms': round(percentile(timings, 50), 3),
+            'p95_ms': round(percentile(timings, 95), 3),
+            'p99_ms': round(percentile(timings, 99), 3),
+            'queries': len(queries),
+            'peak_kib': round(statistics.median(peaks), 1),
+            'retained_kib': round(statistics.median(retained), 1),
+        }
+
+    def check_response(self, response):
+        if response is not None and response.status_code >= 400:
+            raise CommandError(f"{response.request['PATH_INFO']} returned {response.status_code}")
+
+    def report(self, name, result, baseline):
+        line = (
+            f"{name:<22} p50={result['p50_ms']:8.2f}ms p95={result['p95_ms']:8.2f}ms "
+            f"p99={result['p99_ms']:8.2f}ms queries={result['queries']:3d} peak={result['peak_kib']:8.1f}KiB"
+        )
+        old = (baseline or {}).get('scenarios', {}).get(name)
+        if old and old['p50_ms']:
+            line += f"  (p50 {100 * (result['p50_ms'] / old['p50_ms'] - 1):+.0f}% vs baseline)"
+        self.stdout.write(line)
@@ -0,0 +1,116 @@
+import re
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext, override_settings
+
+from impalawebsite.models import CustomUser, Keyword, Subscriber
+from impalawebsite.seeding import seed, throwaway_database
+from impalawebsite.utils import make_unsubscribe_token
+
+DUMMY_CACHE = {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'}
+EXPLAINED = ('SELECT', 'WITH', 'UPDATE', 'DELETE')
+# "SCAN impalawebsite_article" without "USING ... INDEX" reads every row; virtual
+# tables (FTS5), subqueries and constant rows are not table scans.
+_FULL_SCAN_RE = re.compile(r'^SCAN (?!\(|CONSTANT ROW)(\S+)(?!.*\bUSING\b)(?!.*VIRTUAL TABLE)')
+
+
+class Command(BaseCommand):
+    help = (
+        "Seed a throwaway database with a large dataset, request every article, "
+        "keyword and contact page and API endpoint (sync and async views), run "
+        "EXPLAIN QUERY PLAN on each query they issue and fail if any query scans "
+        "a whole table. Never touches the project database."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--articles', type=int, default=5000)
+        parser.add_argument('--contacts', type=int, default=20000)
+        parser.add_argument('--seed', type=int, default=42)
+
+    def handle(self, *args, **options):
+        with throwaway_database():
+            seeded = seed(users=20, articles=options['articles'], contacts=options['contacts'], seed=options['seed'])
+            failures = self.check_endpoints({
+                'author': seeded['articles'][-1].author,
+                'staff': CustomUser.objects.create_superuser('staff@example.com', 'Seed', 'Staff', 'pw'),
+                'article': seeded['articles'][-1],
+                'keyword': Keyword.objects.order_by('-article_count').first(),
+                'subscriber': Subscriber.objects.order_by('pk').first(),
+            })
+        if failures:
+            raise CommandError(f"{failures} quer{'y' if failures == 1 else 'ies'} scan a whole table.")
+        self.stdout.write(self.style.SUCCESS("No full table scans."))
+
+    def endpoints(self, fixtures):
+        """``(label, path, client, allowed_scan_reason)`` for every read the site serves."""
+        pk, slug = fixtures['article'].pk, fixtures['keyword'].slug
+        cursor = Client().get('/api/articles/').json()['next'].split('?', 1)[1]
+        return [
+            ("home", '/', 'anonymous', None),
+            ("article list", '/list-articles/', 'anonymous', None),
+            ("article list, signed in", '/list-articles/', 'author', None),
+            ("article list by keyword", f'/list-articles/?keyword={slug}', 'anonymous', None),
+            ("article detail", f'/{pk}/', 'anonymous', None),
+            ("article edit form", f'/{pk}/edit/', 'author', None),
+            ("article delete form", f'/{pk}/delete/', 'author', None),
+            ("contact form", '/contact/', 'anonymous', None),
+            ("unsubscribe", f"/unsubscribe/{make_unsubscribe_token(fixtures['subscriber'])}/", 'anonymous', None),
+            ("API article list", '/api/articles/', 'anonymous', None),
+            ("API article list, next page", f'/api/articles/?{cursor}', 'anonymous', None),
+            ("API article list by keyword", f'/api/articles/?keyword={slug}', 'anonymous', None),
+            ("API article list, sparse", '/api/articles/?fields=id,title', 'anonymous', None),
+            ("API article detail", f'/api/articles/{pk}/', 'anonymous', None),
+            ("API article search", '/api/articles/search/?q=malaria', 'anonymous', None),
+            ("API keyword list", '/api/keywords/', 'anonymous', None),
+            ("API keyword detail", f'/api/keywords/{slug}/', 'anonymous', None),
+            ("API contact list", '/api/contacts/', 'anonymous', "unpaginated listing of every contact"),
+            ("API contact export", '/api/contacts/export/', 'staff', "exports every contact by design"),
+            ("API contact export, date range", '/api/contacts/export/?since=2000-01-01&until=2000-02-01', 'staff', None),
+            ("API contact export, consented", '/api/contacts/export/?consent=true&since=2000-01-01', 'staff', None),
+        ]
+
+    def check_endpoints(self, fixtures):
+        clients = {'anonymous': Client(), 'author': Client(), 'staff': Client()}
+        clients['author'].force_login(fixtures['author'])
+        clients['staff'].force_login(fixtures['staff'])
+        caches = {**settings.CACHES, 'pages': DUMMY_CACHE, 'template_fragments': DUMMY_CACHE}
+
+        failures = 0
+        for urlconf, stack in (('website.urls', 'sync'), ('website.asgi_urls', 'async')):
+            with override_settings(
+                ROOT_URLCONF=urlconf, CACHES=caches, THROTTLE_RATES={},
+                ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, 'testserver'],
+            ):
+                for label, path, client, allowed in self.endpoints(fixtures):
+                    with CaptureQueriesContext(connection) as captured:
+                        response = clients[client].get(path)
+                        if response.streaming:
+                            b''.join(response.streaming_content)
+                    if response.status_code != 200:
+                        raise CommandError(f"{label}: GET {path} returned {response.status_code}")
+                    scans = self.full_scans(captured.captured_queries)
+                    if scans and allowed:
+                        self.stdout.write(f"[{stack}] {label}: full scan allowed ({allowed})")
+                        continue
+                    for sql, detail in scans:
+                        failures += 1
+                        self.stdout.write(self.style.ERROR(f"[{stack}] {label}: {detail}\n    {sql}"))
+                    if not scans:
+                        self.stdout.write(f"[{stack}] {label}: {len(captured.captured_queries)} queries OK")
+        return failures
+
+    def full_scans(self, queries):
+        scans = []
+        with connection.cursor() as cursor:
+            for query in queries:
+                sql = query['sql']
+                if not sql.lstrip().upper().startswith(EXPLAINED):
+                    continue
+                cursor.execute(f'EXPLAIN QUERY PLAN {sql}')
+                for *_, detail in cursor.fetchall():
+                    if _FULL_SCAN_RE.match(detail):
+                        scans.append((sql, detail))
+        return scans
@@ -0,0 +1,50 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.template.defaultfilters import filesizeformat
+
+from impalawebsite import media_gc
+
+
+class Command(BaseCommand):
+    help = (
+        "Report and delete media files no article references (covers, Summernote "
+        "attachments, renditions). Use --dedupe to fold legacy duplicate uploads "
+        "into the content-addressed layout first."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true', help="Only report; change nothing.")
+        parser.add_argument('--dedupe', action='store_true',
+                            help="Move existing uploads to hashed names and repoint articles at them.")
+        parser.add_argument('--min-age-hours', type=float, default=24,
+                            help="Never delete files modified more recently than this (default 24).")
+
+    def handle(self, *args, **options):
+        report = media_gc.scan()
+        self.stdout.write(
+            f"Scanned {report.scanned_files} uploads ({filesizeformat(report.scanned_bytes)}); "
+            f"{report.duplicate_files} are byte-identical copies ({filesizeformat(report.duplicate_bytes)})."
+        )
+
+        if options['dedupe'] and not options['dry_run']:
+            moved = media_gc.adopt_legacy_files()
+            self.stdout.write(f"Moved {len(moved)} uploads to content-addressed names.")
+
+        orphans = list(media_gc.find_orphans(min_age=timedelta(hours=options['min_age_hours'])))
+        orphan_bytes = sum(size for _, size in orphans)
+        for name, size in orphans:
+            self.stdout.write(f"  orphan {name} ({filesizeformat(size)})", style_func=None)
+
+        if options['dry_run']:
+            reclaimable = orphan_bytes + (report.duplicate_bytes if options['dedupe'] else 0)
+            self.stdout.write(self.style.WARNING(
+                f"Dry run: {len(orphans)} unreferenced files ({filesizeformat(orphan_bytes)}) would be deleted; "
+                f"up to {filesizeformat(reclaimable)} reclaimable."
+            ))
+            return
+
+        deleted = media_gc.delete_orphans(orphans)
+        self.stdout.write(self.style.SUCCESS(
+            f"Deleted {deleted} unreferenced files, freed {filesizeformat(orphan_bytes)}."
+        ))
@@ -0,0 +1,32 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from impalawebsite.exports import DEFAULT_CHUNK_SIZE, FORMATS, contact_queryset, filters_from_params
+
+
+class Command(BaseCommand):
+    help = (
+        "Stream contact messages as CSV or NDJSON with constant memory. "
+        "--since is inclusive, --until exclusive; both take an ISO date or datetime."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--format', choices=sorted(FORMATS), default='csv')
+        parser.add_argument('--output', '-o', help="File to write; defaults to stdout.")
+        parser.add_argument('--since')
+        parser.add_argument('--until')
+        parser.add_argument('--consent', help="true: only subscribers, false: only non-subscribers.")
+        parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE)
+
+    def handle(self, *args, **options):
+        try:
+            queryset = contact_queryset(**filters_from_params(options))
+        except ValueError as exc:
+            raise CommandError(exc)
+
+        chunks = FORMATS[options['format']][0](queryset, chunk_size=options['chunk_size'])
+        if not options['output']:
+            for chunk in chunks:
+                self.stdout.write(chunk, ending='')
+            return
+        with open(options['output'], 'w', encoding='utf-8', newline='') as output:
+            output.writelines(chunks)
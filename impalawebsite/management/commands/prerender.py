@@ -0,0 +1,42 @@
+from django.core.management.base import BaseCommand
+
+from impalawebsite.models import Article
+from impalawebsite.prerender import page_index, prerender_all, prerender_changed, prerender_pending
+
+
+class Command(BaseCommand):
+    help = (
+        "Render the article pages, list pages and article API JSON to static files "
+        "under PRERENDER_ROOT. Only files whose content changed are rewritten; with "
+        "--article, only that article's pages and the list page it is on are rendered; "
+        "with --pending, only what saves queued since the last run (run it from cron)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--article', type=int, action='append', dest='articles', help="Article pk (repeatable).")
+        parser.add_argument('--pending', action='store_true', help="Render the pages queued by PRERENDER_ON_SAVE.")
+        parser.add_argument('--output', help="Directory to write to instead of PRERENDER_ROOT.")
+
+    def handle(self, *args, **options):
+        if options['pending']:
+            build = prerender_pending(options['output'])
+            if build is None:
+                self.stdout.write("Nothing queued.")
+                return
+            builds = [build]
+        elif not options['articles']:
+            builds = [prerender_all(options['output'])]
+        else:
+            positions = dict(
+                Article.objects.filter(pk__in=options['articles']).values_list('pk', 'created_at')
+            )
+            builds = [
+                # A missing article may have been deleted: drop its files and redo the lists.
+                prerender_changed([pk], page_index(positions[pk], pk), shifted=False, root=options['output'])
+                if pk in positions else prerender_changed([pk], 0, shifted=True, root=options['output'])
+                for pk in options['articles']
+            ]
+        written = sum(len(build.written) for build in builds)
+        unchanged = sum(build.unchanged for build in builds)
+        removed = sum(len(build.removed) for build in builds)
+        self.stdout.write(f"{written} written, {unchanged} unchanged, {removed} removed under {builds[0].root}")
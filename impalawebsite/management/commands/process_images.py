@@ -0,0 +1,53 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django_summernote.utils import get_attachment_model
+
+from impalawebsite import images
+from impalawebsite.models import Article, ImageRenditionSet
+
+
+class Command(BaseCommand):
+    help = "Generate responsive WebP/JPEG renditions for uploaded covers and Summernote images."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--backfill', action='store_true',
+                            help="Queue every existing article cover and Summernote attachment first.")
+        parser.add_argument('--retry-failed', action='store_true', help="Requeue images that failed before.")
+        parser.add_argument('--limit', type=int, help="Process at most this many images.")
+        parser.add_argument('--loop', action='store_true', help="Keep polling for newly queued images.")
+        parser.add_argument('--sleep', type=float, default=10.0, help="Seconds between polls with --loop.")
+
+    def handle(self, *args, **options):
+        if options['backfill']:
+            self.backfill()
+        if options['retry_failed']:
+            count = ImageRenditionSet.objects.filter(status=ImageRenditionSet.Status.FAILED).update(
+                status=ImageRenditionSet.Status.PENDING, error=''
+            )
+            self.stdout.write(f"Requeued {count} failed images.")
+
+        while True:
+            started = time.perf_counter()
+            ready, failed = images.process_pending(limit=options['limit'])
+            if ready or failed:
+                self.stdout.write(
+                    f"Rendered {ready} images ({failed} failed) in {time.perf_counter() - started:.1f}s"
+                )
+            if not options['loop']:
+                break
+            time.sleep(options['sleep'])
+
+    def backfill(self):
+        queued = 0
+        for article in Article.objects.exclude(featured_image='').exclude(featured_image__isnull=True).only(
+            'pk', 'featured_image', 'cover_renditions'
+        ).iterator():
+            renditions = images.enqueue(article.featured_image.name)
+            if renditions.pk != article.cover_renditions_id:
+                Article.objects.filter(pk=article.pk).update(cover_renditions=renditions)
+            queued += 1
+        for name in get_attachment_model().objects.exclude(file='').values_list('file', flat=True).iterator():
+            images.enqueue(name)
+            queued += 1
+        self.stdout.write(f"Queued {queued} existing images.")
@@ -0,0 +1,19 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from impalawebsite.search import rebuild_index
+
+
+class Command(BaseCommand):
+    help = "Rebuild the SQLite FTS5 article search index from the Article table."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500)
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        count = rebuild_index(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(
+            f"Indexed {count} articles in {time.perf_counter() - started:.2f}s"
+        ))
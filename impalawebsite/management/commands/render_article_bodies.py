@@ -0,0 +1,25 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from impalawebsite.models import Article
+from impalawebsite.rendering import render_in_batches
+
+
+class Command(BaseCommand):
+    help = "Sanitize article bodies and store body_html, excerpt and reading_time for existing rows."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=200)
+        parser.add_argument('--missing-only', action='store_true',
+                            help="Only process articles that have never been rendered.")
+
+    def handle(self, *args, **options):
+        queryset = Article.objects.all()
+        if options['missing_only']:
+            queryset = queryset.filter(body_html='')
+        started = time.perf_counter()
+        count = render_in_batches(queryset, batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(
+            f"Rendered {count} articles in {time.perf_counter() - started:.2f}s"
+        ))
@@ -0,0 +1,34 @@
+from django.core.management.base import BaseCommand
+
+from impalawebsite.seeding import SEED_PASSWORD, seed
+
+
+class Command(BaseCommand):
+    help = (
+        "Fill the configured database with synthetic users, articles (Summernote-style "
+        "HTML, optionally with cover and inline images) and contact messages. The same "
+        "--seed always produces the same data. Rows are added, never replaced."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=20)
+        parser.add_argument('--articles', type=int, default=1000)
+        parser.add_argument('--contacts', type=int, default=5000)
+        parser.add_argument(
+            '--images', type=int, default=0,
+            help="Distinct cover and inline images to generate and share between the articles.",
+        )
+        parser.add_argument('--seed', type=int, default=42)
+
+    def handle(self, *args, **options):
+        seeded = seed(
+            users=options['users'], articles=options['articles'], contacts=options['contacts'],
+            images=options['images'], seed=options['seed'],
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f"Seeded {len(seeded['users'])} users, {len(seeded['articles'])} articles "
+            f"and {len(seeded['contacts'])} contact messages."
+        ))
+        self.stdout.write(f"Seed users sign in with the password {SEED_PASSWORD!r}.")
+        if options['images']:
+            self.stdout.write("Run `manage.py process_images` to build the image renditions.")
@@ -0,0 +1,43 @@
+from datetime import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from impalawebsite.newsletter import digest_stats, send_due_digests
+
+
+class Command(BaseCommand):
+    help = (
+        "Queue the newsletter digest for every period that has ended since the last one, "
+        "one email per digest subscriber listing the articles published in it. Safe to run "
+        "repeatedly (e.g. hourly from cron): finished periods are skipped and an interrupted "
+        "run resumes without mailing anyone twice. Run send_outbox afterwards to deliver."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, help="Subscribers queued per transaction (NEWSLETTER_DIGEST_BATCH_SIZE).")
+        parser.add_argument('--now', help="ISO timestamp to treat as the current time.")
+
+    def handle(self, *args, **options):
+        now = None
+        if options['now']:
+            try:
+                now = datetime.fromisoformat(options['now'])
+            except ValueError as exc:
+                raise CommandError(f"--now: {exc}")
+            if timezone.is_naive(now):
+                now = timezone.make_aware(now)
+
+        digests = send_due_digests(now=now, batch_size=options['batch_size'])
+        for digest in digests:
+            self.stdout.write(
+                f"{digest.period_start:%Y-%m-%d %H:%M} - {digest.period_end:%Y-%m-%d %H:%M}: "
+                f"articles={digest.articles} queued={digest.emails_queued} avoided={digest.emails_avoided}"
+            )
+        if not digests:
+            self.stdout.write("No digest due.")
+        stats = digest_stats()
+        self.stdout.write(self.style.SUCCESS(
+            f"Digests so far: {stats['digests']}, emails queued={stats['emails_queued']}, "
+            f"emails avoided={stats['emails_avoided']}"
+        ))
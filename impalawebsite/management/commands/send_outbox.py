@@ -0,0 +1,40 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from impalawebsite.outbox import OutboxWorker, release_stuck
+
+
+class Command(BaseCommand):
+    help = "Deliver queued outbox emails in batches over a pool of reused mail connections."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, help="Number of parallel mail connections (OUTBOX_WORKERS).")
+        parser.add_argument('--batch-size', type=int, help="Rows claimed per batch (OUTBOX_BATCH_SIZE).")
+        parser.add_argument('--max-batches', type=int, help="Stop after this many batches.")
+        parser.add_argument('--loop', action='store_true', help="Keep polling for new rows instead of exiting when idle.")
+        parser.add_argument('--sleep', type=float, default=5.0, help="Seconds to wait between polls with --loop.")
+
+    def handle(self, *args, **options):
+        total_sent = total_retried = total_failed = 0
+        with OutboxWorker(workers=options['workers'], batch_size=options['batch_size']) as worker:
+            while True:
+                # Every poll, so a --loop worker also picks up rows a crashed one left behind.
+                released = release_stuck()
+                if released:
+                    self.stdout.write(f"Requeued {released} emails left in 'sending' past the lease.")
+                for stats in worker.drain(max_batches=options['max_batches']):
+                    total_sent += stats.sent
+                    total_retried += stats.retried
+                    total_failed += stats.failed
+                    self.stdout.write(
+                        f"batch: claimed={stats.claimed} sent={stats.sent} retried={stats.retried} "
+                        f"failed={stats.failed} in {stats.seconds:.2f}s ({stats.rate:.1f} msg/s)"
+                    )
+                if not options['loop']:
+                    break
+                time.sleep(options['sleep'])
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Outbox drained: sent={total_sent} retried={total_retried} failed={total_failed}"
+        ))
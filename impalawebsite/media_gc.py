@@ -0,0 +1,169 @@
+import posixpath
+import re
+from collections import defaultdict
+from dataclasses import dataclass
+from datetime import timedelta
+from urllib.parse import unquote
+
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.utils import timezone
+from django_summernote.utils import get_attachment_model
+
+from . import prerender
+from .caching import invalidate_all
+from .images import RENDITION_ROOT
+from .models import Article, ImageRenditionSet
+from .rendering import render_in_batches
+from .storage import ContentAddressedStorage, content_addressed_storage, file_sha256
+
+COVER_ROOT = 'article_covers'
+ATTACHMENT_ROOT = 'django-summernote'
+MANAGED_ROOTS = (COVER_ROOT, ATTACHMENT_ROOT, RENDITION_ROOT)
+
+
+def _media_url_re():
+    return re.compile(re.escape(settings.MEDIA_URL) + r'''([^"'\s<>()?#]+)''')
+
+
+def body_references():
+    """Storage names of every media file linked from an article body."""
+    pattern = _media_url_re()
+    names = set()
+    for body in Article.objects.values_list('body', flat=True).iterator(chunk_size=200):
+        names.update(unquote(match) for match in pattern.findall(body or ''))
+    return names
+
+
+def referenced_names():
+    covers = Article.objects.exclude(featured_image='').exclude(featured_image__isnull=True)
+    return set(covers.values_list('featured_image', flat=True)) | body_references()
+
+
+def walk(root):
+    if not default_storage.exists(root):
+        return
+    directories, files = default_storage.listdir(root)
+    for name in files:
+        yield posixpath.join(root, name)
+    for directory in directories:
+        yield from walk(posixpath.join(root, directory))
+
+
+@dataclass
+class MediaReport:
+    scanned_files: int = 0
+    scanned_bytes: int = 0
+    duplicate_files: int = 0
+    duplicate_bytes: int = 0
+
+
+def duplicate_groups(names):
+    """Group stored files by content hash; only groups with more than one file are returned."""
+    groups = defaultdict(list)
+    for name in names:
+        with default_storage.open(name, 'rb') as fp:
+            groups[file_sha256(fp)].append(name)
+    return {digest: group for digest, group in groups.items() if len(group) > 1}
+
+
+def scan(report=None):
+    report = report or MediaReport()
+    for root in (COVER_ROOT, ATTACHMENT_ROOT):
+        names = list(walk(root))
+        report.scanned_files += len(names)
+        report.scanned_bytes += sum(default_storage.size(name) for name in names)
+        for group in duplicate_groups(names).values():
+            report.duplicate_files += len(group) - 1
+            report.duplicate_bytes += sum(default_storage.size(name) for name in group[1:])
+    return report
+
+
+def find_orphans(min_age=timedelta(hours=24)):
+    """
+    Yield ``(name, size)`` for managed media that nothing references.
+
+    Files younger than ``min_age`` are skipped so an attachment uploaded into an
+    article that has not been saved yet is not collected from under its author.
+    """
+    referenced = referenced_names()
+    kept_hashes = set(
+        ImageRenditionSet.objects.filter(source__in=referenced).exclude(source_hash='')
+        .values_list('source_hash', flat=True)
+    )
+    cutoff = timezone.now() - min_age
+    for root in MANAGED_ROOTS:
+        for name in walk(root):
+            if root == RENDITION_ROOT:
+                # renditions/<hh>/<sha256>/<width>.<ext>
+                if name.split('/')[2] in kept_hashes:
+                    continue
+            elif name in referenced:
+                continue
+            if default_storage.get_modified_time(name) > cutoff:
+                continue
+            yield name, default_storage.size(name)
+
+
+def delete_orphans(orphans):
+    names = [name for name, _ in orphans]
+    for name in names:
+        default_storage.delete(name)
+    get_attachment_model().objects.filter(file__in=names).delete()
+    ImageRenditionSet.objects.filter(source__in=names).delete()
+    return len(names)
+
+
+def _rewrite_reference(old, new):
+    Article.objects.filter(featured_image=old).update(featured_image=new)
+    get_attachment_model().objects.filter(file=old).update(file=new)
+
+    stale = ImageRenditionSet.objects.filter(source=old).first()
+    if stale is None:
+        return
+    current = ImageRenditionSet.objects.filter(source=new).first()
+    if current is None:
+        stale.source = new
+        stale.save(update_fields=['source'])
+    else:
+        Article.objects.filter(cover_renditions=stale).update(cover_renditions=current)
+        stale.delete()
+
+
+def adopt_legacy_files():
+    """
+    Move pre-existing uploads into the content-addressed layout and repoint references.
+
+    Duplicate uploads collapse onto one hashed file; the old copies become
+    unreferenced and are picked up by ``find_orphans``. Returns ``{old: new}``.
+    """
+    attachments = get_attachment_model().objects.values_list('file', flat=True)
+    candidates = referenced_names() | set(attachments)
+    moved = {}
+    for name in sorted(candidates):
+        if name.split('/')[0] not in (COVER_ROOT, ATTACHMENT_ROOT):
+            continue
+        if ContentAddressedStorage.is_hashed_name(name) or not default_storage.exists(name):
+            continue
+        with default_storage.open(name, 'rb') as fp:
+            moved[name] = content_addressed_storage.save(name, fp)
+
+    for old, new in moved.items():
+        _rewrite_reference(old, new)
+
+    if moved:
+        replacements = {settings.MEDIA_URL + old: settings.MEDIA_URL + new for old, new in moved.items()}
+        alternatives = '|'.join(re.escape(url) for url in sorted(replacements, key=len, reverse=True))
+        pattern = re.compile(f'''(?:{alternatives})(?=["'\\s<>()?#]|$)''')
+        changed = []
+        for pk, body in Article.objects.values_list('pk', 'body').iterator(chunk_size=200):
+            updated = pattern.sub(lambda match: replacements[match.group(0)], body or '')
+            if updated != body:
+                # Same content, new URLs: skip save() so updated_at and signals stay untouched.
+                Article.objects.filter(pk=pk).update(body=updated)
+                changed.append(pk)
+        render_in_batches(Article.objects.filter(pk__in=changed))
+        # Cover URLs were rewritten with update() as well; drop every cached and pre-rendered page.
+        invalidate_all()
+        prerender.queue()
+    return moved
@@ -0,0 +1,43 @@
+import html
+
+from django.db import migrations
+from django.utils.html import strip_tags
+
+
+FTS_TABLE = "impalawebsite_article_fts"
+
+
+def create_fts_table(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    Article = apps.get_model('impalawebsite', 'Article')
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute(
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} "
+            "USING fts5(title, body, keywords, tokenize='porter unicode61')"
+        )
+        rows = [
+            (pk, title, " ".join(html.unescape(strip_tags(body or "")).split()), keywords)
+            for pk, title, body, keywords in Article.objects.values_list('pk', 'title', 'body', 'keywords')
+        ]
+        cursor.executemany(
+            f"INSERT INTO {FTS_TABLE} (rowid, title, body, keywords) VALUES (%s, %s, %s, %s)", rows
+        )
+
+
+def drop_fts_table(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute(f"DROP TABLE IF EXISTS {FTS_TABLE}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('impalawebsite', '0003_outboxemail'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_fts_table, drop_fts_table),
+    ]
@@ -0,0 +1,48 @@
+# Generated by Django 5.2.6 on 2026-10-18 11:19
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('impalawebsite', '0004_article_fts'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Keyword',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100)),
+                ('slug', models.SlugField(max_length=100, unique=True)),
+                ('article_count', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'ordering': ['name'],
+            },
+        ),
+        migrations.CreateModel(
+            name='ArticleKeyword',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('position', models.PositiveSmallIntegerField(default=0)),
+                ('article', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='keyword_links', to='impalawebsite.article')),
+                ('keyword', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='article_links', to='impalawebsite.keyword')),
+            ],
+        ),
+        migrations.AddField(
+            model_name='article',
+            name='tags',
+            field=models.ManyToManyField(blank=True, related_name='articles', through='impalawebsite.ArticleKeyword', to='impalawebsite.keyword'),
+        ),
+        migrations.AddIndex(
+            model_name='articlekeyword',
+            index=models.Index(fields=['keyword', 'article'], name='articlekeyword_keyword_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='articlekeyword',
+            constraint=models.UniqueConstraint(fields=('article', 'keyword'), name='unique_article_keyword'),
+        ),
+    ]
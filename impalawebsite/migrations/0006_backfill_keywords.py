@@ -0,0 +1,58 @@
+from collections import Counter
+
+from django.db import migrations
+from django.utils.text import slugify
+
+
+def parse_keywords(value):
+    names, seen = [], set()
+    for raw in (value or '').split(','):
+        name = ' '.join(raw.split())
+        slug = slugify(name)[:100]
+        if slug and slug not in seen:
+            seen.add(slug)
+            names.append((slug, name))
+    return names
+
+
+def backfill_keywords(apps, schema_editor):
+    Article = apps.get_model('impalawebsite', 'Article')
+    Keyword = apps.get_model('impalawebsite', 'Keyword')
+    ArticleKeyword = apps.get_model('impalawebsite', 'ArticleKeyword')
+
+    parsed = {pk: parse_keywords(value) for pk, value in Article.objects.values_list('pk', 'keywords')}
+    counts = Counter(slug for names in parsed.values() for slug, _ in names)
+    first_name = {}
+    for names in parsed.values():
+        for slug, name in names:
+            first_name.setdefault(slug, name)
+
+    Keyword.objects.bulk_create(
+        [Keyword(slug=slug, name=first_name[slug], article_count=count) for slug, count in counts.items()],
+        batch_size=500,
+    )
+    keyword_ids = dict(Keyword.objects.values_list('slug', 'pk'))
+    ArticleKeyword.objects.bulk_create(
+        [
+            ArticleKeyword(article_id=pk, keyword_id=keyword_ids[slug], position=position)
+            for pk, names in parsed.items()
+            for position, (slug, _) in enumerate(names)
+        ],
+        batch_size=500,
+    )
+
+
+def clear_keywords(apps, schema_editor):
+    apps.get_model('impalawebsite', 'ArticleKeyword').objects.all().delete()
+    apps.get_model('impalawebsite', 'Keyword').objects.all().delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('impalawebsite', '0005_keywords'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_keywords, clear_keywords),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.6 on 2026-10-18 11:24
+
+import impalawebsite.storage
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('impalawebsite', '0007_image_renditions'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='article',
+            name='featured_image',
+            field=models.ImageField(blank=True, null=True, storage=impalawebsite.storage.get_content_addressed_storage, upload_to='article_covers/'),
+        ),
+    ]
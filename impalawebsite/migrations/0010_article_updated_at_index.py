@@ -0,0 +1,18 @@
+# Generated by Django 5.2.6 on 2026-10-18 11:33
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('impalawebsite', '0009_rendered_body'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='article',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, db_index=True),
+        ),
+    ]
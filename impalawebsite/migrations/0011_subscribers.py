@@ -0,0 +1,28 @@
+# Generated by Django 5.2.6 on 2026-10-18 11:43
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('impalawebsite', '0010_article_updated_at_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Subscriber',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('email', models.EmailField(max_length=254, unique=True)),
+                ('name', models.CharField(max_length=100)),
+                ('is_active', models.BooleanField(default=True)),
+                ('subscribed_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('unsubscribed_at', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'indexes': [models.Index(condition=models.Q(('is_active', True)), fields=['id'], name='subscriber_active_idx')],
+            },
+        ),
+    ]
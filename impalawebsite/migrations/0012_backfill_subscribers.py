@@ -0,0 +1,40 @@
+from django.db import migrations
+
+
+def backfill_subscribers(apps, schema_editor):
+    """One Subscriber per distinct consenting email; the most recent submission supplies the name."""
+    ContactMessage = apps.get_model('impalawebsite', 'ContactMessage')
+    Subscriber = apps.get_model('impalawebsite', 'Subscriber')
+
+    latest = {}
+    contacts = (
+        ContactMessage.objects.filter(consent_email_updates=True)
+        .order_by('submitted_at', 'pk')
+        .values_list('name', 'email', 'submitted_at')
+    )
+    for name, email, submitted_at in contacts.iterator(chunk_size=2000):
+        email = (email or '').strip().lower()
+        if not email:
+            continue
+        first_seen = latest[email][1] if email in latest else submitted_at
+        latest[email] = (name, first_seen)
+
+    Subscriber.objects.bulk_create(
+        [Subscriber(email=email, name=name, subscribed_at=first_seen) for email, (name, first_seen) in latest.items()],
+        batch_size=500,
+    )
+
+
+def clear_subscribers(apps, schema_editor):
+    apps.get_model('impalawebsite', 'Subscriber').objects.all().delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('impalawebsite', '0011_subscribers'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_subscribers, clear_subscribers),
+    ]
@@ -0,0 +1,40 @@
+# Generated by Django 5.2.6 on 2026-10-18 12:02
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('impalawebsite', '0012_backfill_subscribers'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='article',
+            name='author',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddIndex(
+            model_name='article',
+            index=models.Index(fields=['-created_at', '-id'], name='article_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='article',
+            index=models.Index(fields=['author', '-created_at'], name='article_author_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='contactmessage',
+            index=models.Index(fields=['submitted_at'], name='contact_submitted_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='contactmessage',
+            index=models.Index(condition=models.Q(('consent_email_updates', True)), fields=['id', 'submitted_at'], name='contact_consented_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='keyword',
+            index=models.Index(fields=['-article_count', 'name'], name='keyword_popular_idx'),
+        ),
+    ]
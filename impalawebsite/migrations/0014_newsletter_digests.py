@@ -0,0 +1,36 @@
+# Generated by Django 5.2.6 on 2026-10-18 12:32
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('impalawebsite', '0013_query_plan_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='NewsletterDigest',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('period_start', models.DateTimeField(unique=True)),
+                ('period_end', models.DateTimeField()),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('done', 'Done')], default='pending', max_length=10)),
+                ('articles', models.PositiveIntegerField(default=0)),
+                ('last_subscriber_id', models.BigIntegerField(default=0)),
+                ('emails_queued', models.PositiveIntegerField(default=0)),
+                ('emails_avoided', models.PositiveIntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('completed_at', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'ordering': ['-period_start'],
+            },
+        ),
+        migrations.AddField(
+            model_name='subscriber',
+            name='delivery',
+            field=models.CharField(choices=[('immediate', 'One email per article'), ('digest', 'One digest per period')], default='immediate', max_length=10),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.6 on 2026-10-18 12:52
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('impalawebsite', '0014_newsletter_digests'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PendingPrerender',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('article_id', models.BigIntegerField(blank=True, null=True)),
+                ('first_page', models.PositiveIntegerField(blank=True, null=True)),
+                ('shifted', models.BooleanField(default=False)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+    ]
@@ -0,0 +1,27 @@
+from django.db import migrations
+
+
+def backfill_rendered_body(apps, schema_editor):
+    """Render ``body_html``, ``excerpt`` and ``reading_time`` for articles saved before 0009 added them."""
+    from impalawebsite.rendering import RENDERED_FIELDS, render_article_body
+
+    Article = apps.get_model('impalawebsite', 'Article')
+    queryset = Article.objects.filter(body_html='').only('pk', 'body').order_by('pk')
+    last_pk = 0
+    while True:
+        batch = [render_article_body(article) for article in queryset.filter(pk__gt=last_pk)[:200]]
+        if not batch:
+            return
+        Article.objects.bulk_update(batch, RENDERED_FIELDS)
+        last_pk = batch[-1].pk
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('impalawebsite', '0015_pending_prerender'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_rendered_body, migrations.RunPython.noop),
+    ]
@@ -1,7 +1,9 @@
 from django.contrib.auth.models import AbstractBaseUser, BaseUserManager, PermissionsMixin
 from django.db import models
 from django.utils import timezone
+from django.utils.text import slugify
 from .fields import SafeSummernoteField
+from .storage import get_content_addressed_storage
 from django.conf import settings
 
 
@@ -16,28 +18,277 @@ class ContactMessage(models.Model):
     )
     submitted_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            # Date-bounded exports (exports.contact_queryset).
+            models.Index(fields=['submitted_at'], name='contact_submitted_idx'),
+            # Consenting contacts are a small slice of the table; this walks just them in pk
+            # order (the export order) and filters on submitted_at without touching the rows.
+            models.Index(
+                fields=['id', 'submitted_at'], condition=models.Q(consent_email_updates=True),
+                name='contact_consented_idx',
+            ),
+        ]
+
     def __str__(self):
         return f"{self.name} - {self.email}"
 
 
+class Subscriber(models.Model):
+    """
+    One row per newsletter recipient, keyed by normalized email.
+
+    Maintained from ContactMessage rows that carry consent (see signals.py) and
+    from the unsubscribe link, so a person who wrote in three times still gets
+    one copy of every newsletter.
+    """
+    class Delivery(models.TextChoices):
+        IMMEDIATE = 'immediate', 'One email per article'
+        DIGEST = 'digest', 'One digest per period'
+
+    email = models.EmailField(unique=True)
+    name = models.CharField(max_length=100)
+    is_active = models.BooleanField(default=True)
+    delivery = models.CharField(max_length=10, choices=Delivery.choices, default=Delivery.IMMEDIATE)
+    subscribed_at = models.DateTimeField(default=timezone.now)
+    unsubscribed_at = models.DateTimeField(blank=True, null=True)
+
+    class Meta:
+        indexes = [
+            # Recipient selection only ever reads active rows.
+            models.Index(fields=['id'], condition=models.Q(is_active=True), name='subscriber_active_idx'),
+        ]
+
+    def __str__(self):
+        return self.email if self.is_active else f"{self.email} (unsubscribed)"
+
+    @staticmethod
+    def normalize_email(email):
+        return (email or '').strip().lower()
+
+
+class ArticleQuerySet(models.QuerySet):
+    def with_keywords(self):
+        """Prefetch normalized keywords (one extra query) so keyword_list() never hits the DB."""
+        return self.prefetch_related(
+            models.Prefetch(
+                'keyword_links',
+                queryset=ArticleKeyword.objects.select_related('keyword').order_by('position'),
+            )
+        )
+
+    def tagged(self, keyword):
+        """Articles carrying ``keyword``, resolved through the indexed slug rather than LIKE."""
+        return self.filter(keyword_links__keyword__slug=Keyword.make_slug(keyword))
+
+
 class Article(models.Model):
-    author = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
+    # Indexed by article_author_created_idx below, which also serves plain author lookups.
+    author = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, db_index=False)
     title = models.CharField(max_length=200)
     body = models.TextField()
-    featured_image = models.ImageField(upload_to='article_covers/', blank=True, null=True)
+    # Derived from body on every save (rendering.render_article_body); read paths use these.
+    body_html = models.TextField(blank=True, editable=False)
+    excerpt = models.CharField(max_length=300, blank=True, editable=False)
+    reading_time = models.PositiveSmallIntegerField(default=1, editable=False, help_text="Minutes")
+    featured_image = models.ImageField(
+        upload_to='article_covers/', storage=get_content_addressed_storage, blank=True, null=True
+    )
+    cover_renditions = models.ForeignKey(
+        'ImageRenditionSet', on_delete=models.SET_NULL, blank=True, null=True, editable=False, related_name='+'
+    )
+    # Editing surface for authors; Keyword/ArticleKeyword are synced from it on save.
     keywords = models.CharField(max_length=255, help_text="Comma-separated keywords")
+    tags = models.ManyToManyField('Keyword', through='ArticleKeyword', related_name='articles', blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
-    updated_at = models.DateTimeField(auto_now=True)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)  # Max() drives ETag/Last-Modified
+
+    objects = ArticleQuerySet.as_manager()
 
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            # Every listing is ``ORDER BY created_at DESC, id DESC`` (keyset pagination).
+            models.Index(fields=['-created_at', '-id'], name='article_created_idx'),
+            # An author's articles, newest first; the author_id prefix also covers FK lookups and cascades.
+            models.Index(fields=['author', '-created_at'], name='article_author_created_idx'),
+        ]
 
     def __str__(self):
         return self.title
 
+    def save(self, *args, **kwargs):
+        from .rendering import RENDERED_FIELDS, render_article_body
+
+        update_fields = kwargs.get('update_fields')
+        if update_fields is None or 'body' in update_fields:
+            render_article_body(self)
+            if update_fields is not None:
+                kwargs['update_fields'] = {*update_fields, *RENDERED_FIELDS}
+        super().save(*args, **kwargs)
+
     def keyword_list(self):
-        return [k.strip() for k in self.keywords.split(',') if k.strip()]
-    
+        if 'keyword_links' in getattr(self, '_prefetched_objects_cache', {}):
+            return [link.keyword.name for link in self.keyword_links.all()]
+        return Keyword.parse(self.keywords)
+
+
+class Keyword(models.Model):
+    name = models.CharField(max_length=100)
+    slug = models.SlugField(max_length=100, unique=True)
+    # Maintained incrementally by keywords.sync_article_keywords, never recounted.
+    article_count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        ordering = ['name']
+        indexes = [
+            # KeywordViewSet: keywords in use, most used first.
+            models.Index(fields=['-article_count', 'name'], name='keyword_popular_idx'),
+        ]
+
+    def __str__(self):
+        return self.name
+
+    @staticmethod
+    def make_slug(name):
+        return slugify(name)[:100]
+
+    @staticmethod
+    def parse(value):
+        """Split a comma-separated string into trimmed names, dropping blanks and duplicates."""
+        names, seen = [], set()
+        for raw in (value or '').split(','):
+            name = ' '.join(raw.split())
+            slug = Keyword.make_slug(name)
+            if slug and slug not in seen:
+                seen.add(slug)
+                names.append(name)
+        return names
+
+
+class ArticleKeyword(models.Model):
+    article = models.ForeignKey(Article, on_delete=models.CASCADE, related_name='keyword_links')
+    keyword = models.ForeignKey(Keyword, on_delete=models.CASCADE, related_name='article_links')
+    position = models.PositiveSmallIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['article', 'keyword'], name='unique_article_keyword'),
+        ]
+        indexes = [
+            # Serves "articles tagged X" without touching the article table first.
+            models.Index(fields=['keyword', 'article'], name='articlekeyword_keyword_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.article_id} - {self.keyword_id}"
+
+
+class ImageRenditionSet(models.Model):
+    """
+    Resized WebP/JPEG copies of one stored image (a cover or a Summernote upload).
+
+    Rows are queued as PENDING when an image is uploaded and filled in by the
+    ``process_images`` command; the files live under ``renditions/<sha256>/``.
+    """
+    class Status(models.TextChoices):
+        PENDING = 'pending', 'Pending'
+        READY = 'ready', 'Ready'
+        FAILED = 'failed', 'Failed'
+
+    source = models.CharField(max_length=255, unique=True, help_text="Storage name of the original image.")
+    source_hash = models.CharField(max_length=64, blank=True, db_index=True)
+    width = models.PositiveIntegerField(blank=True, null=True)
+    height = models.PositiveIntegerField(blank=True, null=True)
+    widths = models.JSONField(default=list, blank=True)
+    status = models.CharField(max_length=10, choices=Status.choices, default=Status.PENDING)
+    error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    processed_at = models.DateTimeField(blank=True, null=True)
+
+    def __str__(self):
+        return f"{self.source} ({self.status})"
+
+
+class PendingPrerender(models.Model):
+    """
+    Pre-rendered pages (see prerender.py) waiting to be rebuilt by
+    ``manage.py prerender --pending``. Rows are written in the same transaction
+    as the change, so saving an article never renders anything itself.
+    """
+    # Not a foreign key: deleted articles are queued too. None rebuilds everything.
+    article_id = models.BigIntegerField(blank=True, null=True)
+    # List page the change starts on; None means the page the article is on when rendered.
+    first_page = models.PositiveIntegerField(blank=True, null=True)
+    # True when later list pages moved (an article was added or removed).
+    shifted = models.BooleanField(default=False)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"Prerender article {self.article_id}" if self.article_id else "Prerender everything"
+
+
+class NewsletterDigest(models.Model):
+    """
+    One digest period: the articles created in [period_start, period_end),
+    mailed once to every digest subscriber by the ``send_digest`` command.
+
+    ``last_subscriber_id`` advances in the same transaction as each batch of
+    queued emails, so a run that crashed resumes after the last committed
+    batch instead of mailing anyone twice.
+    """
+    class Status(models.TextChoices):
+        PENDING = 'pending', 'Pending'
+        DONE = 'done', 'Done'
+
+    period_start = models.DateTimeField(unique=True)
+    period_end = models.DateTimeField()
+    status = models.CharField(max_length=10, choices=Status.choices, default=Status.PENDING)
+    articles = models.PositiveIntegerField(default=0)
+    last_subscriber_id = models.BigIntegerField(default=0)
+    emails_queued = models.PositiveIntegerField(default=0)
+    # Emails the same subscribers would have received with immediate delivery, minus the digests.
+    emails_avoided = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+    completed_at = models.DateTimeField(blank=True, null=True)
+
+    class Meta:
+        ordering = ['-period_start']
+
+    def __str__(self):
+        return f"Digest {self.period_start:%Y-%m-%d %H:%M} ({self.status})"
+
+
+class OutboxEmail(models.Model):
+    """
+    A queued outgoing email. Rows are written in bulk by signals and drained
+    by the ``send_outbox`` management command, so no request ever talks SMTP.
+    """
+    class Status(models.TextChoices):
+        PENDING = 'pending', 'Pending'
+        SENDING = 'sending', 'Sending'
+        SENT = 'sent', 'Sent'
+        FAILED = 'failed', 'Failed'
+
+    recipient = models.EmailField()
+    subject = models.CharField(max_length=255)
+    body = models.TextField()
+    from_email = models.CharField(max_length=255, blank=True)
+    status = models.CharField(max_length=10, choices=Status.choices, default=Status.PENDING)
+    attempts = models.PositiveIntegerField(default=0)
+    available_at = models.DateTimeField(default=timezone.now)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(blank=True, null=True)
+
+    class Meta:
+        ordering = ['available_at', 'pk']
+        indexes = [
+            models.Index(fields=['status', 'available_at'], name='outbox_status_available_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.subject} -> {self.recipient} ({self.status})"
 
 
 class CustomUserManager(BaseUserManager):
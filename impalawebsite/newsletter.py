@@ -0,0 +1,172 @@
+"""
+Newsletter emails about new articles.
+
+Each subscriber picks a delivery (``Subscriber.delivery``). IMMEDIATE
+subscribers are mailed as articles are published (``queue_newsletter``,
+called from signals.py). DIGEST subscribers get one email per
+NEWSLETTER_DIGEST_HOURS period listing everything published in it, queued by
+``manage.py send_digest`` from cron. Both only write outbox rows; send_outbox
+delivers them.
+
+Periods are aligned to whole multiples of the period length (in UTC), and a
+digest covers everything since the previous one, so periods missed while
+cron was down are folded into the next digest instead of sent one by one.
+"""
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, Sum
+from django.urls import reverse
+from django.utils import timezone
+
+from .models import Article, NewsletterDigest, Subscriber
+from .outbox import enqueue_emails
+from .subscribers import active_subscribers
+from .utils import make_unsubscribe_token
+
+_EPOCH = datetime(2000, 1, 1, tzinfo=dt_timezone.utc)
+
+
+def site_url():
+    return getattr(settings, "SITE_URL", "http://127.0.0.1:8000")
+
+
+def digest_period():
+    return timedelta(hours=getattr(settings, 'NEWSLETTER_DIGEST_HOURS', 24))
+
+
+def period_start(moment):
+    """Start of the digest period containing ``moment``."""
+    period = digest_period()
+    return _EPOCH + (moment - _EPOCH) // period * period
+
+
+def announcement(articles):
+    """``(subject, text)`` announcing ``articles``."""
+    links = [(article.title, site_url() + reverse('article_detail', args=[article.pk])) for article in articles]
+    if len(links) == 1:
+        subject = f"New Article: {links[0][0]}"
+        text = (
+            f"A new article from Impala Health Tech Research Limited has been published: {links[0][0]}\n"
+            f"Read it here: {links[0][1]}\n\n"
+        )
+    else:
+        subject = f"{len(links)} new articles from Impala Health Tech Research Limited"
+        text = (
+            f"{len(links)} new articles from Impala Health Tech Research Limited have been published:\n"
+            + "".join(f"- {title}: {url}\n" for title, url in links)
+            + "\n"
+        )
+    return subject, text
+
+
+def _messages(subscribers, subject, text):
+    """``(recipient, subject, body)`` for each subscriber, with their own preference and unsubscribe links."""
+    for subscriber in subscribers:
+        token = make_unsubscribe_token(subscriber)
+        if subscriber.delivery == Subscriber.Delivery.DIGEST:
+            switch = "Prefer an email for every new article? Switch here:\n"
+            switch_url = reverse('newsletter_immediate', args=[token])
+        else:
+            switch = "Prefer a single digest of new articles instead? Switch here:\n"
+            switch_url = reverse('newsletter_digest', args=[token])
+        body = (
+            f"Hello {subscriber.name},\n\n"
+            f"{text}"
+            f"{switch}{site_url()}{switch_url}\n\n"
+            f"If you no longer wish to receive these updates, "
+            f"you can unsubscribe here:\n{site_url()}{reverse('unsubscribe', args=[token])}\n"
+        )
+        yield subscriber.email, subject, body
+
+
+def queue_newsletter(articles):
+    """Queue one email per immediate-delivery subscriber; digest subscribers get these in the next digest."""
+    subject, text = announcement(articles)
+    recipients = active_subscribers(Subscriber.Delivery.IMMEDIATE).iterator()
+    enqueue_emails(list(_messages(recipients, subject, text)))
+
+
+def open_digest(now=None):
+    """
+    The digest to work on: a pending one left by an interrupted run, else a new
+    one from the end of the previous digest to the start of the current period.
+    None when the last completed period already has its digest.
+    """
+    pending = NewsletterDigest.objects.filter(status=NewsletterDigest.Status.PENDING).order_by('period_start').first()
+    if pending is not None:
+        return pending
+    end = period_start(now or timezone.now())
+    start = NewsletterDigest.objects.order_by('-period_end').values_list('period_end', flat=True).first()
+    start = start or end - digest_period()
+    if start >= end:
+        return None
+    digest, _ = NewsletterDigest.objects.get_or_create(period_start=start, defaults={'period_end': end})
+    return digest
+
+
+def send_digest(digest, batch_size=None):
+    """
+    Queue ``digest`` for every active digest subscriber, ``batch_size`` at a
+    time. Each batch commits together with the subscriber cursor, so calling
+    this again after a crash picks up where the last batch left off.
+    """
+    batch_size = batch_size or getattr(settings, 'NEWSLETTER_DIGEST_BATCH_SIZE', 500)
+    articles = list(
+        Article.objects.filter(created_at__gte=digest.period_start, created_at__lt=digest.period_end)
+        .only('pk', 'title').order_by('created_at', 'pk')
+    )
+    subject, text = announcement(articles) if articles else (None, None)
+    while True:
+        with transaction.atomic():
+            digest = NewsletterDigest.objects.select_for_update().get(pk=digest.pk)
+            if digest.status == NewsletterDigest.Status.DONE:
+                return digest
+            batch = []
+            if articles:
+                batch = list(
+                    active_subscribers(Subscriber.Delivery.DIGEST)
+                    .filter(pk__gt=digest.last_subscriber_id)[:batch_size]
+                )
+            if batch:
+                enqueue_emails(list(_messages(batch, subject, text)))
+                digest.last_subscriber_id = batch[-1].pk
+                digest.emails_queued += len(batch)
+                digest.emails_avoided += len(batch) * (len(articles) - 1)
+            digest.articles = len(articles)
+            if len(batch) < batch_size:
+                digest.status = NewsletterDigest.Status.DONE
+                digest.completed_at = timezone.now()
+            digest.save()
+        if digest.status == NewsletterDigest.Status.DONE:
+            return digest
+
+
+def send_due_digests(now=None, batch_size=None):
+    """Finish any interrupted digest, then send the one for the periods since; returns the digests sent."""
+    sent = []
+    while (digest := open_digest(now)) is not None:
+        sent.append(send_digest(digest, batch_size))
+    return sent
+
+
+def digest_stats():
+    """Totals over completed digests and active subscribers per delivery, for the monitoring endpoint."""
+    totals = NewsletterDigest.objects.filter(status=NewsletterDigest.Status.DONE).aggregate(
+        digests=Count('pk'), articles=Sum('articles'),
+        emails_queued=Sum('emails_queued'), emails_avoided=Sum('emails_avoided'),
+    )
+    deliveries = dict(
+        Subscriber.objects.filter(is_active=True).order_by()
+        .values_list('delivery').annotate(count=Count('pk')).values_list('delivery', 'count')
+    )
+    last = NewsletterDigest.objects.order_by('-period_start').first()
+    return {
+        **{name: value or 0 for name, value in totals.items()},
+        'subscribers': {delivery: deliveries.get(delivery, 0) for delivery in Subscriber.Delivery.values},
+        'last_digest': last and {
+            'period_start': last.period_start, 'period_end': last.period_end, 'status': last.status,
+            'articles': last.articles, 'emails_queued': last.emails_queued, 'emails_avoided': last.emails_avoided,
+        },
+    }
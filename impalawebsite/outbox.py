@@ -0,0 +1,192 @@
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db import transaction
+from django.utils import timezone
+
+from .models import OutboxEmail
+
+logger = logging.getLogger(__name__)
+
+
+def outbox_setting(name, default):
+    return getattr(settings, name, default)
+
+
+def enqueue_emails(messages):
+    """
+    Queue ``(recipient, subject, body)`` tuples for delivery with one bulk INSERT.
+    """
+    from_email = settings.DEFAULT_FROM_EMAIL
+    rows = [
+        OutboxEmail(recipient=recipient, subject=subject, body=body, from_email=from_email)
+        for recipient, subject, body in messages
+    ]
+    return OutboxEmail.objects.bulk_create(rows, batch_size=outbox_setting('OUTBOX_INSERT_BATCH_SIZE', 500))
+
+
+@dataclass
+class BatchStats:
+    claimed: int = 0
+    sent: int = 0
+    retried: int = 0
+    failed: int = 0
+    seconds: float = 0.0
+
+    @property
+    def rate(self):
+        return self.sent / self.seconds if self.seconds else 0.0
+
+
+def claim_batch(batch_size):
+    """Mark up to ``batch_size`` due rows as SENDING and return them."""
+    now = timezone.now()
+    with transaction.atomic():
+        ids = list(
+            OutboxEmail.objects
+            .filter(status=OutboxEmail.Status.PENDING, available_at__lte=now)
+            .order_by('available_at', 'pk')
+            .values_list('pk', flat=True)[:batch_size]
+        )
+        if not ids:
+            return []
+        # available_at doubles as the claim time so release_stuck() can spot
+        # rows abandoned by a crashed worker.
+        OutboxEmail.objects.filter(pk__in=ids).update(status=OutboxEmail.Status.SENDING, available_at=now)
+    return list(OutboxEmail.objects.filter(pk__in=ids).order_by('pk'))
+
+
+def _send_chunk(connection, emails):
+    """Send ``emails`` over one already-open connection; returns (email, error) pairs."""
+    results = []
+    for email in emails:
+        message = EmailMessage(
+            email.subject,
+            email.body,
+            email.from_email or settings.DEFAULT_FROM_EMAIL,
+            [email.recipient],
+            connection=connection,
+        )
+        try:
+            message.send(fail_silently=False)
+            results.append((email, None))
+        except Exception as exc:
+            results.append((email, exc))
+            _reset_connection(connection)
+    return results
+
+
+def _reset_connection(connection):
+    # A transport error can leave the SMTP session unusable; reconnect so the
+    # rest of the chunk keeps reusing one connection instead of failing too.
+    try:
+        connection.close()
+        connection.open()
+    except Exception:
+        logger.warning("Could not reopen outbox mail connection", exc_info=True)
+
+
+def _retry_delay(attempts):
+    base = outbox_setting('OUTBOX_RETRY_BASE_SECONDS', 60)
+    ceiling = outbox_setting('OUTBOX_RETRY_MAX_SECONDS', 6 * 60 * 60)
+    return min(base * (2 ** (attempts - 1)), ceiling)
+
+
+def _record_results(results, stats):
+    now = timezone.now()
+    max_attempts = outbox_setting('OUTBOX_MAX_ATTEMPTS', 5)
+    sent_ids = []
+    for email, error in results:
+        if error is None:
+            sent_ids.append(email.pk)
+            continue
+        email.attempts += 1
+        email.last_error = f"{type(error).__name__}: {error}"
+        if email.attempts >= max_attempts:
+            email.status = OutboxEmail.Status.FAILED
+            stats.failed += 1
+        else:
+            email.status = OutboxEmail.Status.PENDING
+            email.available_at = now + timedelta(seconds=_retry_delay(email.attempts))
+            stats.retried += 1
+        email.save(update_fields=['attempts', 'last_error', 'status', 'available_at'])
+    if sent_ids:
+        OutboxEmail.objects.filter(pk__in=sent_ids).update(
+            status=OutboxEmail.Status.SENT, sent_at=now, last_error=''
+        )
+    stats.sent += len(sent_ids)
+
+
+class OutboxWorker:
+    """
+    Drains the outbox over a fixed pool of reused mail connections.
+
+    Only the calling thread touches the database; the pool threads just push
+    already-claimed messages through their own SMTP connection.
+    """
+
+    def __init__(self, workers=None, batch_size=None, backend=None):
+        self.workers = max(1, workers or outbox_setting('OUTBOX_WORKERS', 4))
+        self.batch_size = batch_size or outbox_setting('OUTBOX_BATCH_SIZE', 100)
+        self.connections = [get_connection(backend) for _ in range(self.workers)]
+        self.executor = None
+
+    def __enter__(self):
+        for connection in self.connections:
+            connection.open()
+        self.executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='outbox')
+        return self
+
+    def __exit__(self, *exc_info):
+        self.executor.shutdown(wait=True)
+        for connection in self.connections:
+            try:
+                connection.close()
+            except Exception:
+                logger.warning("Failed to close outbox mail connection", exc_info=True)
+
+    def process_batch(self):
+        started = time.perf_counter()
+        emails = claim_batch(self.batch_size)
+        stats = BatchStats(claimed=len(emails))
+        if not emails:
+            return stats
+
+        chunks = [emails[i::self.workers] for i in range(self.workers)]
+        futures = [
+            self.executor.submit(_send_chunk, connection, chunk)
+            for connection, chunk in zip(self.connections, chunks) if chunk
+        ]
+        results = [result for future in futures for result in future.result()]
+        _record_results(results, stats)
+
+        stats.seconds = time.perf_counter() - started
+        logger.info(
+            "outbox batch claimed=%d sent=%d retried=%d failed=%d seconds=%.3f rate=%.1f/s",
+            stats.claimed, stats.sent, stats.retried, stats.failed, stats.seconds, stats.rate,
+        )
+        return stats
+
+    def drain(self, max_batches=None):
+        """Process batches until nothing is due (or ``max_batches`` is hit)."""
+        batches = []
+        while max_batches is None or len(batches) < max_batches:
+            stats = self.process_batch()
+            if not stats.claimed:
+                break
+            batches.append(stats)
+        return batches
+
+
+def release_stuck(older_than_seconds=None):
+    """Return rows left in SENDING by a crashed worker to the queue."""
+    older_than_seconds = older_than_seconds or outbox_setting('OUTBOX_STUCK_SECONDS', 15 * 60)
+    cutoff = timezone.now() - timedelta(seconds=older_than_seconds)
+    return OutboxEmail.objects.filter(
+        status=OutboxEmail.Status.SENDING, available_at__lte=cutoff
+    ).update(status=OutboxEmail.Status.PENDING)
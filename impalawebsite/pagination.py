@@ -0,0 +1,68 @@
+import base64
+import binascii
+from datetime import datetime
+
+from django.conf import settings
+from django.db.models import Q
+from rest_framework.pagination import CursorPagination
+
+
+def articles_per_page():
+    return getattr(settings, "ARTICLES_PER_PAGE", 12)
+
+
+class ArticleCursorPagination(CursorPagination):
+    """Keyset pagination for the article API, newest first with pk as tie-breaker."""
+    ordering = ('-created_at', '-pk')
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+
+    def get_page_size(self, request):
+        self.page_size = articles_per_page()
+        return super().get_page_size(request)
+
+
+def encode_cursor(article):
+    raw = f"{article.created_at.isoformat()}|{article.pk}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor):
+    """Return ``(created_at, pk)`` for a cursor string, or ``None`` if it is malformed."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, pk = base64.urlsafe_b64decode(padded.encode()).decode().split("|")
+        return datetime.fromisoformat(created_at), int(pk)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        return None
+
+
+def _seek(queryset, cursor, page_size):
+    queryset = queryset.order_by('-created_at', '-pk')
+    position = decode_cursor(cursor) if cursor else None
+    if position:
+        created_at, pk = position
+        queryset = queryset.filter(Q(created_at__lt=created_at) | Q(created_at=created_at, pk__lt=pk))
+    return queryset[:page_size + 1]
+
+
+def _page(items, page_size):
+    next_cursor = encode_cursor(items[page_size - 1]) if len(items) > page_size else None
+    return items[:page_size], next_cursor
+
+
+def keyset_page(queryset, cursor=None, page_size=None):
+    """
+    Slice ``queryset`` (ordered by ``-created_at, -pk``) to the page after ``cursor``.
+
+    Uses a ``WHERE (created_at, pk) < (...)`` seek instead of OFFSET, so deep pages
+    cost the same as the first one. Returns ``(items, next_cursor)``.
+    """
+    page_size = page_size or articles_per_page()
+    return _page(list(_seek(queryset, cursor, page_size)), page_size)
+
+
+async def akeyset_page(queryset, cursor=None, page_size=None):
+    """:func:`keyset_page` for async views; prefetches run inside the async iteration."""
+    page_size = page_size or articles_per_page()
+    return _page([item async for item in _seek(queryset, cursor, page_size)], page_size)
@@ -0,0 +1,8 @@
+from rest_framework.permissions import BasePermission
+
+
+class IsSuperUser(BasePermission):
+    """CustomUser has no ``is_staff`` flag; superusers are the site's staff."""
+
+    def has_permission(self, request, view):
+        return bool(request.user and request.user.is_superuser)
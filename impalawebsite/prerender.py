@@ -0,0 +1,270 @@
+"""
+Static copies of the public article pages and API responses.
+
+Files go under PRERENDER_ROOT, named after the URL an anonymous visitor
+requests, so a web server can answer from disk and only fall back to Django
+for everything else (signed-in users, keyword filters, writes)::
+
+    /<pk>/                         <pk>/index.html
+    /list-articles/                list-articles/index.html
+    /list-articles/?cursor=<c>     list-articles/cursor/<c>.html
+    /api/articles/                 api/articles/index.json
+    /api/articles/?cursor=<c>      api/articles/cursor/<c>.json
+    /api/articles/<pk>/            api/articles/<pk>/index.json
+
+e.g. nginx: ``try_files /list-articles/cursor/$arg_cursor.html @django``.
+
+HTML pages carry the footer contact form, so, as in the page cache, the CSRF
+token is written as ``caching.CSRF_PLACEHOLDER``. The server fills in the
+visitor's ``csrftoken`` cookie (``sub_filter __impala_csrf_token__
+$cookie_csrftoken``; Django accepts the unmasked secret) and sends visitors
+without that cookie, or with a session, on to Django.
+
+Pages are rendered by the real views, and ``manifest.json`` records the
+SHA-256 of every file plus the cursor of every list page, so a rebuild
+rewrites only files whose content changed.
+
+Changes are queued, not rendered, on the request that makes them: saves,
+deletes, bulk imports and body/cover re-renders add PendingPrerender rows
+(``queue``), and ``manage.py prerender --pending`` from cron drains them in
+one build (``prerender_pending``). Only the changed articles' pages and the
+list pages from the one they sit on are rendered again (an edit leaves later
+pages where they are; a new or deleted article shifts them).
+
+Concurrent builds in several processes are not coordinated; the manifest is
+replaced atomically and a lost update only means a file is rewritten later.
+"""
+import hashlib
+import json
+import os
+import tempfile
+from pathlib import Path
+from urllib.parse import parse_qs, urlsplit
+
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser
+from django.db.models import Q
+from django.http import Http404
+from django.test import RequestFactory
+
+from .caching import without_csrf_token
+from .models import Article, PendingPrerender
+from .pagination import articles_per_page, keyset_page
+
+MANIFEST = 'manifest.json'
+KINDS = ('html', 'json')
+
+
+def output_root():
+    return Path(getattr(settings, 'PRERENDER_ROOT', settings.BASE_DIR / 'prerendered'))
+
+
+def detail_path(kind, pk):
+    return f'{pk}/index.html' if kind == 'html' else f'api/articles/{pk}/index.json'
+
+
+def list_path(kind, cursor):
+    folder, suffix = ('list-articles', 'html') if kind == 'html' else ('api/articles', 'json')
+    return f'{folder}/index.{suffix}' if cursor is None else f'{folder}/cursor/{cursor}.{suffix}'
+
+
+def _atomic_write(path, content):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix='.tmp-')
+    with os.fdopen(fd, 'wb') as target:
+        target.write(content)
+    os.replace(tmp, path)
+
+
+def page_index(created_at, pk):
+    """The list page (0-based) an article with this position is, or was, on."""
+    newer = Article.objects.filter(Q(created_at__gt=created_at) | Q(created_at=created_at, pk__gt=pk)).count()
+    return newer // articles_per_page()
+
+
+class Build:
+    def __init__(self, root=None):
+        self.root = Path(root) if root else output_root()
+        self.site = urlsplit(getattr(settings, 'SITE_URL', 'http://127.0.0.1:8000'))
+        self.factory = RequestFactory()
+        from . import views  # imported here: views -> bulk -> signals -> this module
+
+        self.views = {
+            'html_detail': views.article_detail,
+            'html_list': views.article_list,
+            'json_detail': views.ArticleViewSet.as_view({'get': 'retrieve'}),
+            'json_list': views.ArticleViewSet.as_view({'get': 'list'}),
+        }
+        self.written, self.unchanged, self.removed = [], 0, []
+        try:
+            manifest = json.loads((self.root / MANIFEST).read_text())
+        except (FileNotFoundError, ValueError):
+            manifest = {}
+        self.files = manifest.get('files', {})
+        self.cursors = {kind: manifest.get('cursors', {}).get(kind, [None]) for kind in KINDS}
+
+    # -- rendering -------------------------------------------------------
+
+    def request(self, path, **params):
+        request = self.factory.get(
+            path, params, secure=self.site.scheme == 'https', HTTP_HOST=self.site.netloc,
+            HTTP_ACCEPT='application/json' if path.startswith('/api/') else 'text/html',
+        )
+        request.user = AnonymousUser()
+        return request
+
+    def render(self, view, request, **kwargs):
+        """``(status, content, response)`` of an anonymous GET."""
+        try:
+            response = view(request, **kwargs)
+        except Http404:
+            return 404, b'', None
+        if hasattr(response, 'render'):
+            response.render()
+        content = response.content
+        if response['Content-Type'].startswith('text/html'):
+            content = without_csrf_token(content.decode(response.charset)).encode(response.charset)
+        return response.status_code, content, response
+
+    def render_detail(self, kind, pk):
+        if kind == 'html':
+            return self.render(self.views['html_detail'], self.request(f'/{pk}/'), pk=pk)[:2]
+        return self.render(self.views['json_detail'], self.request(f'/api/articles/{pk}/'), pk=pk)[:2]
+
+    def render_list(self, kind, cursor):
+        """``(content, next cursor)`` for the list page at ``cursor``."""
+        params = {'cursor': cursor} if cursor else {}
+        if kind == 'html':
+            _, content, _ = self.render(self.views['html_list'], self.request('/list-articles/', **params))
+            return content, keyset_page(Article.objects.only('created_at'), cursor)[1]
+        _, content, response = self.render(self.views['json_list'], self.request('/api/articles/', **params))
+        next_url = response.data.get('next')
+        return content, parse_qs(urlsplit(next_url).query)['cursor'][0] if next_url else None
+
+    # -- output ----------------------------------------------------------
+
+    def write(self, name, content):
+        digest = hashlib.sha256(content).hexdigest()
+        if self.files.get(name) == digest and (self.root / name).exists():
+            self.unchanged += 1
+            return
+        _atomic_write(self.root / name, content)
+        self.files[name] = digest
+        self.written.append(name)
+
+    def remove(self, name):
+        if self.files.pop(name, None) is not None or (self.root / name).exists():
+            (self.root / name).unlink(missing_ok=True)
+            self.removed.append(name)
+
+    def save_manifest(self):
+        manifest = {'files': dict(sorted(self.files.items())), 'cursors': self.cursors}
+        _atomic_write(self.root / MANIFEST, json.dumps(manifest, indent=1).encode())
+
+    # -- builds ----------------------------------------------------------
+
+    def details(self, pks):
+        for pk in pks:
+            for kind in KINDS:
+                status, content = self.render_detail(kind, pk)
+                if status == 200:
+                    self.write(detail_path(kind, pk), content)
+                else:
+                    self.remove(detail_path(kind, pk))
+
+    def lists(self, first_page=0, shifted=True):
+        """
+        Render list pages from ``first_page``: to the end when the pages after it
+        ``shifted`` (dropping pages past the new last one), otherwise just that page.
+        """
+        for kind in KINDS:
+            cursors = self.cursors[kind]
+            # A page the manifest has no cursor for yet is reached from the last known one.
+            extend = shifted or first_page >= len(cursors)
+            page = min(first_page, len(cursors) - 1)
+            kept = cursors[:page + 1]
+            while True:
+                content, next_cursor = self.render_list(kind, kept[page])
+                self.write(list_path(kind, kept[page]), content)
+                if not extend or next_cursor is None:
+                    break
+                kept.append(next_cursor)
+                page += 1
+            if extend:
+                for cursor in set(cursors) - set(kept):
+                    self.remove(list_path(kind, cursor))
+                self.cursors[kind] = kept
+
+    def everything(self):
+        """Full build; files from earlier builds that are no longer produced are removed."""
+        previous = set(self.files)
+        pks = list(Article.objects.order_by('pk').values_list('pk', flat=True))
+        self.details(pks)
+        self.lists()
+        current = {detail_path(kind, pk) for kind in KINDS for pk in pks}
+        current |= {list_path(kind, cursor) for kind in KINDS for cursor in self.cursors[kind]}
+        for name in previous - current:
+            self.remove(name)
+
+
+def prerender_all(root=None):
+    build = Build(root)
+    build.everything()
+    build.save_manifest()
+    return build
+
+
+def prerender_changed(pks, first_page=0, shifted=True, root=None):
+    """Re-render the pages of articles ``pks`` and the list pages from ``first_page``."""
+    build = Build(root)
+    build.details(pks)
+    build.lists(first_page, shifted=shifted)
+    build.save_manifest()
+    return build
+
+
+def queue(pks=None, first_page=None, shifted=False):
+    """
+    Queue articles ``pks`` (None: everything) for ``prerender_pending``. Without
+    ``first_page`` the list page an article is on is looked up when rendering.
+    Does nothing unless PRERENDER_ON_SAVE is set.
+    """
+    if not getattr(settings, 'PRERENDER_ON_SAVE', False):
+        return
+    pks = [None] if pks is None else list(pks)
+    PendingPrerender.objects.bulk_create(
+        [PendingPrerender(article_id=pk, first_page=first_page, shifted=shifted) for pk in pks], batch_size=500,
+    )
+
+
+def prerender_pending(root=None):
+    """
+    Render everything queued so far in one build and drop those rows; returns
+    the Build, or None when nothing was queued. Rows queued meanwhile are left
+    for the next run.
+    """
+    jobs = list(PendingPrerender.objects.order_by('pk'))
+    if not jobs:
+        return None
+    if any(job.article_id is None for job in jobs):
+        build = prerender_all(root)
+    else:
+        pks = sorted({job.article_id for job in jobs})
+        positions = dict(Article.objects.filter(pk__in=pks).values_list('pk', 'created_at'))
+        shifted = {job.first_page for job in jobs if job.shifted}
+        edited = {job.first_page for job in jobs if not job.shifted and job.first_page is not None}
+        edited |= {
+            page_index(positions[job.article_id], job.article_id) for job in jobs
+            if not job.shifted and job.first_page is None and job.article_id in positions
+        }
+        build = Build(root)
+        build.details(pks)
+        start = min(shifted, default=None)
+        for page in sorted(edited):
+            if start is None or page < start:
+                build.lists(page, shifted=False)
+        if start is not None:
+            build.lists(start, shifted=True)
+        build.save_manifest()
+    PendingPrerender.objects.filter(pk__in=[job.pk for job in jobs]).delete()
+    return build
@@ -0,0 +1,134 @@
+"""
+Profile a single production request on demand.
+
+A superuser adds ``?profile=download`` (or ``X-Profile: download``) to any URL
+and gets the request's cProfile data back as a ``.prof`` file instead of the
+page; open it with ``python -m pstats``, snakeviz or flameprof. ``store``
+serves the page as usual and keeps the profile under PROFILE_ROOT, listed at
+/api/profiles/. Requests without the parameter pay one dictionary lookup.
+
+Under ASGI the profiler watches the event-loop thread while the request is in
+flight, so it also sees other requests served in the meantime, and ORM calls
+made through ``sync_to_async`` show up as time spent waiting for the executor.
+"""
+import cProfile
+import io
+import marshal
+import pstats
+import re
+import threading
+from types import SimpleNamespace
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import FileSystemStorage
+from django.http import HttpResponse
+from django.utils import timezone
+
+PARAMETER = 'profile'
+HEADER = 'HTTP_X_PROFILE'
+MODES = ('download', 'store')
+SORT_KEYS = ('cumulative', 'tottime', 'ncalls')
+# cProfile can only have one profiler per thread (one per process on 3.12+), and
+# a profiled request runs several times slower; concurrent requests are served unprofiled.
+_lock = threading.Lock()
+
+
+def profile_storage():
+    return FileSystemStorage(location=getattr(settings, 'PROFILE_ROOT', settings.BASE_DIR / '.profiles'))
+
+
+def requested_mode(request):
+    """The profiling mode asked for, or ``None``; ``1``/``true`` mean ``download``."""
+    value = request.GET.get(PARAMETER) or request.META.get(HEADER)
+    if not value:
+        return None
+    value = value.lower()
+    return 'download' if value in ('1', 'true', 'yes') else value if value in MODES else None
+
+
+def profile_name(request):
+    path = re.sub(r'[^\w-]+', '-', request.path).strip('-') or 'root'
+    return f"{timezone.now():%Y%m%dT%H%M%S%f}-{request.method.lower()}-{path[:80]}.prof"
+
+
+def profile_bytes(profiler):
+    """The profile in the format ``pstats.Stats`` and ``Profile.dump_stats`` use."""
+    profiler.create_stats()
+    return marshal.dumps(profiler.stats)
+
+
+def stats_text(data, sort='cumulative', limit=50):
+    """A ``pstats`` report of the ``limit`` most expensive functions in ``data``."""
+    output = io.StringIO()
+    # pstats.Stats takes a file name or a profiler; this stands in for a finished profiler.
+    profiler = SimpleNamespace(stats=marshal.loads(data), create_stats=lambda: None)
+    pstats.Stats(profiler, stream=output).strip_dirs().sort_stats(sort).print_stats(limit)
+    return output.getvalue()
+
+
+def stored_profiles():
+    """Stored profiles, newest first."""
+    storage = profile_storage()
+    try:
+        names = storage.listdir('')[1]
+    except FileNotFoundError:
+        return []
+    return [
+        {'name': name, 'size': storage.size(name), 'created': storage.get_created_time(name)}
+        for name in sorted((name for name in names if name.endswith('.prof')), reverse=True)
+    ]
+
+
+class ProfilingMiddleware:
+    """Goes after AuthenticationMiddleware; ignores the parameter for everyone but superusers."""
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        mode = requested_mode(request)
+        if mode is None or not request.user.is_superuser or not _lock.acquire(blocking=False):
+            return self.get_response(request)
+        try:
+            profiler = cProfile.Profile()
+            response = profiler.runcall(self.get_response, request)
+        finally:
+            _lock.release()
+        return self.finish(request, response, profiler, mode)
+
+    async def __acall__(self, request):
+        mode = requested_mode(request)
+        if mode is None or not (await request.auser()).is_superuser or not _lock.acquire(blocking=False):
+            return await self.get_response(request)
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+            try:
+                response = await self.get_response(request)
+            finally:
+                profiler.disable()
+        finally:
+            _lock.release()
+        return self.finish(request, response, profiler, mode)
+
+    def finish(self, request, response, profiler, mode):
+        data = profile_bytes(profiler)
+        name = profile_name(request)
+        if mode == 'download':
+            download = HttpResponse(data, content_type='application/octet-stream')
+            download['Content-Disposition'] = f'attachment; filename="{name}"'
+            download['Cache-Control'] = 'private, no-store'
+            download['X-Profiled-Status'] = str(response.status_code)
+            return download
+        stored = profile_storage().save(name, ContentFile(data))
+        response['X-Profile'] = stored
+        return response
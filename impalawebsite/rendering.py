@@ -0,0 +1,50 @@
+import math
+
+from django.conf import settings
+from django.utils.text import Truncator
+
+from . import prerender
+from .caching import invalidate_articles
+from .fields import clean_html
+from .images import add_srcset_to_html
+from .models import Article
+from .search import html_to_text
+
+RENDERED_FIELDS = ('body_html', 'excerpt', 'reading_time')
+
+
+def words_per_minute():
+    return getattr(settings, 'ARTICLE_WORDS_PER_MINUTE', 200)
+
+
+def render_article_body(article):
+    """
+    Derive ``body_html``, ``excerpt`` and ``reading_time`` from the raw ``body``.
+
+    Runs on save (and from ``render_article_bodies``) so that pages and the API
+    only ever read the stored results.
+    """
+    safe_html = clean_html(article.body or '')
+    text = html_to_text(safe_html)
+    article.body_html = add_srcset_to_html(safe_html)
+    article.excerpt = Truncator(text).chars(Article._meta.get_field('excerpt').max_length, truncate='…')
+    article.reading_time = max(1, math.ceil(len(text.split()) / words_per_minute()))
+    return article
+
+
+def render_in_batches(queryset, batch_size=200):
+    """
+    Re-render ``queryset`` with ``bulk_update``: no signals, ``updated_at``
+    untouched, so cached pages are invalidated and pre-rendering queued here.
+    """
+    queryset = queryset.only('pk', 'body').order_by('pk')
+    count, last_pk = 0, 0
+    while True:
+        batch = [render_article_body(article) for article in queryset.filter(pk__gt=last_pk)[:batch_size]]
+        if not batch:
+            return count
+        Article.objects.bulk_update(batch, RENDERED_FIELDS)
+        invalidate_articles(article.pk for article in batch)
+        prerender.queue(article.pk for article in batch)
+        count += len(batch)
+        last_pk = batch[-1].pk
@@ -0,0 +1,50 @@
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+# Set once the current request (or task) has written; its later reads must see those writes.
+_pinned = ContextVar('impala_pinned_to_primary', default=False)
+
+
+def replica_alias():
+    return getattr(settings, 'DATABASE_READ_REPLICA', None)
+
+
+def unpin():
+    """Start a fresh unit of work whose reads may go to the replica again (called per request)."""
+    _pinned.set(False)
+
+
+class ReadReplicaRouter:
+    """
+    Send reads to DATABASE_READ_REPLICA and everything else to the primary.
+
+    Reads stay on the primary inside a transaction and for the rest of a request
+    once it has written, so nobody reads their own write back from a lagging copy.
+    Without a configured replica every method returns None and Django's default
+    routing applies.
+    """
+
+    def db_for_read(self, model, **hints):
+        replica = replica_alias()
+        if not replica or _pinned.get() or connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return None
+        return replica
+
+    def db_for_write(self, model, **hints):
+        if not replica_alias():
+            return None
+        _pinned.set(True)
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Both aliases hold the same data, so objects loaded from either may be related.
+        replica = replica_alias()
+        if replica and {obj1._state.db, obj2._state.db} <= {DEFAULT_DB_ALIAS, replica}:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # The replica receives the schema along with the data.
+        return False if db == replica_alias() else None
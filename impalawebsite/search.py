@@ -0,0 +1,116 @@
+import html
+import re
+
+from django.db import connection
+from django.utils.html import escape, strip_tags
+
+FTS_TABLE = "impalawebsite_article_fts"
+
+CREATE_FTS_SQL = (
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} "
+    "USING fts5(title, body, keywords, tokenize='porter unicode61')"
+)
+DROP_FTS_SQL = f"DROP TABLE IF EXISTS {FTS_TABLE}"
+
+UPSERT_SQL = f"INSERT OR REPLACE INTO {FTS_TABLE} (rowid, title, body, keywords) VALUES (%s, %s, %s, %s)"
+DELETE_SQL = f"DELETE FROM {FTS_TABLE} WHERE rowid = %s"
+
+# Title matches count ten times a body match, keywords five times.
+SEARCH_SQL = f"""
+    SELECT rowid,
+           bm25({FTS_TABLE}, 10.0, 1.0, 5.0) AS rank,
+           highlight({FTS_TABLE}, 0, char(2), char(3)) AS title_hl,
+           snippet({FTS_TABLE}, 1, char(2), char(3), '…', 24) AS body_hl
+    FROM {FTS_TABLE}
+    WHERE {FTS_TABLE} MATCH %s
+    ORDER BY rank
+    LIMIT %s OFFSET %s
+"""
+
+_MARK_OPEN, _MARK_CLOSE = "\x02", "\x03"
+_TERM_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def html_to_text(value):
+    """Plain text for indexing: tags removed, entities decoded, whitespace collapsed."""
+    return " ".join(html.unescape(strip_tags(value or "")).split())
+
+
+def build_match_query(query):
+    """
+    Turn free user input into a safe FTS5 MATCH expression.
+
+    Every word is quoted so FTS operators typed by users are treated as text;
+    the last word is a prefix match so results show up while typing.
+    """
+    terms = _TERM_RE.findall(query or "")
+    if not terms:
+        return None
+    quoted = [f'"{term}"' for term in terms]
+    quoted[-1] += "*"
+    return " ".join(quoted)
+
+
+def render_highlight(value):
+    """Escape indexed text and turn the FTS markers into <mark> tags."""
+    return escape(value or "").replace(_MARK_OPEN, "<mark>").replace(_MARK_CLOSE, "</mark>")
+
+
+def index_article(article):
+    index_articles([article])
+
+
+def index_articles(articles):
+    with connection.cursor() as cursor:
+        cursor.executemany(UPSERT_SQL, [
+            (article.pk, article.title, html_to_text(article.body), article.keywords)
+            for article in articles
+        ])
+
+
+def remove_article(pk):
+    with connection.cursor() as cursor:
+        cursor.execute(DELETE_SQL, [pk])
+
+
+def rebuild_index(batch_size=500):
+    """Repopulate the FTS table from scratch; returns the number of indexed articles."""
+    from .models import Article
+
+    rows = Article.objects.order_by('pk').values_list('pk', 'title', 'body', 'keywords')
+    count = 0
+    with connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {FTS_TABLE}")
+        batch = []
+        for pk, title, body, keywords in rows.iterator(chunk_size=batch_size):
+            batch.append((pk, title, html_to_text(body), keywords))
+            if len(batch) >= batch_size:
+                cursor.executemany(UPSERT_SQL, batch)
+                count += len(batch)
+                batch = []
+        if batch:
+            cursor.executemany(UPSERT_SQL, batch)
+            count += len(batch)
+        cursor.execute(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('optimize')")
+    return count
+
+
+def search_articles(query, limit=10, offset=0):
+    """
+    Return ``[{'id', 'rank', 'title_highlight', 'snippet'}]`` best match first.
+    """
+    match = build_match_query(query)
+    if match is None:
+        return []
+    with connection.cursor() as cursor:
+        cursor.execute(SEARCH_SQL, [match, limit, offset])
+        rows = cursor.fetchall()
+    return [
+        {
+            'id': pk,
+            'rank': rank,
+            'title_highlight': render_highlight(title_hl),
+            'snippet': render_highlight(body_hl),
+        }
+        for pk, rank, title_hl, body_hl in rows
+    ]
@@ -0,0 +1,183 @@
+"""
+Synthetic data for benchmarks and local development.
+
+Everything is derived from one ``random.Random`` so a given seed always yields
+the same users, articles (Summernote-style HTML with embedded images and
+covers) and contact messages. Rows go in through the bulk paths in
+``bulk.py``, so seeding 100k articles takes seconds rather than minutes and
+skips the per-row newsletter signal.
+"""
+import io
+import random
+import tempfile
+from contextlib import contextmanager
+from pathlib import Path
+
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.core.files.base import ContentFile
+from django.db import connection
+from django.test.utils import override_settings
+from PIL import Image
+
+from .bulk import create_articles, create_contacts
+from .images import enqueue
+from .models import CustomUser
+from .storage import content_addressed_storage
+
+VOCABULARY = (
+    "health technology research malaria maternal child clinic digital evidence trial "
+    "uganda kampala community nurse patient data mobile screening hypertension diabetes "
+    "vaccine outreach training district hospital referral telemedicine adherence cohort "
+    "survey policy funding partnership innovation laboratory diagnostics surveillance"
+).split()
+FIRST_NAMES = "Amina Brian Grace Joseph Esther Daniel Sarah Isaac Ruth Peter Mary Samuel".split()
+SURNAMES = "Okello Namubiru Mugisha Achieng Kato Nansubuga Otieno Wanjiru Ssemakula Auma".split()
+SEED_PASSWORD = "seed-password"
+DEFAULT_BATCH_SIZE = 500
+
+
+def synthetic_article(rng, words=180):
+    """``(title, plain body, keywords)``; the plain-text shape used by the search benchmarks."""
+    title = " ".join(rng.choices(VOCABULARY, k=6)).title()
+    body = " ".join(rng.choices(VOCABULARY, k=words))
+    keywords = ", ".join(rng.sample(VOCABULARY, 3))
+    return title, body, keywords
+
+
+def _sentence(rng, words):
+    return " ".join(rng.choices(VOCABULARY, k=words)).capitalize() + "."
+
+
+def summernote_body(rng, image_urls=(), paragraphs=8):
+    """Editor-shaped HTML: headings, styled paragraphs, lists, links, a table and inline images."""
+    parts = []
+    for index in range(paragraphs):
+        if index and index % 3 == 0:
+            parts.append(f"<h3>{_sentence(rng, 4)[:-1]}</h3>")
+        sentences = " ".join(_sentence(rng, rng.randint(8, 20)) for _ in range(rng.randint(2, 5)))
+        emphasis = rng.choice(VOCABULARY)
+        parts.append(
+            f'<p style="text-align: justify;">{sentences} <b>{emphasis}</b> '
+            f'<a href="https://example.org/{emphasis}" title="{emphasis}">{rng.choice(VOCABULARY)}</a></p>'
+        )
+        if image_urls and rng.random() < 0.25:
+            parts.append(f'<p><img src="{rng.choice(image_urls)}" alt="{emphasis}" style="width: 100%;"></p>')
+        if rng.random() < 0.2:
+            items = "".join(f"<li>{_sentence(rng, 6)}</li>" for _ in range(rng.randint(3, 6)))
+            parts.append(f"<ul>{items}</ul>")
+    if rng.random() < 0.3:
+        rows = "".join(
+            f"<tr><td>{rng.choice(VOCABULARY)}</td><td>{rng.randint(1, 999)}</td></tr>" for _ in range(4)
+        )
+        parts.append(f'<table class="table table-bordered"><tbody>{rows}</tbody></table>')
+    return "".join(parts)
+
+
+def synthetic_image(rng, width=1600, height=900):
+    """A JPEG with a random gradient, so each image hashes (and is stored) separately."""
+    start = [rng.randint(0, 255) for _ in range(3)]
+    end = [rng.randint(0, 255) for _ in range(3)]
+    gradient = Image.linear_gradient('L').resize((width, height))
+    image = Image.merge('RGB', [
+        gradient.point(lambda value, a=a, b=b: a + (b - a) * value // 255) for a, b in zip(start, end)
+    ])
+    buffer = io.BytesIO()
+    image.save(buffer, 'JPEG', quality=80)
+    return buffer.getvalue()
+
+
+def seed_images(rng, count, folder):
+    """Store ``count`` synthetic JPEGs under ``folder``/ and return their storage names."""
+    return [
+        content_addressed_storage.save(f"{folder}/seed-{index}.jpg", ContentFile(synthetic_image(rng)))
+        for index in range(count)
+    ]
+
+
+def seed_users(rng, count):
+    # One hash for everyone: PBKDF2 per user would dominate the seeding time.
+    password = make_password(SEED_PASSWORD)
+    first = CustomUser.objects.order_by('-pk').values_list('pk', flat=True).first() or 0
+    users = [
+        CustomUser(
+            email=f"seed{first + index}@example.com", first_name=rng.choice(FIRST_NAMES),
+            surname=rng.choice(SURNAMES), password=password,
+        )
+        for index in range(1, count + 1)
+    ]
+    return CustomUser.objects.bulk_create(users, batch_size=DEFAULT_BATCH_SIZE)
+
+
+def seed_articles(rng, count, authors, images=0, batch_size=DEFAULT_BATCH_SIZE):
+    """
+    Create ``count`` articles spread over ``authors``. With ``images``, that many
+    covers and inline images are stored and shared between the articles.
+    """
+    covers = [enqueue(name) for name in seed_images(rng, images, 'article_covers')]
+    inline = [settings.MEDIA_URL + name for name in seed_images(rng, images, 'django-summernote')]
+    articles = []
+    for start in range(0, count, batch_size):
+        by_author = {}
+        for _ in range(min(batch_size, count - start)):
+            title, _, keywords = synthetic_article(rng)
+            row = {'title': title, 'body': summernote_body(rng, inline), 'keywords': keywords}
+            if covers:
+                cover = rng.choice(covers)
+                row.update(featured_image=cover.source, cover_renditions=cover)
+            by_author.setdefault(rng.choice(authors), []).append(row)
+        for author, rows in by_author.items():
+            articles += create_articles(rows, author, notify=False)
+    return articles
+
+
+def seed_contacts(rng, count, consent_ratio=0.1, batch_size=DEFAULT_BATCH_SIZE * 10):
+    contacts = []
+    for start in range(0, count, batch_size):
+        contacts += create_contacts([
+            {
+                'name': f"{rng.choice(FIRST_NAMES)} {rng.choice(SURNAMES)}",
+                'email': f"reader{start + index}@example.com",
+                'phone': f"+2567{rng.randint(0, 99_999_999):08d}",
+                'message': _sentence(rng, rng.randint(10, 40)),
+                'consent_email_updates': rng.random() < consent_ratio,
+            }
+            for index in range(min(batch_size, count - start))
+        ], notify=False)
+    return contacts
+
+
+def seed(users=20, articles=1000, contacts=5000, images=0, seed=42):
+    """Seed all three tables; returns ``{'users': [...], 'articles': [...], 'contacts': [...]}``."""
+    rng = random.Random(seed)
+    seeded_users = seed_users(rng, users)
+    return {
+        'users': seeded_users,
+        'articles': seed_articles(rng, articles, seeded_users, images=images),
+        'contacts': seed_contacts(rng, contacts),
+    }
+
+
+@contextmanager
+def throwaway_database():
+    """
+    Point the default connection at a migrated SQLite file (and MEDIA_ROOT and
+    PRERENDER_ROOT at temporary folders) for the duration of the block, then
+    delete them. Pre-rendering on save is off, so benchmarks time the save alone.
+
+    A file rather than the in-memory test default, so worker threads share it.
+    """
+    old_name = connection.settings_dict['NAME']
+    test_settings = connection.settings_dict.setdefault('TEST', {})
+    old_test_name = test_settings.get('NAME')
+    with tempfile.TemporaryDirectory() as tmp:
+        test_settings['NAME'] = str(Path(tmp) / 'throwaway.sqlite3')
+        connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+        try:
+            with override_settings(
+                MEDIA_ROOT=str(Path(tmp) / 'media'), PRERENDER_ROOT=Path(tmp) / 'prerendered', PRERENDER_ON_SAVE=False,
+            ):
+                yield
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            test_settings['NAME'] = old_test_name
@@ -1,15 +1,140 @@
 from rest_framework import serializers
-from .models import Article, ContactMessage
+from rest_framework.permissions import SAFE_METHODS
 
+from .images import candidates
+from .models import Article, ContactMessage, Keyword
+
+
+def _split_param(value):
+    return {name.strip() for name in (value or '').split(',') if name.strip()}
+
+
+class SparseFieldsetMixin:
+    """
+    Honour ``?fields=title,excerpt`` and ``?omit=keyword_list`` on GET requests.
+
+    ``columns`` maps serializer fields to the model paths they read (fields not
+    listed read the column of the same name), so views can hand the selection
+    to ``load_only()`` and unrequested columns are never fetched.
+    """
+    columns = {}
+    always_load = ('id', 'created_at')  # cursor pagination reads these
+
+    @classmethod
+    def requested_fields(cls, request):
+        available = list(cls().fields)
+        if request is None or request.method not in SAFE_METHODS:
+            return available
+        wanted = _split_param(request.query_params.get('fields')) or set(available)
+        omitted = _split_param(request.query_params.get('omit'))
+        unknown = (wanted | omitted) - set(available)
+        if unknown:
+            raise serializers.ValidationError({'fields': [f"Unknown field(s): {', '.join(sorted(unknown))}"]})
+        return [name for name in available if name in wanted and name not in omitted]
+
+    @classmethod
+    def load_only(cls, queryset, fields):
+        paths = set(cls.always_load)
+        for name in fields:
+            paths.update(cls.columns.get(name, (name,)))
+        # select_related() on a deferred relation is an error, so follow only what is read.
+        relations = {path.split('__')[0] for path in paths if '__' in path}
+        queryset = queryset.select_related(None)
+        if relations:
+            queryset = queryset.select_related(*sorted(relations))
+        return queryset.only(*paths)
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        request = self.context.get('request')
+        if request is not None:
+            keep = set(self.requested_fields(request))
+            for name in list(self.fields):
+                if name not in keep:
+                    self.fields.pop(name)
+
+
+class CoverRenditionsMixin(serializers.Serializer):
+    # {"webp": [{"width": 320, "url": ...}, ...], "jpg": [...]}; empty until process_images has run
+    cover_renditions = serializers.SerializerMethodField()
+
+    def get_cover_renditions(self, article):
+        request = self.context.get('request')
+        absolute = request.build_absolute_uri if request else (lambda url: url)
+        return {
+            ext: [{'width': width, 'url': absolute(url)} for url, width in urls]
+            for ext, urls in candidates(article.cover_renditions).items()
+        }
+
+
+COVER_COLUMNS = ('cover_renditions__source_hash', 'cover_renditions__status', 'cover_renditions__widths')
+
+
+class ArticleSerializer(SparseFieldsetMixin, CoverRenditionsMixin, serializers.ModelSerializer):
+    # Normalized keywords, served from the prefetch set up by ArticleQuerySet.with_keywords()
+    keyword_list = serializers.ListField(child=serializers.CharField(), read_only=True)
+
+    columns = {'keyword_list': ('keywords',), 'cover_renditions': COVER_COLUMNS}
 
-class ArticleSerializer(serializers.ModelSerializer):
     # Make 'author' read-only so the server can assign request.user in the view
     class Meta:
         model = Article
-        fields = '__all__'
+        exclude = ('tags',)
         read_only_fields = ('author',)
 
+
+class ArticleListSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
+    """Compact card representation for list actions: no bodies, one thumbnail URL."""
+    author_name = serializers.SerializerMethodField()
+    cover_thumbnail = serializers.SerializerMethodField()
+    keyword_list = serializers.ListField(child=serializers.CharField(), read_only=True)
+
+    columns = {
+        'author_name': ('author__first_name', 'author__surname'),
+        'cover_thumbnail': ('featured_image', *COVER_COLUMNS),
+        'keyword_list': ('keywords',),
+    }
+
+    class Meta:
+        model = Article
+        fields = ('id', 'title', 'excerpt', 'reading_time', 'cover_thumbnail', 'author_name',
+                  'keyword_list', 'created_at', 'updated_at')
+
+    def get_author_name(self, article):
+        return f"{article.author.first_name} {article.author.surname}".strip()
+
+    def get_cover_thumbnail(self, article):
+        """Smallest WebP rendition, or the original upload until renditions exist."""
+        webp = candidates(article.cover_renditions).get('webp')
+        if webp:
+            url = webp[0][0]
+        elif article.featured_image:
+            url = article.featured_image.url
+        else:
+            return None
+        request = self.context.get('request')
+        return request.build_absolute_uri(url) if request else url
+
+
+class KeywordSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Keyword
+        fields = ('name', 'slug', 'article_count')
+
+
 class ContactMessageSerializer(serializers.ModelSerializer):
     class Meta:
         model = ContactMessage
         fields = '__all__'
+
+
+class ArticleSearchResultSerializer(CoverRenditionsMixin, serializers.ModelSerializer):
+    # Filled from the FTS row attached as `search_hit` by ArticleViewSet.search
+    rank = serializers.FloatField(source='search_hit.rank', read_only=True)
+    title_highlight = serializers.CharField(source='search_hit.title_highlight', read_only=True)
+    snippet = serializers.CharField(source='search_hit.snippet', read_only=True)
+
+    class Meta:
+        model = Article
+        fields = ('id', 'title', 'title_highlight', 'snippet', 'rank', 'keywords',
+                  'featured_image', 'cover_renditions', 'author', 'created_at', 'updated_at')
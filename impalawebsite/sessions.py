@@ -0,0 +1,43 @@
+"""
+Session engine (SESSION_ENGINE = "impalawebsite.sessions"): cached_db sessions
+that skip the database and cache write when a request marked the session
+modified but left its contents as they were loaded.
+
+Reads come from SESSION_CACHE_ALIAS and fall back to the database. That cache
+must be shared by all workers, or a logout in one process would leave the
+session alive in another's copy, so while it is a per-process LocMemCache the
+store skips it and behaves like the plain database backend.
+"""
+from django.conf import settings
+from django.contrib.sessions.backends import cached_db
+
+from .caching import shared_cache
+
+
+class SessionStore(cached_db.SessionStore):
+    _persisted = None  # serialized contents as last loaded or saved
+
+    def __init__(self, session_key=None):
+        super().__init__(session_key)
+        self._cache = shared_cache(settings.SESSION_CACHE_ALIAS)
+
+    def _snapshot(self, data):
+        return self.serializer().dumps(data)
+
+    def load(self):
+        data = super().load()
+        self._persisted = self._snapshot(data)
+        return data
+
+    def save(self, must_create=False):
+        if (
+            not must_create
+            and self.session_key is not None
+            and self._persisted is not None
+            # A save per request is how SESSION_SAVE_EVERY_REQUEST slides the expiry.
+            and not settings.SESSION_SAVE_EVERY_REQUEST
+            and self._snapshot(self._get_session()) == self._persisted
+        ):
+            return
+        super().save(must_create=must_create)
+        self._persisted = self._snapshot(self._get_session())
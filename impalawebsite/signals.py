@@ -1,40 +1,141 @@
-from django.db.models.signals import post_save
-from django.dispatch import receiver
-from django.core.mail import send_mail
-from django.urls import reverse
+from django.contrib.auth.signals import user_logged_out
+from django.core.signals import request_started
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_delete, post_save, pre_delete
+from django.dispatch import Signal, receiver
 from django.conf import settings
-from .models import Article, ContactMessage
-from django.core.signing import Signer
+from django_summernote.utils import get_attachment_model
+from rest_framework.authtoken.models import Token
+from . import authentication, caching, db, images, instrumentation, prerender, routers
+from .models import Article, ContactMessage, ImageRenditionSet
+from .keywords import release_article_keywords, sync_article_keywords
+from .rendering import render_in_batches
+from .search import index_article, remove_article
+from .newsletter import queue_newsletter
+from .subscribers import subscribe_contacts
 
+# Sent once per bulk import (bulk_create skips post_save) with the created rows:
+# articles_bulk_created(sender=Article, articles=[...]), contacts_bulk_created(sender=ContactMessage, contacts=[...])
+articles_bulk_created = Signal()
+contacts_bulk_created = Signal()
+
+
+@receiver(connection_created)
+def tune_database_connection(sender, connection, **kwargs):
+    db.tune_connection(connection)
+    instrumentation.instrument_connection(connection)
+
+
+@receiver(request_started)
+def reset_replica_pinning(sender, **kwargs):
+    routers.unpin()
+
+
+# Saves cover password changes, deactivation and the last_login update on login.
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+@receiver(post_delete, sender=settings.AUTH_USER_MODEL)
+def forget_cached_user(sender, instance, **kwargs):
+    authentication.forget_user(instance.pk)
+
+
+@receiver(user_logged_out)
+def forget_logged_out_user(sender, request, user, **kwargs):
+    if user is not None:
+        authentication.forget_user(user.pk)
+
+
+@receiver(post_delete, sender=Token)
+def forget_cached_token(sender, instance, **kwargs):
+    authentication.forget_token(instance.key)
 
-signer = Signer()
 
 @receiver(post_save, sender=Article)
-def send_article_notification(sender, instance, created, **kwargs):
-    if not created:
+def update_article_keywords(sender, instance, update_fields=None, **kwargs):
+    if update_fields is not None and 'keywords' not in update_fields:
+        return
+    sync_article_keywords(instance)
+
+
+@receiver(pre_delete, sender=Article)
+def release_keyword_counts(sender, instance, **kwargs):
+    release_article_keywords(instance)
+
+
+@receiver(post_save, sender=Article)
+def queue_cover_renditions(sender, instance, **kwargs):
+    """Point the article at the (possibly still pending) renditions of its current cover."""
+    name = instance.featured_image.name or None
+    if name and Article.cover_renditions.is_cached(instance) and instance.cover_renditions \
+            and instance.cover_renditions.source == name:
+        return
+    renditions = images.enqueue(name)
+    if (renditions.pk if renditions else None) != instance.cover_renditions_id:
+        Article.objects.filter(pk=instance.pk).update(cover_renditions=renditions)
+        instance.cover_renditions = renditions
+
+
+@receiver(post_save, sender=get_attachment_model())
+def queue_attachment_renditions(sender, instance, created, **kwargs):
+    if created and instance.file:
+        images.enqueue(instance.file.name)
+
+
+@receiver(post_save, sender=ImageRenditionSet)
+def rerender_bodies_using_image(sender, instance, **kwargs):
+    """Bake the new srcset into stored body_html of articles that embed this image."""
+    if instance.status != ImageRenditionSet.Status.READY:
         return
+    covers = list(Article.objects.filter(cover_renditions=instance).values_list('pk', flat=True))
+    caching.invalidate_articles(covers)
+    prerender.queue(covers)
+    render_in_batches(Article.objects.filter(body__contains=settings.MEDIA_URL + instance.source))
+
+
+@receiver(post_save, sender=Article)
+def update_search_index(sender, instance, **kwargs):
+    index_article(instance)
+
+
+@receiver(post_delete, sender=Article)
+def remove_from_search_index(sender, instance, **kwargs):
+    remove_article(instance.pk)
+
+
+@receiver(post_save, sender=Article)
+@receiver(post_delete, sender=Article)
+def invalidate_page_cache(sender, instance, **kwargs):
+    caching.invalidate_article(instance.pk)
+
+
+@receiver(post_save, sender=ContactMessage)
+def update_subscriber(sender, instance, **kwargs):
+    """A message sent with consent adds (or reactivates) its email in the registry."""
+    if instance.consent_email_updates:
+        subscribe_contacts([instance])
+
+
+@receiver(post_save, sender=Article)
+def send_article_notification(sender, instance, created, **kwargs):
+    if created:
+        queue_newsletter([instance])
+
+
+@receiver(articles_bulk_created)
+def send_bulk_article_notification(sender, articles, **kwargs):
+    """A bulk import sends one email per immediate subscriber instead of one per article."""
+    if articles:
+        queue_newsletter(articles)
+
+
+@receiver(post_save, sender=Article)
+def prerender_saved_article(sender, instance, created, **kwargs):
+    """Queue the static copies of the article and of the list pages it appears on for ``prerender --pending``."""
+    if getattr(settings, 'PRERENDER_ON_SAVE', False):
+        prerender.queue([instance.pk], prerender.page_index(instance.created_at, instance.pk), shifted=created)
+
+
+@receiver(post_delete, sender=Article)
+def prerender_deleted_article(sender, instance, **kwargs):
+    if getattr(settings, 'PRERENDER_ON_SAVE', False):
+        prerender.queue([instance.pk], prerender.page_index(instance.created_at, instance.pk), shifted=True)
 
-    site_url = getattr(settings, "SITE_URL", "http://127.0.0.1:8000")
-    article_url = site_url + reverse('article_detail', args=[instance.pk])
-
-    recipients = ContactMessage.objects.filter(consent_email_updates=True)
-    for contact in recipients:
-        token = signer.sign(contact.pk)
-        unsubscribe_url = f"{site_url}{reverse('unsubscribe', args=[token])}"
-
-        subject = f"New Article: {instance.title}"
-        message = (
-            f"Hello {contact.name},\n\n"
-            f"A new article from Impala Health Tech Research Limited has been published: {instance.title}\n"
-            f"Read it here: {article_url}\n\n"
-            f"If you no longer wish to receive these updates, "
-            f"you can unsubscribe here:\n{unsubscribe_url}\n"
-        )
-
-        send_mail(
-            subject,
-            message,
-            settings.DEFAULT_FROM_EMAIL,
-            [contact.email],
-            fail_silently=False,
-        )
\ No newline at end of file
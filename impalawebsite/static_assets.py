@@ -0,0 +1,174 @@
+"""
+Fingerprinted, pre-compressed static files served straight from STATIC_ROOT.
+
+``CompressedManifestStaticFilesStorage`` is Django's manifest storage (file
+names carry a content hash, so a changed file gets a new URL) that also writes
+``.gz`` and, when the optional ``brotli`` package is installed, ``.br``
+variants next to each text asset during ``collectstatic``.
+
+``StaticFilesMiddleware`` answers requests under STATIC_URL from an index of
+STATIC_ROOT built when the process starts, picking the smallest variant the
+client's Accept-Encoding allows. Hashed files never change, so they are sent
+with a one-year ``immutable`` Cache-Control; anything else is revalidated.
+"""
+import gzip
+import mimetypes
+import os
+from email.utils import formatdate
+from pathlib import Path
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage, staticfiles_storage
+from django.http import FileResponse, HttpResponseNotModified
+from django.utils.http import parse_http_date_safe
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - optional dependency
+    brotli = None
+
+COMPRESSIBLE = ('.css', '.js', '.mjs', '.map', '.svg', '.json', '.txt', '.html', '.xml', '.ico', '.ttf', '.eot')
+# A variant is only kept when it saves at least this fraction of the original.
+MIN_SAVING = 0.05
+IMMUTABLE = 'public, max-age=31536000, immutable'
+# Ordered by preference: (Content-Encoding, file suffix).
+ENCODINGS = (('br', '.br'), ('gzip', '.gz'))
+
+
+def compress(data):
+    """``{suffix: bytes}`` of the worthwhile compressed variants of ``data``."""
+    variants = {'.gz': gzip.compress(data, compresslevel=9, mtime=0)}
+    if brotli is not None:
+        variants['.br'] = brotli.compress(data, quality=11)
+    return {suffix: body for suffix, body in variants.items() if len(body) <= len(data) * (1 - MIN_SAVING)}
+
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    def stored_name(self, name):
+        # Before the first collectstatic (development, tests) there is no
+        # manifest to look hashed names up in; serve the source names.
+        if not self.hashed_files:
+            return name
+        return super().stored_name(name)
+
+    def post_process(self, paths, dry_run=False, **options):
+        yield from super().post_process(paths, dry_run=dry_run, **options)
+        if dry_run:
+            return
+        for name in sorted({*paths, *self.hashed_files.values()}):
+            if name.endswith(COMPRESSIBLE) and self.exists(name):
+                with self.open(name) as source:
+                    data = source.read()
+                for suffix, body in compress(data).items():
+                    with open(self.path(name + suffix), 'wb') as target:
+                        target.write(body)
+
+
+def accepted_encodings(header):
+    """Content codings the client accepts (``q`` above zero), from an Accept-Encoding header."""
+    accepted = set()
+    for part in header.split(','):
+        coding, _, params = part.strip().partition(';')
+        quality = params.strip()
+        if quality.startswith('q='):
+            try:
+                if float(quality[2:]) <= 0:
+                    continue
+            except ValueError:
+                continue
+        accepted.add(coding.strip().lower())
+    if '*' in accepted:
+        accepted.update(encoding for encoding, _ in ENCODINGS)
+    return accepted
+
+
+class StaticFile:
+    def __init__(self, path, immutable):
+        stat = path.stat()
+        self.path = path
+        self.content_type = mimetypes.guess_type(path.name)[0] or 'application/octet-stream'
+        self.last_modified = stat.st_mtime
+        self.cache_control = IMMUTABLE if immutable else 'public, max-age=0, must-revalidate'
+        self.variants = [
+            (encoding, variant)
+            for encoding, suffix in ENCODINGS
+            if (variant := path.with_name(path.name + suffix)).is_file()
+        ]
+
+    def pick(self, accept_encoding):
+        """``(path, Content-Encoding or None)`` for the best variant the client accepts."""
+        if self.variants:
+            accepted = accepted_encodings(accept_encoding)
+            for encoding, variant in self.variants:
+                if encoding in accepted:
+                    return variant, encoding
+        return self.path, None
+
+
+def build_index(root, prefix):
+    """``{url path: StaticFile}`` for every file under ``root``, compressed variants excluded."""
+    root = Path(root)
+    if not root.is_dir():
+        return {}
+    storage = staticfiles_storage
+    hashed = set(getattr(storage, 'hashed_files', {}).values())
+    index = {}
+    for directory, _, files in os.walk(root):
+        for filename in files:
+            if filename.endswith(tuple(suffix for _, suffix in ENCODINGS)):
+                continue
+            path = Path(directory) / filename
+            name = path.relative_to(root).as_posix()
+            index[prefix + name] = StaticFile(path, immutable=name in hashed)
+    return index
+
+
+class StaticFilesMiddleware:
+    """
+    Serve collected static files in-process. Goes right after
+    SecurityMiddleware; URLs not in STATIC_ROOT fall through to the
+    rest of the stack (``runserver`` still serves app static in DEBUG).
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+        root = getattr(settings, 'STATIC_ROOT', None)
+        prefix = '/' + settings.STATIC_URL.lstrip('/') if settings.STATIC_URL else None
+        self.index = build_index(root, prefix) if root and prefix else {}
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        return self.serve(request) or self.get_response(request)
+
+    async def __acall__(self, request):
+        return self.serve(request) or await self.get_response(request)
+
+    def serve(self, request):
+        if request.method not in ('GET', 'HEAD'):
+            return None
+        static_file = self.index.get(request.path_info)
+        if static_file is None:
+            return None
+
+        since = parse_http_date_safe(request.META.get('HTTP_IF_MODIFIED_SINCE', ''))
+        if since is not None and int(static_file.last_modified) <= since:
+            response = HttpResponseNotModified()
+        else:
+            path, encoding = static_file.pick(request.META.get('HTTP_ACCEPT_ENCODING', ''))
+            response = FileResponse(
+                path.open('rb'), content_type=static_file.content_type, filename=static_file.path.name
+            )
+            if encoding:
+                response['Content-Encoding'] = encoding
+        response['Last-Modified'] = formatdate(static_file.last_modified, usegmt=True)
+        response['Cache-Control'] = static_file.cache_control
+        if static_file.variants:
+            response['Vary'] = 'Accept-Encoding'
+        return response
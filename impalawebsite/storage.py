@@ -0,0 +1,59 @@
+import hashlib
+import os
+import posixpath
+
+from django.core.files import File
+from django.core.files.storage import FileSystemStorage
+
+
+def file_sha256(fp, chunk_size=1024 * 1024):
+    digest = hashlib.sha256()
+    for chunk in iter(lambda: fp.read(chunk_size), b''):
+        digest.update(chunk)
+    return digest.hexdigest()
+
+
+class ContentAddressedStorage(FileSystemStorage):
+    """
+    Stores every distinct upload exactly once, named after the SHA-256 of its bytes.
+
+    ``article_covers/IMG_0042.png`` is saved as ``article_covers/3f/3fa9….png``;
+    only the top-level folder of the requested name is kept, so date-based
+    upload paths (Summernote's ``django-summernote/<date>/``) still dedupe.
+    Saving bytes that are already stored returns the existing name.
+    """
+
+    def save(self, name, content, max_length=None):
+        if name is None:
+            name = content.name
+        if not hasattr(content, 'chunks'):
+            content = File(content, name)
+        content.seek(0)
+        digest = file_sha256(content)
+        content.seek(0)
+
+        name = self.hashed_name(name, digest)
+        if self.exists(name):
+            return name
+        return super().save(name, content, max_length=max_length)
+
+    @staticmethod
+    def hashed_name(name, digest):
+        parts = posixpath.normpath(name.replace('\\', '/')).split('/')
+        root = parts[0] if len(parts) > 1 else ''
+        ext = os.path.splitext(parts[-1])[1].lower()
+        return posixpath.join(root, digest[:2], digest + ext)
+
+    @staticmethod
+    def is_hashed_name(name):
+        stem = posixpath.splitext(posixpath.basename(name))[0]
+        parent = posixpath.basename(posixpath.dirname(name))
+        return len(stem) == 64 and parent == stem[:2]
+
+
+content_addressed_storage = ContentAddressedStorage()
+
+
+def get_content_addressed_storage():
+    # Referenced by the model field so migrations store a path instead of an instance.
+    return content_addressed_storage
@@ -0,0 +1,63 @@
+from django.utils import timezone
+
+from .models import ContactMessage, Subscriber
+from .utils import verify_unsubscribe_token
+
+
+def active_subscribers(delivery=None):
+    """Newsletter recipients: one indexed scan of active rows, no ContactMessage involved."""
+    subscribers = Subscriber.objects.filter(is_active=True).only('pk', 'name', 'email', 'delivery').order_by('pk')
+    return subscribers if delivery is None else subscribers.filter(delivery=delivery)
+
+
+def subscribe_contacts(contacts):
+    """
+    Upsert a Subscriber for every consenting contact with one INSERT … ON CONFLICT.
+
+    The latest name wins, and a previously unsubscribed address that gives
+    consent again is reactivated.
+    """
+    rows = {}
+    for contact in contacts:
+        email = Subscriber.normalize_email(contact.email)
+        if contact.consent_email_updates and email:
+            rows[email] = contact.name
+    if rows:
+        Subscriber.objects.bulk_create(
+            [Subscriber(email=email, name=name) for email, name in rows.items()],
+            update_conflicts=True,
+            unique_fields=['email'],
+            update_fields=['name', 'is_active', 'unsubscribed_at'],
+            batch_size=500,
+        )
+    return len(rows)
+
+
+def unsubscribe(subscriber):
+    subscriber.is_active = False
+    subscriber.unsubscribed_at = timezone.now()
+    subscriber.save(update_fields=['is_active', 'unsubscribed_at'])
+    # Keep the per-message consent flag (used by exports) in line with the registry.
+    ContactMessage.objects.filter(email__iexact=subscriber.email, consent_email_updates=True) \
+        .update(consent_email_updates=False)
+
+
+def set_delivery(subscriber, delivery):
+    subscriber.delivery = delivery
+    subscriber.save(update_fields=['delivery'])
+
+
+def subscriber_from_token(token):
+    """
+    Resolve an unsubscribe token to its Subscriber (or None); raises BadSignature.
+
+    Links mailed before the registry existed sign a ContactMessage pk and are
+    matched through that message's email.
+    """
+    kind, _, pk = verify_unsubscribe_token(token).rpartition(':')
+    if kind == 'subscriber':
+        return Subscriber.objects.filter(pk=pk).first()
+    email = ContactMessage.objects.filter(pk=pk).values_list('email', flat=True).first()
+    if email is None:
+        return None
+    return Subscriber.objects.filter(email=Subscriber.normalize_email(email)).first()
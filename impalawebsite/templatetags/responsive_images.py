@@ -0,0 +1,34 @@
+from django import template
+from django.utils.html import format_html
+
+from impalawebsite.images import candidates, srcsets
+
+register = template.Library()
+
+
+@register.simple_tag
+def responsive_image(image, renditions=None, sizes="100vw", alt="", css_class="", loading="lazy"):
+    """
+    Render ``image`` as a ``<picture>`` with WebP and JPEG ``srcset`` candidates.
+
+    Falls back to a plain lazy ``<img>`` of the original while renditions are pending.
+    """
+    if not image:
+        return ""
+    sets = srcsets(renditions)
+    if not sets:
+        return format_html(
+            '<img src="{}" class="{}" alt="{}" loading="{}" decoding="async">',
+            image.url, css_class, alt, loading,
+        )
+    largest_jpeg = candidates(renditions)['jpg'][-1][0]
+    return format_html(
+        '<picture>'
+        '<source type="image/webp" srcset="{}" sizes="{}">'
+        '<img src="{}" srcset="{}" sizes="{}" width="{}" height="{}" class="{}" alt="{}" '
+        'loading="{}" decoding="async">'
+        '</picture>',
+        sets['webp'], sizes,
+        largest_jpeg, sets['jpg'], sizes, renditions.width, renditions.height, css_class, alt,
+        loading,
+    )
@@ -1,3 +1,1576 @@
-from django.test import TestCase
+import base64
+import gzip
+import io
+import json
+import os
+import re
+import shutil
+import subprocess
+import sys
+import tempfile
+import tracemalloc
+from datetime import timedelta
+from importlib import import_module
+from pathlib import Path
+from unittest import mock
 
-# Create your tests here.
+from asgiref.sync import sync_to_async
+from django.apps import apps as django_apps
+from django.conf import settings
+from django.core import mail
+from django.core.cache import caches
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.mail.backends.locmem import EmailBackend as LocmemEmailBackend
+from django.core.management import call_command
+from django.db import connection
+from django.test import SimpleTestCase, TestCase, override_settings, tag
+from django.test.utils import CaptureQueriesContext
+from django.templatetags.static import static
+from django.urls import reverse
+from django.utils import timezone
+from PIL import Image
+from rest_framework.authtoken.models import Token
+
+from . import async_views, caching, feeds, images, instrumentation, media_gc, newsletter, prerender, profiling, routers, seeding, subscribers, throttling
+from .bulk import create_articles
+from .db import pragma_statements
+from .sessions import SessionStore
+from .exports import contact_queryset, contacts_csv
+from .management.commands.bench_suite import regressions
+from .models import (
+    Article, ContactMessage, CustomUser, ImageRenditionSet, Keyword, NewsletterDigest, OutboxEmail, PendingPrerender,
+    Subscriber,
+)
+from .outbox import OutboxWorker, enqueue_emails
+from .rendering import render_in_batches
+from .signals import contacts_bulk_created
+from .static_assets import accepted_encodings
+from .storage import ContentAddressedStorage
+from .utils import make_unsubscribe_token, signer
+
+
+DUMMY_CACHE = {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'}
+# For tests that inspect what the view itself does on every request.
+without_page_cache = override_settings(
+    CACHES={'default': DUMMY_CACHE, 'pages': DUMMY_CACHE, 'template_fragments': DUMMY_CACHE, 'sessions': DUMMY_CACHE}
+)
+
+
+class FlakyEmailBackend(LocmemEmailBackend):
+    """Locmem backend that refuses to deliver to addresses starting with 'bounce'."""
+
+    def send_messages(self, messages):
+        for message in messages:
+            if any(to.startswith('bounce') for to in message.to):
+                raise ConnectionError("recipient refused")
+        return super().send_messages(messages)
+
+
+class NewsletterOutboxTests(TestCase):
+    def setUp(self):
+        self.author = CustomUser.objects.create_user('author@example.com', 'Ada', 'Author', 'pw')
+        for i in range(5):
+            ContactMessage.objects.create(
+                name=f"Reader {i}", email=f"reader{i}@example.com", message="hi", consent_email_updates=True
+            )
+        ContactMessage.objects.create(name="Opted out", email="no@example.com", message="hi")
+
+    def publish(self, title="Outbox"):
+        return Article.objects.create(author=self.author, title=title, body="<p>x</p>", keywords=title)
+
+    def test_publishing_enqueues_without_sending(self):
+        with CaptureQueriesContext(connection) as few_recipients:
+            self.publish()
+        self.assertEqual(len(mail.outbox), 0)
+        self.assertEqual(OutboxEmail.objects.filter(status=OutboxEmail.Status.PENDING).count(), 5)
+
+        Subscriber.objects.bulk_create([Subscriber(name="More", email=f"more{i}@example.com") for i in range(50)])
+        with CaptureQueriesContext(connection) as many_recipients:
+            self.publish("Second")
+        self.assertEqual(len(many_recipients), len(few_recipients))
+        self.assertFalse(OutboxEmail.objects.filter(recipient="no@example.com").exists())
+
+    def test_worker_drains_in_batches(self):
+        self.publish()
+        with OutboxWorker(workers=2, batch_size=2) as worker:
+            batches = worker.drain()
+        self.assertEqual([b.sent for b in batches], [2, 2, 1])
+        self.assertEqual(len(mail.outbox), 5)
+        self.assertIn("/unsubscribe/", mail.outbox[0].body)
+        self.assertFalse(OutboxEmail.objects.exclude(status=OutboxEmail.Status.SENT).exists())
+
+    @override_settings(
+        EMAIL_BACKEND='impalawebsite.tests.FlakyEmailBackend',
+        OUTBOX_MAX_ATTEMPTS=2,
+        OUTBOX_RETRY_BASE_SECONDS=30,
+    )
+    def test_failures_back_off_then_give_up(self):
+        ContactMessage.objects.create(name="Bouncer", email="bounce@example.com", message="hi", consent_email_updates=True)
+        self.publish()
+
+        with OutboxWorker(workers=1) as worker:
+            worker.drain()
+        bounced = OutboxEmail.objects.get(recipient="bounce@example.com")
+        self.assertEqual(bounced.status, OutboxEmail.Status.PENDING)
+        self.assertEqual(bounced.attempts, 1)
+        self.assertGreater(bounced.available_at, timezone.now())
+        self.assertEqual(len(mail.outbox), 5)
+
+        OutboxEmail.objects.filter(pk=bounced.pk).update(available_at=timezone.now())
+        with OutboxWorker(workers=1) as worker:
+            worker.drain()
+        bounced.refresh_from_db()
+        self.assertEqual(bounced.status, OutboxEmail.Status.FAILED)
+        self.assertIn("recipient refused", bounced.last_error)
+
+    def test_looping_worker_requeues_rows_abandoned_mid_run(self):
+        class Stop(Exception):
+            pass
+
+        def crash_elsewhere(seconds):
+            if OutboxEmail.objects.filter(recipient="stuck@example.com").exists():
+                raise Stop
+            # Another worker claimed this row and died while the loop was idle.
+            enqueue_emails([("stuck@example.com", "Stuck", "body")])
+            OutboxEmail.objects.update(status=OutboxEmail.Status.SENDING, available_at=timezone.now() - timedelta(hours=1))
+
+        out = io.StringIO()
+        with mock.patch('impalawebsite.management.commands.send_outbox.time.sleep', crash_elsewhere):
+            with self.assertRaises(Stop):
+                call_command('send_outbox', '--loop', stdout=out)
+        self.assertIn("Requeued 1 emails", out.getvalue())
+        self.assertEqual(OutboxEmail.objects.get(recipient="stuck@example.com").status, OutboxEmail.Status.SENT)
+
+@without_page_cache
+class ArticleListPaginationTests(TestCase):
+    def setUp(self):
+        self.authors = [
+            CustomUser.objects.create_user(f'author{i}@example.com', 'A', str(i), 'pw') for i in range(3)
+        ]
+        ContactMessage.objects.all().delete()
+
+    def make_articles(self, count):
+        Article.objects.bulk_create([
+            Article(author=self.authors[i % 3], title=f"Article {i}", body="<p>body</p>" * 50, keywords="k")
+            for i in range(count)
+        ])
+
+    def test_html_list_query_count_is_constant(self):
+        self.make_articles(3)
+        with self.assertNumQueries(3):  # ETag summary + articles + prefetched keywords
+            self.client.get(reverse('article_list'))
+        self.make_articles(40)
+        with self.assertNumQueries(3):
+            response = self.client.get(reverse('article_list'))
+        self.assertEqual(len(response.context['articles']), 12)
+        self.assertNotIn('body', response.context['articles'][0].__dict__)
+
+    def test_html_list_walks_every_article_once(self):
+        self.make_articles(30)
+        seen, cursor = [], None
+        while True:
+            response = self.client.get(reverse('article_list'), {'cursor': cursor} if cursor else {})
+            seen.extend(a.pk for a in response.context['articles'])
+            cursor = response.context['next_cursor']
+            if not cursor:
+                break
+        self.assertEqual(sorted(seen), sorted(Article.objects.values_list('pk', flat=True)))
+        self.assertEqual(len(seen), len(set(seen)))
+
+    def test_api_list_is_cursor_paginated(self):
+        self.make_articles(15)
+        with self.assertNumQueries(3):
+            response = self.client.get('/api/articles/')
+        self.assertEqual(len(response.json()['results']), 12)
+        response = self.client.get(response.json()['next'])
+        self.assertEqual(len(response.json()['results']), 3)
+        self.assertIsNone(response.json()['next'])
+
+class ArticleSearchTests(TestCase):
+    def setUp(self):
+        self.author = CustomUser.objects.create_user('search@example.com', 'S', 'Earch', 'pw')
+
+    def publish(self, title, body, keywords="health"):
+        return Article.objects.create(author=self.author, title=title, body=body, keywords=keywords)
+
+    def search(self, q, **params):
+        return self.client.get('/api/articles/search/', {'q': q, **params}).json()
+
+    def test_ranks_title_matches_first_and_highlights(self):
+        self.publish("Clinic update", "<p>We discussed <b>malaria</b> screening in passing.</p>")
+        best = self.publish("Malaria screening results", "<p>Results from the trial.</p>")
+        data = self.search("malaria")
+        self.assertEqual([r['id'] for r in data['results']][0], best.pk)
+        self.assertEqual(len(data['results']), 2)
+        self.assertIn("<mark>Malaria</mark>", data['results'][0]['title_highlight'])
+        self.assertNotIn("<b>", data['results'][1]['snippet'])
+
+    def test_index_follows_updates_and_deletes(self):
+        article = self.publish("Draft", "<p>placeholder</p>")
+        article.body = "<p>hypertension outreach</p>"
+        article.save()
+        self.assertEqual(self.search("placeholder")['results'], [])
+        self.assertEqual(len(self.search("hypertension")['results']), 1)
+        article.delete()
+        self.assertEqual(self.search("hypertension")['results'], [])
+
+    def test_operators_are_treated_as_text_and_results_paginate(self):
+        for i in range(3):
+            self.publish(f"Vaccine report {i}", "<p>vaccine</p>")
+        self.assertEqual(self.search('vaccine" OR NEAR(')['results'], [])
+        first = self.search("vacc", page_size=2)
+        self.assertEqual(len(first['results']), 2)
+        second = self.client.get(first['next']).json()
+        self.assertEqual(len(second['results']), 1)
+        self.assertIsNone(second['next'])
+
+    def test_benchmark_command_runs(self):
+        out = io.StringIO()
+        call_command('bench_search', '--articles', '20', '--queries', '5', stdout=out)
+        self.assertIn("Indexed 20 articles", out.getvalue())
+        self.assertIn("5 ranked queries", out.getvalue())
+
+
+class KeywordTests(TestCase):
+    def setUp(self):
+        self.author = CustomUser.objects.create_user('tags@example.com', 'T', 'Ags', 'pw')
+
+    def publish(self, keywords, title="Tagged"):
+        return Article.objects.create(author=self.author, title=title, body="<p>x</p>", keywords=keywords)
+
+    def counts(self):
+        return dict(Keyword.objects.values_list('slug', 'article_count'))
+
+    def test_counts_are_maintained_incrementally(self):
+        first = self.publish("Malaria, Digital Health, malaria")
+        self.publish("digital health")
+        self.assertEqual(self.counts(), {'malaria': 1, 'digital-health': 2})
+
+        first.keywords = "Diabetes, Digital Health"
+        first.save()
+        self.assertEqual(self.counts(), {'malaria': 0, 'digital-health': 2, 'diabetes': 1})
+
+        first.delete()
+        self.assertEqual(self.counts(), {'malaria': 0, 'digital-health': 1, 'diabetes': 0})
+
+    def test_keyword_filter_matches_whole_tags_only(self):
+        health = self.publish("health", title="Health")
+        self.publish("healthcare, mental health", title="Other")
+        response = self.client.get('/api/articles/', {'keyword': 'Health'})
+        self.assertEqual([a['id'] for a in response.json()['results']], [health.pk])
+        response = self.client.get(reverse('article_list'), {'keyword': 'health'})
+        self.assertEqual([a.pk for a in response.context['articles']], [health.pk])
+
+    def test_keyword_list_uses_prefetch_and_keeps_author_order(self):
+        self.publish("Zebra, apple, Mango")
+        article = Article.objects.with_keywords().get()
+        with self.assertNumQueries(0):
+            self.assertEqual(article.keyword_list(), ["Zebra", "apple", "Mango"])
+
+
+def png_upload(name="cover.png", size=(2000, 1000), color=(200, 30, 30, 128)):
+    buffer = io.BytesIO()
+    Image.new("RGBA", size, color).save(buffer, "PNG")
+    return SimpleUploadedFile(name, buffer.getvalue(), content_type="image/png")
+
+
+class TempMediaMixin:
+    def setUp(self):
+        super().setUp()
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root, ignore_errors=True)
+        override = override_settings(MEDIA_ROOT=self.media_root, IMAGE_RENDITION_WIDTHS=[320, 640])
+        override.enable()
+        self.addCleanup(override.disable)
+
+
+class ImageRenditionTests(TempMediaMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.author = CustomUser.objects.create_user('img@example.com', 'I', 'Mage', 'pw')
+
+    def publish(self, upload, title="Pictured"):
+        return Article.objects.create(
+            author=self.author, title=title, body="<p>x</p>", keywords="k", featured_image=upload
+        )
+
+    def test_upload_is_queued_and_rendered_off_request(self):
+        article = self.publish(png_upload())
+        self.assertEqual(article.cover_renditions.status, ImageRenditionSet.Status.PENDING)
+
+        self.assertEqual(images.process_pending(), (1, 0))
+        renditions = ImageRenditionSet.objects.get()
+        self.assertEqual((renditions.width, renditions.height, renditions.widths), (2000, 1000, [320, 640]))
+        with Image.open(f"{self.media_root}/{images.rendition_name(renditions.source_hash, 640, 'webp')}") as webp:
+            self.assertEqual(webp.size, (640, 320))
+
+        html = self.client.get(reverse('article_list')).content.decode()
+        self.assertIn('<source type="image/webp" srcset="/media/renditions/', html)
+        self.assertIn('loading="lazy"', html)
+
+        data = self.client.get(f'/api/articles/{article.pk}/').json()
+        self.assertEqual([r['width'] for r in data['cover_renditions']['jpg']], [320, 640])
+
+    def test_identical_reupload_shares_one_file_and_renditions(self):
+        first = self.publish(png_upload("a.png"))
+        images.process_pending()
+        second = self.publish(png_upload("copy of a.png"), title="Again")
+        images.process_pending()
+        self.assertEqual(first.featured_image.name, second.featured_image.name)
+        self.assertEqual(ImageRenditionSet.objects.count(), 1)
+
+    def test_small_images_are_not_upscaled_and_body_images_get_srcset(self):
+        article = self.publish(png_upload(size=(500, 250)))
+        embed = Article.objects.create(
+            author=self.author, title="Embed", keywords="k", body=f'<img src="{article.featured_image.url}">'
+        )
+        self.assertNotIn('srcset', embed.body_html)
+        images.process_pending()
+        self.assertEqual(ImageRenditionSet.objects.get().widths, [320, 500])
+        embed.refresh_from_db()
+        self.assertIn('srcset="/media/renditions/', embed.body_html)
+
+        body = f'<p><img src="{article.featured_image.url}" style="width: 50%;"><img src="https://example.com/x.png"></p>'
+        html = images.add_srcset_to_html(body)
+        self.assertEqual(html.count('srcset="/media/renditions/'), 1)
+        self.assertEqual(html.count('loading="lazy"'), 2)
+
+
+class MediaStorageTests(TempMediaMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.author = CustomUser.objects.create_user('gc@example.com', 'G', 'C', 'pw')
+
+    def store(self, name, data):
+        return default_storage.save(name, ContentFile(data))
+
+    def test_uploads_are_stored_once_by_content_hash(self):
+        storage = ContentAddressedStorage()
+        first = storage.save('django-summernote/2025-09-24/a.png', ContentFile(b'same bytes'))
+        second = storage.save('django-summernote/2025-09-25/b.PNG', ContentFile(b'same bytes'))
+        self.assertEqual(first, second)
+        self.assertTrue(ContentAddressedStorage.is_hashed_name(first))
+        self.assertTrue(first.startswith('django-summernote/') and first.endswith('.png'))
+
+    def test_cleanup_keeps_referenced_media_and_respects_dry_run(self):
+        used = self.store('django-summernote/2025-09-24/used.png', b'used')
+        self.store('django-summernote/2025-09-24/unused.png', b'unused')
+        Article.objects.create(
+            author=self.author, title="Refs", keywords="k", body=f'<p><img src="/media/{used}"></p>'
+        )
+
+        out = io.StringIO()
+        call_command('cleanup_media', '--dry-run', '--min-age-hours', '0', stdout=out)
+        self.assertIn('1 unreferenced files', out.getvalue())
+        self.assertTrue(default_storage.exists('django-summernote/2025-09-24/unused.png'))
+
+        call_command('cleanup_media', '--min-age-hours', '0', stdout=io.StringIO())
+        self.assertTrue(default_storage.exists(used))
+        self.assertFalse(default_storage.exists('django-summernote/2025-09-24/unused.png'))
+
+    def test_recent_uploads_are_never_collected(self):
+        self.store('django-summernote/2025-09-24/draft.png', b'draft')
+        self.assertEqual(list(media_gc.find_orphans()), [])
+
+    def test_dedupe_repoints_legacy_duplicates(self):
+        old_a = self.store('article_covers/41.png', b'cover')
+        old_b = self.store('article_covers/41_AWXBApL.png', b'cover')
+        Article.objects.bulk_create([
+            Article(author=self.author, title="A", keywords="k", body=f'<img src="/media/{old_a}">', featured_image=old_a),
+            Article(author=self.author, title="B", keywords="k", body="", featured_image=old_b),
+        ])
+        moved = media_gc.adopt_legacy_files()
+        self.assertEqual(len(set(moved.values())), 1)
+        new_name = moved[old_a]
+        self.assertEqual(set(Article.objects.values_list('featured_image', flat=True)), {new_name})
+        self.assertIn(f'/media/{new_name}"', Article.objects.get(title="A").body)
+        self.assertEqual(
+            {name for name, _ in media_gc.find_orphans(min_age=timedelta(0))}, {old_a, old_b}
+        )
+
+
+class RenderedBodyTests(TestCase):
+    def setUp(self):
+        self.author = CustomUser.objects.create_user('render@example.com', 'R', 'Ender', 'pw')
+
+    def test_body_is_sanitized_once_on_save(self):
+        words = " ".join(["word"] * 450)
+        article = Article.objects.create(
+            author=self.author, title="Unsafe", keywords="k",
+            body=f'<p onclick="x()">{words}</p><script>alert(1)</script><img src="https://example.com/a.png">',
+        )
+        self.assertNotIn("<script", article.body_html)
+        self.assertNotIn("onclick", article.body_html)
+        self.assertIn('loading="lazy"', article.body_html)
+        self.assertEqual(article.reading_time, 3)
+        self.assertTrue(article.excerpt.startswith("word word") and len(article.excerpt) <= 300)
+
+        with mock.patch('impalawebsite.fields.bleach.clean') as clean:
+            response = self.client.get(reverse('article_detail', args=[article.pk]))
+            self.client.get(f'/api/articles/{article.pk}/')
+        clean.assert_not_called()
+        self.assertContains(response, article.body_html, html=False)
+
+    def test_backfill_command_renders_existing_rows(self):
+        Article.objects.bulk_create([
+            Article(author=self.author, title=f"Legacy {i}", keywords="k", body=f"<p>legacy {i}</p>")
+            for i in range(5)
+        ])
+        call_command('render_article_bodies', '--batch-size', '2', stdout=io.StringIO())
+        self.assertEqual(
+            sorted(Article.objects.values_list('body_html', flat=True)),
+            [f"<p>legacy {i}</p>" for i in range(5)],
+        )
+        self.assertFalse(Article.objects.filter(excerpt='').exists())
+
+    def test_migration_backfills_rows_saved_before_rendering_existed(self):
+        Article.objects.bulk_create([
+            Article(author=self.author, title=f"Legacy {i}", keywords="k", body=f"<p>legacy {i}</p>") for i in range(3)
+        ])
+        migration = import_module('impalawebsite.migrations.0016_backfill_rendered_body')
+        migration.backfill_rendered_body(django_apps, None)
+        self.assertEqual(
+            sorted(Article.objects.values_list('body_html', 'excerpt')),
+            [(f"<p>legacy {i}</p>", f"legacy {i}") for i in range(3)],
+        )
+
+    def test_backfill_refreshes_cached_list_cards(self):
+        caches['pages'].clear()
+        caches['template_fragments'].clear()
+        Article.objects.bulk_create([Article(author=self.author, title="Legacy", keywords="k", body="<p>fresh lede</p>")])
+        self.assertNotContains(self.client.get(reverse('article_list')), "fresh lede")
+        call_command('render_article_bodies', stdout=io.StringIO())
+        self.assertContains(self.client.get(reverse('article_list')), "fresh lede")
+
+
+class PageCacheTests(TestCase):
+    def setUp(self):
+        caches['pages'].clear()
+        self.author = CustomUser.objects.create_user('cache@example.com', 'C', 'Ache', 'pw')
+        self.article = Article.objects.create(
+            author=self.author, title="Cached", keywords="k", body="<p>first version</p>"
+        )
+        self.detail_url = reverse('article_detail', args=[self.article.pk])
+
+    def test_second_request_is_served_from_cache(self):
+        first = self.client.get(self.detail_url)
+        self.assertEqual(first['X-Page-Cache'], 'miss')
+        with self.assertNumQueries(1):  # only the updated_at lookup for the ETag
+            second = self.client.get(self.detail_url)
+        self.assertEqual(second['X-Page-Cache'], 'hit')
+        self.assertContains(second, "first version")
+
+    def test_cached_pages_carry_the_visitors_own_csrf_token(self):
+        self.client.get(reverse('article_list'))
+        other = self.client_class(enforce_csrf_checks=True)
+        response = other.get(reverse('article_list'))
+        self.assertEqual(response['X-Page-Cache'], 'hit')
+        self.assertNotContains(response, "__impala_csrf_token__")
+        token = re.search(r'name="csrfmiddlewaretoken" value="([^"]+)"', response.content.decode()).group(1)
+        with mock.patch('impalawebsite.views.ContactForm') as form:
+            form.return_value.is_valid.return_value = False
+            form.return_value.errors = {}
+            posted = other.post(reverse('contact'), {'csrfmiddlewaretoken': token})
+        self.assertNotEqual(posted.status_code, 403)
+
+    def test_saving_or_deleting_an_article_invalidates_its_pages(self):
+        self.client.get(self.detail_url)
+        self.client.get(reverse('article_list'))
+        self.article.body = "<p>second version</p>"
+        self.article.save()
+
+        response = self.client.get(self.detail_url)
+        self.assertEqual(response['X-Page-Cache'], 'miss')
+        self.assertContains(response, "second version")
+        self.assertEqual(self.client.get(reverse('article_list'))['X-Page-Cache'], 'miss')
+
+        self.client.get(reverse('article_list'))
+        self.article.delete()
+        response = self.client.get(reverse('article_list'))
+        self.assertEqual(response['X-Page-Cache'], 'miss')
+        self.assertNotContains(response, "Cached")
+        self.assertEqual(self.client.get(self.detail_url).status_code, 404)
+
+    def test_author_and_anonymous_visitors_get_separate_copies(self):
+        self.client.get(self.detail_url)
+        self.client.force_login(self.author)
+        response = self.client.get(self.detail_url)
+        self.assertEqual(response['X-Page-Cache'], 'miss')
+        self.assertContains(response, reverse('article_update', args=[self.article.pk]))
+        self.client.logout()
+        self.assertNotContains(self.client.get(self.detail_url), reverse('article_update', args=[self.article.pk]))
+
+    def test_stats_endpoint_is_staff_only(self):
+        self.client.get(self.detail_url)
+        self.client.get(self.detail_url)
+        self.assertEqual(self.client.get('/api/cache-stats/').status_code, 403)
+
+        staff = CustomUser.objects.create_superuser('staff@example.com', 'S', 'Taff', 'pw')
+        self.client.force_login(staff)
+        stats = self.client.get('/api/cache-stats/').json()
+        self.assertEqual(stats['article_detail'], {'hits': 1, 'misses': 1, 'hit_ratio': 0.5})
+
+
+class ConditionalGetTests(TestCase):
+    def setUp(self):
+        caches['pages'].clear()
+        self.author = CustomUser.objects.create_user('etag@example.com', 'E', 'Tag', 'pw')
+        self.article = Article.objects.create(author=self.author, title="Fresh", keywords="k", body="<p>v1</p>")
+        self.urls = [
+            reverse('article_detail', args=[self.article.pk]),
+            reverse('article_list'),
+            f'/api/articles/{self.article.pk}/',
+            '/api/articles/',
+        ]
+
+    def test_revalidation_returns_304_without_rendering(self):
+        for url in self.urls:
+            with self.subTest(url=url):
+                response = self.client.get(url)
+                self.assertEqual(response.status_code, 200)
+                self.assertIn('no-cache', response['Cache-Control'])
+                self.assertIn('public', response['Cache-Control'])
+                with self.assertNumQueries(1):
+                    revalidated = self.client.get(url, HTTP_IF_NONE_MATCH=response['ETag'])
+                self.assertEqual(revalidated.status_code, 304)
+                self.assertEqual(revalidated['ETag'], response['ETag'])
+                self.assertEqual(
+                    self.client.get(url, HTTP_IF_MODIFIED_SINCE=response['Last-Modified']).status_code, 304
+                )
+
+    def test_changes_produce_new_validators(self):
+        etags = [self.client.get(url)['ETag'] for url in self.urls]
+        self.article.title = "Edited"
+        self.article.save()
+        for url, etag in zip(self.urls, etags):
+            with self.subTest(url=url):
+                self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+        list_etag = self.client.get('/api/articles/')['ETag']
+        Article.objects.create(author=self.author, title="Newer", keywords="k", body="<p>x</p>").delete()
+        self.assertEqual(self.client.get('/api/articles/', HTTP_IF_NONE_MATCH=list_etag).status_code, 200)
+
+    def test_html_validators_differ_per_user(self):
+        anonymous = self.client.get(self.urls[0])['ETag']
+        self.client.force_login(self.author)
+        response = self.client.get(self.urls[0], HTTP_IF_NONE_MATCH=anonymous)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('private', response['Cache-Control'])
+
+
+class SparseFieldsetTests(TestCase):
+    def setUp(self):
+        caches['pages'].clear()
+        self.author = CustomUser.objects.create_user('sparse@example.com', 'Ada', 'Lovelace', 'pw')
+        self.article = Article.objects.create(
+            author=self.author, title="Compact", keywords="Health, Data", body="<p>" + "long " * 500 + "</p>"
+        )
+
+    def test_list_uses_the_compact_representation(self):
+        with CaptureQueriesContext(connection) as queries:
+            item = self.client.get('/api/articles/').json()['results'][0]
+        self.assertEqual(set(item), {
+            'id', 'title', 'excerpt', 'reading_time', 'cover_thumbnail', 'author_name',
+            'keyword_list', 'created_at', 'updated_at',
+        })
+        self.assertEqual(item['author_name'], "Ada Lovelace")
+        self.assertEqual(item['keyword_list'], ["Health", "Data"])
+        article_select = next(q['sql'] for q in queries if 'LIMIT' in q['sql'])
+        self.assertNotIn('"body"', article_select)
+        self.assertNotIn('"body_html"', article_select)
+
+    def test_fields_and_omit_narrow_the_select(self):
+        with CaptureQueriesContext(connection) as queries:
+            data = self.client.get(f'/api/articles/{self.article.pk}/', {'fields': 'title,excerpt'}).json()
+        self.assertEqual(data, {'title': "Compact", 'excerpt': self.article.excerpt})
+        article_select = queries[-1]['sql']
+        self.assertNotIn('"body"', article_select)
+        self.assertNotIn('customuser', article_select)
+
+        data = self.client.get('/api/articles/', {'omit': 'keyword_list,cover_thumbnail'}).json()
+        self.assertNotIn('keyword_list', data['results'][0])
+        self.assertIn('author_name', data['results'][0])
+
+    def test_unknown_fields_are_rejected(self):
+        response = self.client.get('/api/articles/', {'fields': 'title,body'})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('body', response.json()['fields'][0])
+
+
+@override_settings(ROOT_URLCONF='website.asgi_urls')
+class AsyncViewTests(TestCase):
+    def setUp(self):
+        caches['pages'].clear()
+        self.author = CustomUser.objects.create_user('async@example.com', 'As', 'Ync', 'pw')
+        self.articles = [
+            Article.objects.create(author=self.author, title=f"Async {i}", keywords="Health", body=f"<p>body {i}</p>")
+            for i in range(14)
+        ]
+
+    def wsgi_get(self, url, **kwargs):
+        with override_settings(ROOT_URLCONF='website.urls'):
+            return self.client.get(url, **kwargs)
+
+    async def test_pages_are_served_by_the_async_views(self):
+        article = self.articles[0]
+        for url, text in [
+            (reverse('landing_page'), "Impala"),
+            (reverse('article_list'), "Async 13"),
+            (reverse('article_detail', args=[article.pk]), "body 0"),
+        ]:
+            with self.subTest(url=url):
+                response = await self.async_client.get(url)
+                self.assertEqual(response.resolver_match.func.__module__, 'impalawebsite.async_views')
+                self.assertContains(response, text)
+                self.assertEqual(response['X-Page-Cache'], 'miss')
+                self.assertEqual((await self.async_client.get(url))['X-Page-Cache'], 'hit')
+        self.assertEqual((await self.async_client.get(reverse('article_detail', args=[999]))).status_code, 404)
+
+    async def test_signed_in_author_sees_edit_links(self):
+        await self.async_client.aforce_login(self.author)
+        response = await self.async_client.get(reverse('article_detail', args=[self.articles[0].pk]))
+        self.assertContains(response, reverse('article_update', args=[self.articles[0].pk]))
+        self.assertIn('private', response['Cache-Control'])
+
+    async def test_api_reads_match_the_sync_api(self):
+        url = '/api/articles/?fields=id,title,keyword_list'
+        while url:
+            response = await self.async_client.get(url)
+            self.assertEqual(response.resolver_match.func.__module__, 'impalawebsite.async_views')
+            expected = await sync_to_async(self.wsgi_get)(url)
+            self.assertEqual(response.json(), expected.json())
+            self.assertEqual(response['ETag'], expected['ETag'])
+            url = response.json()['next']
+
+        detail = f'/api/articles/{self.articles[0].pk}/'
+        response = await self.async_client.get(detail)
+        self.assertEqual(response.json(), (await sync_to_async(self.wsgi_get)(detail)).json())
+        revalidated = await self.async_client.get(detail, headers={'if-none-match': response['ETag']})
+        self.assertEqual(revalidated.status_code, 304)
+        self.assertEqual((await self.async_client.get('/api/articles/999/')).status_code, 404)
+
+    async def test_api_reads_authenticate_like_the_sync_api(self):
+        token = await Token.objects.acreate(user=self.author)
+        seen = []
+        real_initial = async_views._initial
+
+        def initial(view):
+            error = real_initial(view)
+            seen.append(view.request.user)
+            return error
+
+        detail = f'/api/articles/{self.articles[0].pk}/'
+        with mock.patch('impalawebsite.async_views._initial', initial):
+            for url in ('/api/articles/', detail):
+                with self.subTest(url=url):
+                    response = await self.async_client.get(url, headers={'authorization': f'Token {token.key}'})
+                    self.assertEqual(response.status_code, 200)
+                    self.assertEqual(seen.pop(), self.author)
+
+                    bad_token = {'authorization': 'Token not-a-token'}
+                    rejected = await self.async_client.get(url, headers=bad_token)
+                    expected = await sync_to_async(self.wsgi_get)(url, headers=bad_token)
+                    self.assertEqual(expected.status_code, 403)  # SessionAuthentication comes first: no challenge
+                    self.assertEqual((rejected.status_code, rejected.json()), (403, {'detail': "Invalid token."}))
+        self.assertEqual((await self.async_client.get('/api/articles/', {'fields': 'body'})).status_code, 400)
+
+    async def test_api_writes_use_the_sync_viewset(self):
+        self.assertEqual((await self.async_client.post('/api/articles/', {})).status_code, 403)
+        await self.async_client.aforce_login(self.author)
+        response = await self.async_client.post(
+            '/api/articles/', {'title': "Posted", 'body': "<p>new</p>", 'keywords': "k"}, content_type='application/json'
+        )
+        self.assertEqual(response.status_code, 201)
+        response = await self.async_client.delete(f"/api/articles/{response.json()['id']}/")
+        self.assertEqual(response.status_code, 204)
+
+
+class DatabaseTuningTests(TestCase):
+    def test_connections_get_the_configured_pragmas(self):
+        with connection.cursor() as cursor:
+            cursor.execute('PRAGMA synchronous')
+            self.assertEqual(cursor.fetchone()[0], 1)  # NORMAL
+            cursor.execute('PRAGMA cache_size')
+            self.assertEqual(cursor.fetchone()[0], -64 * 1024)
+
+    @override_settings(DATABASE_READ_REPLICA='replica')
+    def test_replica_connections_refuse_writes(self):
+        self.assertIn('PRAGMA query_only = ON', pragma_statements('replica'))
+        self.assertNotIn('PRAGMA query_only = ON', pragma_statements('default'))
+
+    def test_asgi_entry_point_turns_persistent_connections_off(self):
+        def conn_max_age(module):
+            script = f"import {module}; from django.conf import settings; print(settings.DATABASES['default']['CONN_MAX_AGE'])"
+            env = {name: value for name, value in os.environ.items() if name not in ('DB_CONN_MAX_AGE', 'DJANGO_ASGI')}
+            return subprocess.run(
+                [sys.executable, '-c', script], env=env, cwd=settings.BASE_DIR, capture_output=True, text=True, check=True,
+            ).stdout.strip()
+
+        self.assertEqual(conn_max_age('website.asgi'), '0')
+        self.assertEqual(conn_max_age('website.wsgi'), '60')
+
+
+class QueryPlanTests(TestCase):
+    def plan(self, queryset):
+        sql, params = queryset.query.sql_with_params()
+        with connection.cursor() as cursor:
+            cursor.execute(f'EXPLAIN QUERY PLAN {sql}', params)
+            return ' | '.join(row[-1] for row in cursor.fetchall())
+
+    def test_article_pages_walk_the_created_at_index(self):
+        plan = self.plan(Article.objects.order_by('-created_at', '-pk')[:13])
+        self.assertIn('article_created_idx', plan)
+        self.assertNotIn('TEMP B-TREE', plan)
+
+    def test_author_lookups_use_the_composite_index(self):
+        plan = self.plan(Article.objects.filter(author_id=1).order_by('-created_at')[:10])
+        self.assertIn('article_author_created_idx', plan)
+        self.assertNotIn('TEMP B-TREE', plan)
+
+    def test_consented_contacts_use_the_partial_index(self):
+        plan = self.plan(contact_queryset(consent=True, since=timezone.now() - timedelta(days=30)))
+        self.assertIn('contact_consented_idx', plan)
+
+    def test_keyword_listing_uses_the_popularity_index(self):
+        plan = self.plan(Keyword.objects.filter(article_count__gt=0).order_by('-article_count', 'name'))
+        self.assertIn('keyword_popular_idx', plan)
+        self.assertNotIn('TEMP B-TREE', plan)
+
+
+class ReadReplicaRouterTests(SimpleTestCase):
+    def setUp(self):
+        self.router = routers.ReadReplicaRouter()
+        routers.unpin()
+
+    def test_without_a_replica_django_routes_as_usual(self):
+        self.assertIsNone(self.router.db_for_read(Article))
+        self.assertIsNone(self.router.db_for_write(Article))
+        self.assertIsNone(self.router.db_for_read(Article))
+
+    @override_settings(DATABASE_READ_REPLICA='replica')
+    def test_reads_leave_the_replica_once_the_request_writes(self):
+        self.assertEqual(self.router.db_for_read(Article), 'replica')
+        self.assertEqual(self.router.db_for_write(Article), 'default')
+        self.assertIsNone(self.router.db_for_read(Article))
+        routers.unpin()  # request_started
+        self.assertEqual(self.router.db_for_read(Article), 'replica')
+        self.assertFalse(self.router.allow_migrate('replica', 'impalawebsite'))
+
+    @override_settings(DATABASE_READ_REPLICA='replica')
+    def test_reads_inside_a_transaction_stay_on_the_primary(self):
+        with mock.patch.object(connection, 'in_atomic_block', True):
+            self.assertIsNone(self.router.db_for_read(Article))
+
+
+class ContactExportTests(TestCase):
+    def setUp(self):
+        self.admin = CustomUser.objects.create_superuser('admin@example.com', 'A', 'Dmin', 'pw')
+        ContactMessage.objects.bulk_create([
+            ContactMessage(name="Old", email="old@example.com", message="hi", consent_email_updates=True),
+            ContactMessage(name="New", email="new@example.com", message="=HYPERLINK(1)", consent_email_updates=False),
+            ContactMessage(name="Sub", email="sub@example.com", message="hello", consent_email_updates=True),
+        ])
+        ContactMessage.objects.filter(name="Old").update(submitted_at=timezone.now() - timedelta(days=30))
+
+    def export(self, **params):
+        response = self.client.get('/api/contacts/export/', params)
+        self.assertTrue(response.streaming)
+        return b''.join(response.streaming_content).decode()
+
+    def test_export_requires_a_superuser(self):
+        self.assertEqual(self.client.get('/api/contacts/export/').status_code, 403)
+
+    def test_csv_export_with_filters(self):
+        self.client.force_login(self.admin)
+        since = (timezone.now() - timedelta(days=1)).date().isoformat()
+        lines = self.export(since=since).splitlines()
+        self.assertEqual(lines[0], "id,name,email,phone,message,consent_email_updates,submitted_at")
+        self.assertEqual([line.split(',')[1] for line in lines[1:]], ["New", "Sub"])
+        self.assertIn(",'=HYPERLINK(1),false,", lines[1])
+
+        self.assertEqual(self.client.get('/api/contacts/export/', {'since': 'yesterday'}).status_code, 400)
+        self.assertEqual(self.client.get('/api/contacts/export/', {'type': 'xml'}).status_code, 400)
+
+    def test_ndjson_export_and_command(self):
+        self.client.force_login(self.admin)
+        rows = [json.loads(line) for line in self.export(type='ndjson', consent='true').splitlines()]
+        self.assertEqual([row['name'] for row in rows], ["Old", "Sub"])
+        self.assertIs(rows[0]['consent_email_updates'], True)
+
+        out = io.StringIO()
+        call_command('export_contacts', '--format', 'ndjson', '--consent', 'false', stdout=out)
+        self.assertEqual([json.loads(line)['email'] for line in out.getvalue().splitlines()], ["new@example.com"])
+
+    @tag('slow')  # ~45s under tracemalloc; skip with `manage.py test --exclude-tag slow`
+    def test_million_row_export_runs_in_constant_memory(self):
+        rows = 1_000_000
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "WITH RECURSIVE n(i) AS (SELECT 1 UNION ALL SELECT i + 1 FROM n WHERE i < %s) "
+                "INSERT INTO impalawebsite_contactmessage "
+                "(name, email, phone, message, consent_email_updates, submitted_at) "
+                "SELECT 'Contact ' || i, 'c' || i || '@example.com', '', 'Synthetic message number ' || i, "
+                "i % 2, '2026-01-01 00:00:00' FROM n",
+                [rows],
+            )
+        exported = size = 0
+        tracemalloc.start()
+        try:
+            for chunk in contacts_csv(contact_queryset()):
+                exported += chunk.count('\n')
+                size += len(chunk)
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        self.assertEqual(exported, rows + 3 + 1)  # + setUp rows + header
+        self.assertGreater(size, 50 * 1024 * 1024)
+        self.assertLess(peak, 16 * 1024 * 1024)
+
+
+@override_settings(PRERENDER_ON_SAVE=False)
+class BulkCreateTests(TestCase):
+    def setUp(self):
+        caches['pages'].clear()
+        self.author = CustomUser.objects.create_superuser('bulk@example.com', 'B', 'Ulk', 'pw')
+        self.client.force_login(self.author)
+        Subscriber.objects.bulk_create([Subscriber(name=f"Reader {i}", email=f"r{i}@example.com") for i in range(3)])
+
+    def articles(self, count, start=0):
+        return [
+            {'title': f"Imported {i}", 'body': f"<p>malaria report {i}</p>", 'keywords': "Imported, Malaria"}
+            for i in range(start, start + count)
+        ]
+
+    def post(self, url, rows, **params):
+        query = '&'.join(f'{key}={value}' for key, value in params.items())
+        with self.captureOnCommitCallbacks(execute=True):
+            return self.client.post(f'{url}?{query}', rows, content_type='application/json')
+
+    def test_articles_are_inserted_in_bulk_with_one_digest_per_subscriber(self):
+        response = self.post('/api/articles/bulk/', self.articles(3))
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual([row['index'] for row in response.json()['created']], [0, 1, 2])
+
+        article = Article.objects.get(title="Imported 1")
+        self.assertEqual(article.author, self.author)
+        self.assertEqual(article.body_html, "<p>malaria report 1</p>")
+        self.assertEqual(article.keyword_list(), ["Imported", "Malaria"])
+        self.assertEqual(Keyword.objects.get(slug='malaria').article_count, 3)
+        self.assertEqual(len(self.client.get('/api/articles/search/', {'q': 'malaria'}).json()['results']), 3)
+
+        emails = OutboxEmail.objects.all()
+        self.assertEqual(emails.count(), 3)
+        self.assertEqual(emails[0].subject, "3 new articles from Impala Health Tech Research Limited")
+        self.assertIn("Imported 2", emails[0].body)
+
+    def test_query_count_does_not_grow_with_the_batch(self):
+        self.post('/api/articles/bulk/', self.articles(1, start=100), notify='false')  # creates the keywords
+        with CaptureQueriesContext(connection) as small:
+            self.post('/api/articles/bulk/', self.articles(5), notify='false')
+        with CaptureQueriesContext(connection) as large:
+            self.post('/api/articles/bulk/', self.articles(60, start=5), notify='false')
+        self.assertEqual(len(small), len(large))
+        self.assertFalse(OutboxEmail.objects.exists())
+
+    def test_invalid_rows_reject_the_batch_unless_skipped(self):
+        rows = self.articles(3)
+        rows[1] = {'body': "no title"}
+        response = self.post('/api/articles/bulk/', rows)
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual([error['index'] for error in response.json()['errors']], [1])
+        self.assertIn('title', response.json()['errors'][0]['errors'])
+        self.assertFalse(Article.objects.exists())
+
+        response = self.post('/api/articles/bulk/', rows, skip_invalid='true')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual([row['index'] for row in response.json()['created']], [0, 2])
+        self.assertEqual(Article.objects.count(), 2)
+
+        self.assertEqual(self.post('/api/articles/bulk/', {'title': "not a list"}).status_code, 400)
+
+    def test_contact_import_sends_one_aggregated_signal(self):
+        received = []
+        handler = lambda sender, contacts, **kwargs: received.append(len(contacts))
+        contacts_bulk_created.connect(handler)
+        self.addCleanup(contacts_bulk_created.disconnect, handler)
+
+        rows = [{'name': f"Legacy {i}", 'email': f"legacy{i}@example.com", 'message': "import",
+                 'consent_email_updates': True} for i in range(4)]
+        response = self.post('/api/contacts/bulk/', rows)
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(received, [4])
+        self.assertEqual(ContactMessage.objects.filter(email__startswith='legacy').count(), 4)
+
+        self.client.logout()
+        self.assertEqual(self.post('/api/contacts/bulk/', rows).status_code, 403)
+
+
+class SubscriberRegistryTests(TestCase):
+    def setUp(self):
+        self.author = CustomUser.objects.create_user('registry@example.com', 'R', 'Egistry', 'pw')
+
+    def submit(self, name, email, consent=True):
+        ContactMessage.objects.create(name=name, email=email, message="hi", consent_email_updates=consent)
+
+    def test_repeat_submissions_get_one_newsletter(self):
+        self.submit("Ann", "ann@example.com")
+        self.submit("Ann B.", " ANN@Example.com ")
+        self.submit("Ann", "ann@example.com")
+        self.submit("Quiet", "quiet@example.com", consent=False)
+        subscriber = Subscriber.objects.get()
+        self.assertEqual((subscriber.email, subscriber.name), ("ann@example.com", "Ann"))
+
+        Article.objects.create(author=self.author, title="Once", body="<p>x</p>", keywords="k")
+        self.assertEqual(list(OutboxEmail.objects.values_list('recipient', flat=True)), ["ann@example.com"])
+
+    def test_contact_form_subscribes(self):
+        self.client.post(reverse('contact'), {
+            'name': "Form", 'email': "form@example.com", 'message': "hello", 'consent_email_updates': 'on',
+        })
+        self.assertTrue(Subscriber.objects.filter(email="form@example.com", is_active=True).exists())
+
+    def test_unsubscribe_link_deactivates_and_resubmitting_reactivates(self):
+        self.submit("Ben", "ben@example.com")
+        self.submit("Ben", "ben@example.com")
+        subscriber = Subscriber.objects.get()
+        response = self.client.get(reverse('unsubscribe', args=[make_unsubscribe_token(subscriber)]))
+        self.assertContains(response, "Ben")
+        subscriber.refresh_from_db()
+        self.assertFalse(subscriber.is_active)
+        self.assertFalse(ContactMessage.objects.filter(consent_email_updates=True).exists())
+
+        self.submit("Ben", "ben@example.com")
+        subscriber.refresh_from_db()
+        self.assertTrue(subscriber.is_active)
+
+    def test_links_signed_for_contacts_still_work(self):
+        self.submit("Cy", "cy@example.com")
+        contact = ContactMessage.objects.get()
+        legacy_token = signer.sign(contact.pk)  # format used before the registry
+        self.assertEqual(self.client.get(reverse('unsubscribe', args=[legacy_token])).status_code, 200)
+        self.assertFalse(Subscriber.objects.get().is_active)
+        self.assertEqual(self.client.get(reverse('unsubscribe', args=["forged:1"])).status_code, 400)
+
+    def test_recipients_are_selected_with_one_query(self):
+        Subscriber.objects.bulk_create([Subscriber(name="S", email=f"s{i}@example.com") for i in range(20)])
+        with self.assertNumQueries(1):
+            emails = [subscriber.email for subscriber in subscribers.active_subscribers().iterator()]
+        self.assertEqual(len(emails), 20)
+
+
+@override_settings(
+    THROTTLE_RATES={
+        "login": {"ip": "100/min", "account": "2/min"},
+        "contact": {"ip": "2/min"},
+        "upload": {"ip": "1/min"},
+    },
+    PASSWORD_HASH_CONCURRENCY=1,
+    PASSWORD_HASH_QUEUE_SECONDS=0,
+)
+class ThrottlingTests(TestCase):
+    def setUp(self):
+        throttling.throttle_cache().clear()
+
+    def login(self, email, ip):
+        return self.client.post(
+            '/api/login/', {'username': email, 'password': 'wrong'}, content_type='application/json', REMOTE_ADDR=ip,
+        )
+
+    def test_token_bucket_refills_over_time(self):
+        rate = throttling.Rate.parse("2/min")
+        self.assertEqual(throttling.take_token('bucket', rate, now=1000), 0)
+        self.assertEqual(throttling.take_token('bucket', rate, now=1000), 0)
+        self.assertAlmostEqual(throttling.take_token('bucket', rate, now=1000), 30)
+        self.assertEqual(throttling.take_token('bucket', rate, now=1030), 0)
+
+    def test_login_is_throttled_per_account_across_ips(self):
+        self.assertEqual(self.login("victim@example.com", "10.0.0.1").status_code, 400)
+        self.assertEqual(self.login("Victim@example.com", "10.0.0.2").status_code, 400)
+        response = self.login("victim@example.com", "10.0.0.3")
+        self.assertEqual(response.status_code, 429)
+        self.assertGreaterEqual(int(response['Retry-After']), 1)
+        self.assertEqual(self.login("other@example.com", "10.0.0.3").status_code, 400)
+
+    def test_contact_form_is_throttled_per_ip_and_counted(self):
+        for _ in range(2):
+            self.assertNotEqual(self.client.post(reverse('contact'), {}).status_code, 429)
+        self.assertEqual(self.client.post(reverse('contact'), {}).status_code, 429)
+        self.assertEqual(self.client.get(reverse('contact')).status_code, 200)
+
+        admin = CustomUser.objects.create_superuser('throttle@example.com', 'T', 'Hrottle', 'pw')
+        self.client.force_login(admin)
+        self.assertEqual(self.client.get('/api/throttle-stats/').json()['contact'], {'rate': 1, 'concurrency': 0})
+
+    def test_contact_api_shares_the_contact_form_bucket(self):
+        contact = {'name': "Bot", 'email': "bot@example.com", 'message': "hi"}
+        self.assertNotEqual(self.client.post(reverse('contact'), {}).status_code, 429)
+        self.assertEqual(self.client.post('/api/contacts/', contact, content_type='application/json').status_code, 201)
+        response = self.client.post('/api/api/contacts/', contact, content_type='application/json')
+        self.assertEqual(response.status_code, 429)
+        self.assertGreaterEqual(int(response['Retry-After']), 1)
+        self.assertEqual(ContactMessage.objects.count(), 1)
+
+    def test_summernote_upload_is_throttled(self):
+        self.client.post('/summernote/upload_attachment/')
+        self.assertEqual(self.client.post('/summernote/upload_attachment/').status_code, 429)
+
+    def test_password_hashing_sheds_load_when_saturated(self):
+        slots = throttling.hash_slots()
+        slots.acquire()
+        try:
+            response = self.login("busy@example.com", "10.0.0.9")
+        finally:
+            slots.release()
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response['Retry-After'], '1')
+        self.assertEqual(throttling.rejection_counts()['login']['concurrency'], 1)
+        self.assertEqual(self.login("busy@example.com", "10.0.0.9").status_code, 400)
+
+    def test_rest_auth_routes_share_the_admission_control(self):
+        def rest_login(path, ip):
+            body = {'email': "victim@example.com", 'password': 'wrong'}
+            return self.client.post(path, body, content_type='application/json', REMOTE_ADDR=ip)
+
+        self.assertEqual(rest_login('/api/auth/login/', "10.0.0.1").status_code, 400)
+        self.assertEqual(self.login("victim@example.com", "10.0.0.2").status_code, 400)
+        self.assertEqual(rest_login('/api/auth/login', "10.0.0.3").status_code, 429)  # no slash, same bucket
+
+        slots = throttling.hash_slots()
+        slots.acquire()
+        try:
+            response = self.client.post('/api/auth/registration/', {}, content_type='application/json')
+        finally:
+            slots.release()
+        self.assertEqual(response.status_code, 503)
+
+
+class SeedingTests(TempMediaMixin, TestCase):
+    def test_same_seed_gives_the_same_data(self):
+        first = seeding.seed(users=2, articles=5, contacts=10, images=1, seed=7)
+        titles = [article.title for article in first['articles']]
+        Article.objects.all().delete()
+        second = seeding.seed(users=2, articles=5, contacts=10, images=1, seed=7)
+        self.assertEqual([article.title for article in second['articles']], titles)
+        self.assertEqual(len(second['contacts']), 10)
+
+        article = Article.objects.exclude(featured_image='').first()
+        self.assertTrue(default_storage.exists(article.featured_image.name))
+        self.assertTrue(CustomUser.objects.first().check_password(seeding.SEED_PASSWORD))
+        self.assertEqual(OutboxEmail.objects.count(), 0)
+
+    def test_benchmark_comparison_flags_regressions(self):
+        def run(p50, queries):
+            metrics = {'p50_ms': p50, 'p95_ms': 10, 'p99_ms': 10, 'peak_kib': 100, 'queries': queries}
+            return {'scenarios': {'article_list': metrics}}
+
+        self.assertEqual(regressions(run(10, 3), run(10.5, 3), 0.1), [])
+        self.assertEqual(regressions(run(10, 3), run(12, 3), 0.1), [('article_list', 'p50_ms', 10, 12)])
+        self.assertEqual(regressions(run(10, 3), run(5, 4), 0.1), [('article_list', 'queries', 3, 4)])
+
+
+@without_page_cache
+@override_settings(PERF_SERVER_TIMING=True)
+class InstrumentationTests(TestCase):
+    def setUp(self):
+        self.author = CustomUser.objects.create_user('timed@example.com', 'Ti', 'Med', 'pw')
+        self.article = Article.objects.create(author=self.author, title="Timed", keywords="Health", body="<p>x</p>")
+
+    def timings(self, response):
+        return dict(
+            (part.split(';')[0].strip(), part) for part in response['Server-Timing'].split(',')
+        )
+
+    def test_server_timing_reports_queries_and_template_time(self):
+        with CaptureQueriesContext(connection) as captured:
+            response = self.client.get(reverse('article_list'))
+        timings = self.timings(response)
+        self.assertIn(f'desc="{len(captured.captured_queries)} queries"', timings['db'])
+        self.assertNotIn('tpl;dur=0.0', timings['tpl'])
+        self.assertIn('total;dur=', timings['total'])
+
+    @override_settings(ROOT_URLCONF='website.asgi_urls')
+    async def test_async_views_are_measured(self):
+        response = await self.async_client.get(reverse('article_detail', args=[self.article.pk]))
+        self.assertNotIn('desc="0 queries"', self.timings(response)['db'])
+
+    @override_settings(PERF_SERVER_TIMING=False)
+    def test_header_is_only_sent_to_superusers_by_default(self):
+        self.assertNotIn('Server-Timing', self.client.get(reverse('article_list')))
+        self.client.force_login(self.author)
+        self.assertNotIn('Server-Timing', self.client.get(reverse('article_list')))
+        self.client.force_login(CustomUser.objects.create_superuser('timing@example.com', 'Ti', 'Ming', 'pw'))
+        self.assertIn('Server-Timing', self.client.get(reverse('article_list')))
+
+    def test_repeated_queries_are_flagged(self):
+        with instrumentation.track() as metrics:
+            for _ in range(5):
+                list(Article.objects.filter(pk=self.article.pk))
+            list(Keyword.objects.all())
+        self.assertEqual(list(metrics.duplicate_queries(threshold=5).values()), [5])
+        self.assertEqual(metrics.duplicate_queries(threshold=6), {})
+
+    def test_request_record_is_only_serialized_when_info_is_logged(self):
+        with mock.patch('impalawebsite.instrumentation.json.dumps') as dumps:
+            self.client.get(reverse('article_list'))
+        dumps.assert_not_called()
+        with self.assertLogs('impalawebsite.performance', 'INFO') as logs:
+            self.client.get(reverse('article_list'))
+        self.assertIn('"status": 200', logs.output[0])
+
+    @override_settings(PERF_SLOW_REQUEST_MS=0)
+    def test_slow_requests_are_logged_with_their_queries(self):
+        with self.assertLogs('impalawebsite.performance', 'WARNING') as logs:
+            self.client.get(reverse('article_list'))
+        self.assertIn(f"Slow request GET {reverse('article_list')}", logs.output[0])
+        self.assertIn('impalawebsite_article', logs.output[0])
+
+
+class ProfilingTests(TestCase):
+    def setUp(self):
+        caches['pages'].clear()
+        self.profile_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.profile_root, ignore_errors=True)
+        override = override_settings(PROFILE_ROOT=self.profile_root)
+        override.enable()
+        self.addCleanup(override.disable)
+        self.admin = CustomUser.objects.create_superuser('profiler@example.com', 'Pro', 'Filer', 'pw')
+        self.author = CustomUser.objects.create_user('plain@example.com', 'Pl', 'Ain', 'pw')
+        self.article = Article.objects.create(author=self.author, title="Profiled", body="<p>x</p>")
+        self.url = reverse('article_detail', args=[self.article.pk])
+
+    def test_only_superusers_are_profiled(self):
+        self.assertContains(self.client.get(self.url, {'profile': 'download'}), "Profiled")
+        self.client.force_login(self.author)
+        self.assertContains(self.client.get(self.url, headers={'x-profile': 'download'}), "Profiled")
+
+    def test_download_returns_pstats_data(self):
+        self.client.force_login(self.admin)
+        response = self.client.get(self.url, {'profile': '1'})
+        self.assertEqual(response['X-Profiled-Status'], '200')
+        self.assertIn('attachment;', response['Content-Disposition'])
+        report = profiling.stats_text(response.content)
+        self.assertIn('article_detail', report)
+
+    def test_stored_profiles_are_listed_and_downloadable(self):
+        self.client.force_login(self.admin)
+        response = self.client.get(self.url, headers={'x-profile': 'store'})
+        self.assertContains(response, "Profiled")
+
+        listing = self.client.get('/api/profiles/').json()
+        self.assertEqual([profile['name'] for profile in listing], [response['X-Profile']])
+        detail = f"/api/profiles/{response['X-Profile']}/"
+        self.assertEqual(self.client.get(detail).status_code, 200)
+        self.assertContains(self.client.get(detail, {'sort': 'tottime'}), 'function calls')
+        self.assertEqual(self.client.get(detail, {'sort': 'name'}).status_code, 400)
+        self.assertEqual(self.client.get('/api/profiles/missing.prof/').status_code, 404)
+
+        self.client.force_login(self.author)
+        self.assertEqual(self.client.get('/api/profiles/').status_code, 403)
+
+    @override_settings(ROOT_URLCONF='website.asgi_urls')
+    async def test_async_requests_can_be_profiled(self):
+        await self.async_client.aforce_login(self.admin)
+        response = await self.async_client.get(self.url, {'profile': 'download'})
+        self.assertIn('article_detail', profiling.stats_text(response.content))
+
+
+class StaticAssetTests(SimpleTestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.static_root = tempfile.mkdtemp()
+        cls.addClassCleanup(shutil.rmtree, cls.static_root, ignore_errors=True)
+        override = override_settings(STATIC_ROOT=cls.static_root)
+        override.enable()
+        cls.addClassCleanup(override.disable)
+        call_command('collectstatic', interactive=False, verbosity=0)
+        with open(f'{cls.static_root}/css/landing.css', 'rb') as source:
+            cls.landing_css = source.read()
+
+    def test_collected_files_are_hashed_and_compressed(self):
+        url = static('css/landing.css')
+        self.assertRegex(url, r'^/static/css/landing\.[0-9a-f]{12}\.css$')
+
+        response = self.client.get(url, headers={'accept-encoding': 'gzip, deflate'})
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(response['Content-Type'], 'text/css')
+        self.assertEqual(response['Cache-Control'], 'public, max-age=31536000, immutable')
+        self.assertEqual(response['Vary'], 'Accept-Encoding')
+        self.assertEqual(gzip.decompress(b''.join(response.streaming_content)), self.landing_css)
+
+    def test_identity_when_compression_is_not_accepted(self):
+        for accept in ('', 'gzip;q=0, identity'):
+            with self.subTest(accept=accept):
+                response = self.client.get(static('css/landing.css'), headers={'accept-encoding': accept})
+                self.assertFalse(response.has_header('Content-Encoding'))
+                self.assertEqual(b''.join(response.streaming_content), self.landing_css)
+
+    def test_brotli_is_preferred_when_present(self):
+        url = static('css/footer.css')
+        with open(f'{self.static_root}{url[len("/static"):]}.br', 'wb') as variant:
+            variant.write(b'brotli bytes')
+        response = self.client.get(url, headers={'accept-encoding': 'gzip, br'})
+        self.assertEqual(response['Content-Encoding'], 'br')
+        self.assertEqual(b''.join(response.streaming_content), b'brotli bytes')
+        self.assertEqual(accepted_encodings('br;q=0, *'), {'*', 'br', 'gzip'})
+
+    def test_unhashed_names_are_revalidated(self):
+        response = self.client.get('/static/css/landing.css')
+        self.assertEqual(response['Cache-Control'], 'public, max-age=0, must-revalidate')
+        revalidated = self.client.get(
+            '/static/css/landing.css', headers={'if-modified-since': response['Last-Modified']}
+        )
+        self.assertEqual(revalidated.status_code, 304)
+        self.assertEqual(self.client.get('/static/css/missing.css').status_code, 404)
+
+
+# A cache all workers share; a LocMemCache would be bypassed (caching.shared_cache).
+SHARED_SESSIONS_CACHE = {
+    'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+    'LOCATION': str(Path(tempfile.gettempdir()) / 'impala-auth-tests'),
+}
+
+
+@override_settings(CACHES={
+    'default': DUMMY_CACHE, 'pages': DUMMY_CACHE, 'template_fragments': DUMMY_CACHE, 'sessions': SHARED_SESSIONS_CACHE,
+})
+class AuthCacheTests(TestCase):
+    url = '/api/articles/?fields=id'
+
+    def setUp(self):
+        caches['sessions'].clear()
+        self.user = CustomUser.objects.create_user('cached@example.com', 'Ca', 'Ched', 'old-password')
+
+    def count_queries(self, call):
+        queries = []
+        with connection.execute_wrapper(lambda execute, sql, *args: queries.append(sql) or execute(sql, *args)):
+            result = call()
+        return result, queries
+
+    def auth_queries(self, client):
+        # /api/articles/?fields=id runs two queries of its own.
+        client.get(self.url)
+        response, queries = self.count_queries(lambda: client.get(self.url))
+        self.assertEqual(response.status_code, 200)
+        return len(queries) - 2
+
+    def test_session_user_is_cached_until_the_password_changes(self):
+        self.client.force_login(self.user)
+        self.assertEqual(self.auth_queries(self.client), 0)
+        self.assertIn('private', self.client.get(self.url)['Cache-Control'])
+
+        self.user.set_password('new-password')
+        self.user.save()
+        self.assertNotIn('private', self.client.get(self.url)['Cache-Control'])  # signed out
+
+    def test_token_lookup_is_cached_until_the_token_is_deleted(self):
+        token = Token.objects.create(user=self.user)
+        client = self.client_class(headers={'authorization': f'Token {token.key}'})
+        self.assertEqual(self.auth_queries(client), 0)
+        token.delete()
+        self.assertEqual(client.get(self.url).status_code, 403)  # rejected; 403 as SessionAuthentication comes first
+
+    def test_basic_auth_skips_the_hasher_until_the_password_changes(self):
+        credentials = base64.b64encode(b'cached@example.com:old-password').decode()
+        client = self.client_class(headers={'authorization': f'Basic {credentials}'})
+        self.assertEqual(client.get(self.url).status_code, 200)
+        with mock.patch('django.contrib.auth.hashers.PBKDF2PasswordHasher.verify') as verify:
+            self.assertEqual(self.auth_queries(client), 0)
+        verify.assert_not_called()
+
+        self.user.set_password('new-password')
+        self.user.save()
+        self.assertEqual(client.get(self.url).status_code, 403)  # rejected; 403 as SessionAuthentication comes first
+
+    @override_settings(CACHES={
+        'default': DUMMY_CACHE, 'pages': DUMMY_CACHE, 'template_fragments': DUMMY_CACHE,
+        'sessions': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'auth-tests'},
+    })
+    def test_per_process_cache_is_not_used_for_auth_state(self):
+        self.client.force_login(self.user)
+        self.assertGreater(self.auth_queries(self.client), 0)  # session and user read from the database
+        self.assertEqual(caches['sessions'].get(f'auth:user:{self.user.pk}'), None)
+
+        # A logout handled by another worker (one that shares only the database) takes effect here.
+        SessionStore(self.client.session.session_key).delete()
+        self.assertNotIn('private', self.client.get(self.url)['Cache-Control'])
+
+    def test_unchanged_sessions_are_not_written(self):
+        session = SessionStore()
+        session['cart'] = [1, 2]
+        session.save()
+
+        loaded = SessionStore(session.session_key)
+        loaded['cart'] = [1, 2]
+        self.assertTrue(loaded.modified)
+        _, queries = self.count_queries(loaded.save)
+        self.assertEqual(queries, [])
+
+        loaded['cart'].append(3)
+        _, queries = self.count_queries(loaded.save)
+        self.assertNotEqual(queries, [])
+        self.assertEqual(SessionStore(session.session_key)['cart'], [1, 2, 3])
+
+
+@without_page_cache
+@override_settings(ARTICLES_PER_PAGE=2)
+class PrerenderTests(TestCase):
+    def setUp(self):
+        self.root = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.root, ignore_errors=True)
+        override = override_settings(PRERENDER_ROOT=self.root)
+        override.enable()
+        self.addCleanup(override.disable)
+        self.author = CustomUser.objects.create_user('static@example.com', 'Sta', 'Tic', 'pw')
+        with override_settings(PRERENDER_ON_SAVE=False):
+            self.articles = [
+                Article.objects.create(author=self.author, title=f"Static {i}", body=f"<p>body {i}</p>") for i in range(5)
+            ]
+        self.build = prerender.prerender_all()
+
+    def test_full_build_writes_every_page_once(self):
+        newest = self.articles[-1]
+        html = (self.root / f'{newest.pk}/index.html').read_text()
+        self.assertIn("Static 4", html)
+        self.assertIn(f'value="{caching.CSRF_PLACEHOLDER}"', html)
+        detail = json.loads((self.root / f'api/articles/{newest.pk}/index.json').read_text())
+        self.assertEqual(detail['title'], "Static 4")
+        self.assertEqual(json.loads((self.root / 'api/articles/index.json').read_text())['results'][0]['id'], newest.pk)
+        self.assertEqual([len(self.build.cursors[kind]) for kind in prerender.KINDS], [3, 3])
+
+        manifest = json.loads((self.root / 'manifest.json').read_text())
+        self.assertEqual(len(manifest['files']), 5 * 2 + 3 * 2)
+        again = prerender.prerender_all()
+        self.assertEqual((again.written, again.unchanged, again.removed), ([], 16, []))
+
+    def test_edit_rerenders_only_the_article_and_its_list_page(self):
+        article = self.articles[2]  # middle of the second page
+        article.title = "Renamed"
+        article.save()
+        self.assertEqual(PendingPrerender.objects.count(), 1)
+        self.assertNotIn("Renamed", (self.root / f'{article.pk}/index.html').read_text())  # queued, not rendered
+
+        prerender.prerender_pending()
+        build = prerender.Build()
+        self.assertIn("Renamed", (self.root / f'{article.pk}/index.html').read_text())
+        self.assertFalse(PendingPrerender.objects.exists())
+        changed = {name for name, digest in build.files.items() if digest != self.build.files[name]}
+        self.assertEqual(changed, {
+            prerender.detail_path('html', article.pk), prerender.detail_path('json', article.pk),
+            prerender.list_path('html', self.build.cursors['html'][1]),
+            prerender.list_path('json', self.build.cursors['json'][1]),
+        })
+
+    def test_new_and_deleted_articles_shift_the_list_pages(self):
+        added = Article.objects.create(author=self.author, title="Fresh", body="<p>new</p>")
+        self.assertFalse((self.root / f'{added.pk}/index.html').exists())
+        call_command('prerender', pending=True, stdout=io.StringIO())
+        build = prerender.Build()
+        self.assertTrue((self.root / f'{added.pk}/index.html').exists())
+        self.assertIn("Fresh", (self.root / 'list-articles/index.html').read_text())
+        self.assertEqual(len(build.cursors['html']), 3)
+
+        added.delete()
+        self.articles[0].delete()
+        prerender.prerender_pending()
+        build = prerender.Build()
+        self.assertFalse((self.root / f'{added.pk}/index.html').exists())
+        self.assertEqual([len(build.cursors[kind]) for kind in prerender.KINDS], [2, 2])
+        # The page that fell off the end is gone from disk and from the manifest.
+        on_disk = {str(path.relative_to(self.root)) for path in self.root.rglob('*.*')} - {prerender.MANIFEST}
+        self.assertEqual(on_disk, set(build.files))
+
+    def test_updates_that_skip_signals_are_queued_too(self):
+        article = self.articles[2]
+        Article.objects.filter(pk=article.pk).update(body="<p>Backfilled body</p>")
+        render_in_batches(Article.objects.filter(pk=article.pk))
+        imported = create_articles([{'title': "Imported", 'body': "<p>bulk</p>"}], self.author, notify=False)
+        self.assertEqual(PendingPrerender.objects.count(), 2)
+
+        prerender.prerender_pending()
+        self.assertIn("Backfilled body", (self.root / f'{article.pk}/index.html').read_text())
+        self.assertTrue((self.root / f'{imported[0].pk}/index.html').exists())
+        self.assertIn("Imported", (self.root / 'list-articles/index.html').read_text())
+
+
+class FeedTests(TestCase):
+    def setUp(self):
+        caches['pages'].clear()
+        self.author = CustomUser.objects.create_user('feeds@example.com', 'Fee', 'Ds', 'pw')
+        self.articles = [
+            Article.objects.create(
+                author=self.author, title=f"Feed {i}", body=f"<p>Lede {i}.</p>{'<p>Filler text.</p>' * 50}<p>Coda {i}</p>"
+            )
+            for i in range(5)
+        ]
+
+    def fetch(self, url, **headers):
+        queries = []
+        with connection.execute_wrapper(lambda execute, sql, *args: queries.append(sql) or execute(sql, *args)):
+            response = self.client.get(url, headers=headers)
+        return response, queries
+
+    def test_feeds_list_the_newest_articles_without_reading_bodies(self):
+        for url, content_type, root in (('/feeds/rss/', 'application/rss+xml', '<rss'), ('/feeds/atom/', 'application/atom+xml', '<feed')):
+            with self.subTest(url), override_settings(FEED_ITEMS=3):
+                response, queries = self.fetch(url)
+                self.assertEqual(response.status_code, 200)
+                self.assertTrue(response['Content-Type'].startswith(content_type))
+                content = response.content.decode()
+                self.assertIn(root, content)
+                self.assertEqual(re.findall(r'<title>(Feed \d)</title>', content), ["Feed 4", "Feed 3", "Feed 2"])
+                self.assertIn("Lede 4.", content)
+                self.assertNotIn("Coda", content)  # past the excerpt
+                self.assertIn(f"http://127.0.0.1:8000/{self.articles[4].pk}/", content)
+                self.assertIn(f"http://127.0.0.1:8000{url}", content)
+                self.assertNotIn("/api/", content)
+                self.assertFalse([sql for sql in queries if '"body' in sql])
+                self.assertNotIn('Set-Cookie', response.headers)
+
+    def test_article_list_links_the_canonical_feeds(self):
+        content = self.client.get('/list-articles/').content.decode()
+        self.assertIn('type="application/atom+xml" title="Impala articles (Atom)" href="/feeds/atom/"', content)
+        self.assertIn('type="application/rss+xml" title="Impala articles (RSS)" href="/feeds/rss/"', content)
+        self.assertIn(f'href="/{self.articles[4].pk}/"', content)
+
+    def test_feed_is_cached_until_an_article_changes_and_supports_conditional_get(self):
+        url = '/feeds/atom/'
+        first, _ = self.fetch(url)
+        self.assertEqual(first['X-Page-Cache'], 'miss')
+        second, queries = self.fetch(url)
+        self.assertEqual((second['X-Page-Cache'], second.content), ('hit', first.content))
+        self.assertFalse([sql for sql in queries if 'impalawebsite_article"."title' in sql])
+
+        unchanged, _ = self.fetch(url, if_none_match=first['ETag'])
+        self.assertEqual(unchanged.status_code, 304)
+        self.assertEqual(self.fetch(url, if_modified_since=first['Last-Modified'])[0].status_code, 304)
+
+        self.articles[0].title = "Retitled"
+        self.articles[0].save()
+        changed, _ = self.fetch(url, if_none_match=first['ETag'])
+        self.assertEqual((changed.status_code, changed['X-Page-Cache']), (200, 'miss'))
+        self.assertIn("Retitled", changed.content.decode())
+
+    def test_sitemap_lists_articles_with_lastmod(self):
+        response, queries = self.fetch('/sitemap.xml')
+        self.assertEqual(response.status_code, 200)
+        content = response.content.decode()
+        self.assertIn('<urlset', content)
+        self.assertEqual(content.count('<url>'), 5 + len(feeds.STATIC_PAGES))
+        self.assertIn("<loc>http://127.0.0.1:8000/</loc>", content)
+        self.assertIn("<loc>http://127.0.0.1:8000/list-articles/</loc>", content)
+        article = self.articles[2]
+        self.assertIn(
+            f"<loc>http://127.0.0.1:8000/{article.pk}/</loc><lastmod>{article.updated_at.isoformat()}</lastmod>", content
+        )
+        self.assertNotIn("/api/", content)
+        self.assertFalse([sql for sql in queries if '"body' in sql or '"title' in sql])
+
+    @override_settings(SITEMAP_LIMIT=4)
+    def test_large_sitemap_is_split_into_an_index_of_sections(self):
+        index = self.client.get('/sitemap.xml').content.decode()
+        self.assertIn('<sitemapindex', index)
+        sections = re.findall(r'<loc>http://127\.0\.0\.1:8000/sitemap-(\d+)\.xml</loc>', index)
+        self.assertEqual(sections, ['1', '2', '3'])
+        self.assertIn(f"<lastmod>{self.articles[4].updated_at.isoformat()}</lastmod>", index)
+
+        counts = [
+            self.client.get(f'/sitemap-{n}.xml').content.decode().count('<url>') for n in sections
+        ]
+        self.assertEqual(counts, [4, 2, 1])  # the first section also lists the static pages
+        self.assertEqual(self.client.get('/sitemap-4.xml').status_code, 404)
+
+
+@override_settings(NEWSLETTER_DIGEST_HOURS=24)
+class DigestTests(TestCase):
+    def setUp(self):
+        self.author = CustomUser.objects.create_superuser('digest@example.com', 'Di', 'Gest', 'pw')
+        Subscriber.objects.bulk_create([
+            Subscriber(name="Now", email="now@example.com"),
+            *[Subscriber(name=f"Dig {i}", email=f"dig{i}@example.com", delivery=Subscriber.Delivery.DIGEST)
+              for i in range(3)],
+            Subscriber(name="Gone", email="gone@example.com", delivery=Subscriber.Delivery.DIGEST, is_active=False),
+        ])
+        self.period = newsletter.period_start(timezone.now())
+
+    def publish(self, count):
+        articles = [Article.objects.create(author=self.author, title=f"Story {i}", body="<p>x</p>") for i in range(count)]
+        # Inside self.period even if the test runs across a period boundary.
+        Article.objects.filter(pk__in=[article.pk for article in articles]).update(created_at=self.period)
+        return articles
+
+    def digest_emails(self):
+        return OutboxEmail.objects.filter(recipient__startswith='dig').order_by('recipient')
+
+    def test_digest_subscribers_get_one_email_per_period(self):
+        self.publish(3)
+        self.assertEqual(list(OutboxEmail.objects.values_list('recipient', flat=True)), ["now@example.com"] * 3)
+        self.assertIn("/digest/", OutboxEmail.objects.first().body)
+
+        [digest] = newsletter.send_due_digests(now=self.period + timedelta(days=1, hours=1))
+        emails = self.digest_emails()
+        self.assertEqual([email.recipient for email in emails], [f"dig{i}@example.com" for i in range(3)])
+        self.assertEqual(emails[0].subject, "3 new articles from Impala Health Tech Research Limited")
+        self.assertIn("- Story 2: ", emails[0].body)
+        self.assertIn("/immediate/", emails[0].body)
+        self.assertEqual(
+            (digest.period_start, digest.articles, digest.emails_queued, digest.emails_avoided),
+            (self.period, 3, 3, 3 * 2),
+        )
+        self.assertEqual(newsletter.send_due_digests(now=self.period + timedelta(days=1, hours=2)), [])
+        self.assertEqual(self.digest_emails().count(), 3)
+
+    @override_settings(NEWSLETTER_DIGEST_BATCH_SIZE=1)
+    def test_interrupted_run_resumes_without_duplicates(self):
+        self.publish(2)
+        calls = []
+
+        def crash_on_second_batch(messages):
+            calls.append(messages)
+            if len(calls) == 2:
+                raise RuntimeError("worker killed")
+            return enqueue_emails(messages)
+
+        with mock.patch('impalawebsite.newsletter.enqueue_emails', crash_on_second_batch), \
+                self.assertRaises(RuntimeError):
+            newsletter.send_due_digests(now=self.period + timedelta(days=1))
+        digest = NewsletterDigest.objects.get()
+        self.assertEqual((digest.status, digest.emails_queued), (NewsletterDigest.Status.PENDING, 1))
+        self.assertEqual(self.digest_emails().count(), 1)
+
+        call_command('send_digest', now=(self.period + timedelta(days=1, hours=3)).isoformat(), stdout=io.StringIO())
+        digest.refresh_from_db()
+        self.assertEqual((digest.status, digest.emails_queued, digest.emails_avoided), ('done', 3, 3))
+        self.assertEqual([email.recipient for email in self.digest_emails()], [f"dig{i}@example.com" for i in range(3)])
+
+    def test_missed_periods_fold_into_the_next_digest(self):
+        newsletter.send_due_digests(now=self.period + timedelta(days=1))  # nothing published yet
+        [late] = self.publish(1)
+        Article.objects.filter(pk=late.pk).update(created_at=self.period + timedelta(days=2))
+
+        [digest] = newsletter.send_due_digests(now=self.period + timedelta(days=4))
+        self.assertEqual((digest.period_start, digest.period_end), (self.period + timedelta(days=1), self.period + timedelta(days=4)))
+        self.assertEqual((digest.articles, digest.emails_queued, digest.emails_avoided), (1, 3, 0))
+        self.assertEqual(self.digest_emails().first().subject, "New Article: Story 0")
+
+    def test_preference_links_and_stats(self):
+        subscriber = Subscriber.objects.get(email="now@example.com")
+        token = make_unsubscribe_token(subscriber)
+        self.assertContains(self.client.get(reverse('newsletter_digest', args=[token])), "one digest")
+        subscriber.refresh_from_db()
+        self.assertEqual(subscriber.delivery, Subscriber.Delivery.DIGEST)
+        self.client.get(reverse('newsletter_immediate', args=[token]))
+        subscriber.refresh_from_db()
+        self.assertEqual(subscriber.delivery, Subscriber.Delivery.IMMEDIATE)
+        self.assertEqual(self.client.get(reverse('newsletter_digest', args=["forged:1"])).status_code, 400)
+
+        self.publish(4)
+        newsletter.send_due_digests(now=self.period + timedelta(days=1))
+        self.client.force_login(self.author)
+        stats = self.client.get(reverse('newsletter_stats')).json()
+        self.assertEqual(
+            (stats['digests'], stats['emails_queued'], stats['emails_avoided'], stats['subscribers']),
+            (1, 3, 9, {'immediate': 1, 'digest': 3}),
+        )
@@ -0,0 +1,177 @@
+import json
+import threading
+import time
+from dataclasses import dataclass
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import caches
+from django.http import HttpResponse, JsonResponse
+
+SCOPES = ('signup', 'login', 'contact', 'upload')
+_PERIODS = {'s': 1, 'sec': 1, 'min': 60, 'm': 60, 'h': 3600, 'hour': 3600, 'd': 86400, 'day': 86400}
+
+
+@dataclass(frozen=True)
+class Rate:
+    capacity: int
+    per_second: float
+
+    @classmethod
+    def parse(cls, value):
+        """``"5/min"``: a bucket of 5 tokens that refills at 5 tokens per minute."""
+        count, period = value.split('/')
+        return cls(capacity=int(count), per_second=int(count) / _PERIODS[period])
+
+
+def throttle_cache():
+    return caches[getattr(settings, 'THROTTLE_CACHE_ALIAS', 'default')]
+
+
+def configured_rates(scope):
+    """``{'ip': Rate, 'account': Rate}`` for ``scope``; missing keys are not throttled."""
+    rates = getattr(settings, 'THROTTLE_RATES', {}).get(scope, {})
+    return {kind: Rate.parse(value) for kind, value in rates.items() if value}
+
+
+def take_token(key, rate, now=None):
+    """
+    Spend one token from the bucket at ``key``; returns 0 when admitted, otherwise
+    the seconds until a token is available.
+
+    The read-modify-write is not atomic across processes, so a burst racing on
+    the same key can slip one or two extra requests through; that is fine for
+    load shedding.
+    """
+    cache = throttle_cache()
+    now = time.time() if now is None else now
+    tokens, stamp = cache.get(key, (rate.capacity, now))
+    tokens = min(rate.capacity, tokens + (now - stamp) * rate.per_second)
+    timeout = int(rate.capacity / rate.per_second) + 1
+    if tokens >= 1:
+        cache.set(key, (tokens - 1, now), timeout)
+        return 0
+    cache.set(key, (tokens, now), timeout)
+    return (1 - tokens) / rate.per_second
+
+
+def record_rejection(scope, reason):
+    cache = throttle_cache()
+    key = f'throttle:rejected:{scope}:{reason}'
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, 1, None)
+
+
+def rejection_counts():
+    """``{scope: {'rate': n, 'concurrency': n}}`` for the monitoring endpoint."""
+    keys = [f'throttle:rejected:{scope}:{reason}' for scope in SCOPES for reason in ('rate', 'concurrency')]
+    values = throttle_cache().get_many(keys)
+    return {
+        scope: {reason: values.get(f'throttle:rejected:{scope}:{reason}', 0) for reason in ('rate', 'concurrency')}
+        for scope in SCOPES
+    }
+
+
+def client_ip(request):
+    """REMOTE_ADDR, or the address THROTTLE_TRUSTED_PROXIES hops back in X-Forwarded-For."""
+    proxies = getattr(settings, 'THROTTLE_TRUSTED_PROXIES', 0)
+    forwarded = request.META.get('HTTP_X_FORWARDED_FOR')
+    if proxies and forwarded:
+        hops = [hop.strip() for hop in forwarded.split(',') if hop.strip()]
+        if hops:
+            return hops[-min(proxies, len(hops))]
+    return request.META.get('REMOTE_ADDR', '')
+
+
+def submitted_email(request):
+    """The account a login/signup attempt targets, from form data or a JSON body."""
+    if request.content_type == 'application/json':
+        try:
+            data = json.loads(request.body or b'{}')
+        except ValueError:
+            data = {}
+        if not isinstance(data, dict):
+            data = {}
+    else:
+        data = request.POST
+    value = data.get('email') or data.get('username')
+    return value.strip().lower() if isinstance(value, str) and value.strip() else None
+
+
+def authenticated_user(request):
+    return str(request.user.pk) if request.user.is_authenticated else None
+
+
+def _reject(request, status, message, retry_after):
+    retry_after = max(1, int(retry_after + 0.999))
+    if request.path.startswith('/api/') or request.content_type == 'application/json':
+        response = JsonResponse({"error": message}, status=status)
+    else:
+        response = HttpResponse(message, status=status, content_type='text/plain; charset=utf-8')
+    response['Retry-After'] = str(retry_after)
+    return response
+
+
+def throttle(scope, account=None, methods=('POST',)):
+    """
+    Token-bucket throttle per client IP and, when ``account(request)`` returns an
+    identifier, per account. Rates come from ``THROTTLE_RATES[scope]``.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if request.method not in methods:
+                return view(request, *args, **kwargs)
+            rates = configured_rates(scope)
+            buckets = []
+            if 'ip' in rates:
+                buckets.append((f'throttle:{scope}:ip:{client_ip(request)}', rates['ip']))
+            identifier = account(request) if account and 'account' in rates else None
+            if identifier:
+                buckets.append((f'throttle:{scope}:account:{identifier}', rates['account']))
+            for key, rate in buckets:
+                wait = take_token(key, rate)
+                if wait:
+                    record_rejection(scope, 'rate')
+                    return _reject(request, 429, "Too many requests, please slow down.", wait)
+            return view(request, *args, **kwargs)
+        return wrapper
+    return decorator
+
+
+_slots = {}
+_slots_lock = threading.Lock()
+
+
+def hash_slots():
+    """Per-process semaphore bounding concurrent password hashing (PASSWORD_HASH_CONCURRENCY)."""
+    limit = getattr(settings, 'PASSWORD_HASH_CONCURRENCY', 4)
+    with _slots_lock:
+        if limit not in _slots:
+            _slots[limit] = threading.BoundedSemaphore(limit)
+        return _slots[limit]
+
+
+def limit_password_hashing(scope):
+    """
+    Admit at most PASSWORD_HASH_CONCURRENCY POSTs at once into views that run a
+    full password hash; others wait up to PASSWORD_HASH_QUEUE_SECONDS and are then
+    shed with 503 so article reads keep their workers.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if request.method != 'POST':
+                return view(request, *args, **kwargs)
+            slots = hash_slots()
+            if not slots.acquire(timeout=getattr(settings, 'PASSWORD_HASH_QUEUE_SECONDS', 0.5)):
+                record_rejection(scope, 'concurrency')
+                return _reject(request, 503, "Server busy, please retry shortly.", 1)
+            try:
+                return view(request, *args, **kwargs)
+            finally:
+                slots.release()
+        return wrapper
+    return decorator
@@ -1,7 +1,7 @@
 from django.urls import path, include
 from . import views
 from rest_framework.routers import DefaultRouter
-from .views import ArticleViewSet, ContactMessageViewSet
+from .views import ArticleViewSet, ContactMessageViewSet, KeywordViewSet
 
 
 
@@ -9,6 +9,7 @@ from .views import ArticleViewSet, ContactMessageViewSet
 router = DefaultRouter()
 router.register(r'articles', ArticleViewSet)
 router.register(r'contacts', ContactMessageViewSet)
+router.register(r'keywords', KeywordViewSet)
 
 
 
@@ -28,11 +29,25 @@ urlpatterns = [
     path('logout/', views.logout_view, name='logout'),
     path('test/', views.test_editor, name='test'),
     path("unsubscribe/<str:token>/", views.unsubscribe, name="unsubscribe"),
+    path("newsletter/<str:token>/digest/", views.newsletter_delivery, {"delivery": "digest"}, name="newsletter_digest"),
+    path(
+        "newsletter/<str:token>/immediate/", views.newsletter_delivery, {"delivery": "immediate"},
+        name="newsletter_immediate",
+    ),
+    path('feeds/rss/', views.article_feed, {'kind': 'rss'}, name='feed_rss'),
+    path('feeds/atom/', views.article_feed, {'kind': 'atom'}, name='feed_atom'),
+    path('sitemap.xml', views.sitemap, name='sitemap'),
+    path('sitemap-<int:section>.xml', views.sitemap, name='sitemap_section'),
     path('api/', include(router.urls)),
     
     path("api/signup/", views.signup_api, name="signup_api"),
     path("api/login/", views.login_api, name="login_api"),
     path("api/logout/", views.logout_api, name="logout_api"),
     path("api/csrf/", views.csrf, name="api_csrf"), 
+    path("api/cache-stats/", views.cache_stats, name="cache_stats"),
+    path("api/throttle-stats/", views.throttle_stats, name="throttle_stats"),
+    path("api/newsletter-stats/", views.newsletter_stats, name="newsletter_stats"),
+    path("api/profiles/", views.profile_list, name="profile_list"),
+    path("api/profiles/<str:name>/", views.profile_detail, name="profile_detail"),
     
 ]
\ No newline at end of file
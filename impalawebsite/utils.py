@@ -1,8 +1,8 @@
 from django.core.signing import Signer
 signer = Signer()
 
-def make_unsubscribe_token(contact):
-    return signer.sign(contact.pk)
+def make_unsubscribe_token(subscriber):
+    return signer.sign(f"subscriber:{subscriber.pk}")
 
 def verify_unsubscribe_token(token):
-    return signer.unsign(token)  # returns the contact's pk or raises BadSignature
+    return signer.unsign(token)  # "subscriber:<pk>" (bare contact pk for old links) or raises BadSignature
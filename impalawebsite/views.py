@@ -1,13 +1,17 @@
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib import messages
-from django.http import JsonResponse, HttpResponseForbidden, HttpResponse
+from django.http import Http404, JsonResponse, HttpResponseForbidden, HttpResponse, StreamingHttpResponse
 from django.views.decorators.csrf import ensure_csrf_cookie, csrf_exempt
 from django.middleware.csrf import get_token
 from django.contrib.auth import login, authenticate, logout
 from django.contrib.auth.decorators import login_required
 from django.db import IntegrityError
+from django.utils import timezone
+from django.utils.decorators import method_decorator
 from rest_framework import viewsets
-from rest_framework.decorators import api_view, permission_classes
+from rest_framework.decorators import action, api_view, permission_classes
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
 from rest_framework.permissions import AllowAny, IsAuthenticatedOrReadOnly
 
 from .forms import (
@@ -16,9 +20,26 @@ from .forms import (
     CustomUserCreationForm,
     CustomAuthenticationForm,
 )
-from .models import Article, ContactMessage
-from .utils import verify_unsubscribe_token
-from .serializers import ArticleSerializer, ContactMessageSerializer
+from . import feeds
+from .bulk import BulkPayloadError, create_articles, create_contacts, validate_rows
+from .caching import cached_page, stats as page_cache_stats, with_page_versions
+from .conditional import article_validators, collection_validators, conditional_response
+from .exports import FORMATS as EXPORT_FORMATS, contact_queryset, filters_from_params as export_filters
+from .models import Article, ContactMessage, Keyword
+from .permissions import IsSuperUser
+from .profiling import SORT_KEYS as PROFILE_SORT_KEYS, profile_storage, stats_text, stored_profiles
+from .newsletter import digest_stats
+from .subscribers import set_delivery, subscriber_from_token, unsubscribe as unsubscribe_subscriber
+from .throttling import limit_password_hashing, rejection_counts, submitted_email, throttle
+from .serializers import (
+    ArticleListSerializer,
+    ArticleSerializer,
+    ArticleSearchResultSerializer,
+    ContactMessageSerializer,
+    KeywordSerializer,
+)
+from .pagination import ArticleCursorPagination, keyset_page
+from .search import search_articles
 from django.core.signing import BadSignature
 from django.contrib.auth import get_user_model
 
@@ -39,6 +60,8 @@ def csrf(request):
 # =====================================================
 # 👤 SIGNUP API (React frontend)
 # =====================================================
+@throttle('signup')
+@limit_password_hashing('signup')
 @csrf_exempt
 @api_view(["POST"])
 @permission_classes([AllowAny])
@@ -65,6 +88,8 @@ def signup_api(request):
 # =====================================================
 # 🔓 LOGIN API (React frontend)
 # =====================================================
+@throttle('login', account=submitted_email)
+@limit_password_hashing('login')
 @csrf_exempt
 @api_view(["POST"])
 @permission_classes([AllowAny])
@@ -88,18 +113,203 @@ def logout_api(request):
     return JsonResponse({"message": "Logged out successfully"}, status=200)
 
 
+@api_view(["GET"])
+@permission_classes([IsSuperUser])
+def cache_stats(request):
+    """Hit/miss counters of the page cache, per cached view."""
+    return Response(page_cache_stats())
+
+
+@api_view(["GET"])
+@permission_classes([IsSuperUser])
+def throttle_stats(request):
+    """Requests rejected by the throttles (429) and the password-hashing limiter (503)."""
+    return Response(rejection_counts())
+
+
+@api_view(["GET"])
+@permission_classes([IsSuperUser])
+def newsletter_stats(request):
+    """Digests sent, emails they replaced, and subscribers per delivery preference."""
+    return Response(digest_stats())
+
+
+@api_view(["GET"])
+@permission_classes([IsSuperUser])
+def profile_list(request):
+    """Profiles recorded with ?profile=store, newest first."""
+    return Response([
+        {**profile, 'url': request.build_absolute_uri(f"{profile['name']}/")} for profile in stored_profiles()
+    ])
+
+
+@api_view(["GET"])
+@permission_classes([IsSuperUser])
+def profile_detail(request, name):
+    """The .prof file, or with ?sort=cumulative|tottime|ncalls a text report of the top functions."""
+    storage = profile_storage()
+    if not name.endswith('.prof') or not storage.exists(name):
+        raise Http404
+    with storage.open(name) as source:
+        data = source.read()
+    sort = request.query_params.get('sort')
+    if sort is not None:
+        if sort not in PROFILE_SORT_KEYS:
+            return Response({"error": f"sort must be one of: {', '.join(PROFILE_SORT_KEYS)}"}, status=400)
+        return HttpResponse(stats_text(data, sort), content_type='text/plain; charset=utf-8')
+    response = HttpResponse(data, content_type='application/octet-stream')
+    response['Content-Disposition'] = f'attachment; filename="{name}"'
+    return response
+
+
+def _flag(request, name, default):
+    value = request.query_params.get(name)
+    return default if value is None else value.lower() in ('1', 'true', 'yes')
+
+
+def _bulk_create(request, serializer_class, create):
+    """
+    Shared body of the ``bulk`` actions: POST a JSON list, get per-row results.
+
+    ``?skip_invalid=true`` inserts the valid rows and reports the rest instead of
+    rejecting the whole batch; ``?notify=false`` skips the aggregated bulk signal.
+    """
+    try:
+        valid, errors = validate_rows(
+            serializer_class, request.data, {'request': request}, _flag(request, 'skip_invalid', False)
+        )
+    except BulkPayloadError as exc:
+        return Response({"error": str(exc)}, status=400)
+    if errors and not valid:
+        return Response({"created": [], "errors": errors}, status=400)
+
+    indexes = [index for index, _ in valid]
+    objects = create([data for _, data in valid], notify=_flag(request, 'notify', True))
+    created = [{"index": index, "id": obj.pk} for index, obj in zip(indexes, objects)]
+    return Response({"created": created, "errors": errors}, status=201)
+
+
+def _filter_by_keyword(queryset, request):
+    keyword = request.GET.get('keyword', '').strip()
+    return queryset.tagged(keyword) if keyword else queryset
+
+
+def _article_cards(request):
+    # Cards only need title, excerpt, cover, author and dates; never load the bodies here.
+    queryset = Article.objects.select_related('author', 'cover_renditions').defer('body', 'body_html').with_keywords()
+    return _filter_by_keyword(queryset, request)
+
+
+# (etag, last_modified) validators shared with the async views in async_views.py.
+def _api_list_validators(request):
+    return collection_validators(request, _filter_by_keyword(Article.objects.all(), request), 'api')
+
+
+def _api_detail_validators(request, pk):
+    return article_validators(request, pk, 'api')
+
+
+def _html_list_validators(request):
+    return collection_validators(request, _filter_by_keyword(Article.objects.all(), request), 'html', per_user=True)
+
+
+def _html_detail_validators(request, pk):
+    return article_validators(request, pk, 'html', per_user=True)
+
+
+def _feed_validators(request, **kwargs):
+    return collection_validators(request, Article.objects.all(), 'feed')
+
+
 # =====================================================
 # 📰 ARTICLE VIEWSET
 # =====================================================
 class ArticleViewSet(viewsets.ModelViewSet):
     """API endpoint for managing articles."""
-    queryset = Article.objects.all().order_by('-created_at')
+    queryset = Article.objects.select_related('author', 'cover_renditions').order_by('-created_at', '-pk')
     serializer_class = ArticleSerializer
     permission_classes = [IsAuthenticatedOrReadOnly]
+    pagination_class = ArticleCursorPagination
+
+    def get_serializer_class(self):
+        return ArticleListSerializer if self.action == 'list' else super().get_serializer_class()
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        fields = self.get_serializer_class().requested_fields(self.request)
+        # ?fields= / ?omit= narrow the SELECT, not just the JSON.
+        queryset = self.get_serializer_class().load_only(queryset, fields)
+        if 'keyword_list' in fields:
+            queryset = queryset.with_keywords()
+        return _filter_by_keyword(queryset, self.request)
 
     def perform_create(self, serializer):
         serializer.save(author=self.request.user)
 
+    @method_decorator(conditional_response(_api_list_validators))
+    def list(self, request, *args, **kwargs):
+        return super().list(request, *args, **kwargs)
+
+    @method_decorator(conditional_response(_api_detail_validators))
+    def retrieve(self, request, *args, **kwargs):
+        return super().retrieve(request, *args, **kwargs)
+
+    @action(detail=False, methods=['post'])
+    def bulk(self, request):
+        """Create many articles in one transaction: POST /api/articles/bulk/ with a JSON list."""
+        return _bulk_create(
+            request, ArticleSerializer, lambda rows, notify: create_articles(rows, request.user, notify=notify)
+        )
+
+    @action(detail=False, methods=['get'])
+    def search(self, request):
+        """Full-text search ranked by bm25: /api/articles/search/?q=malaria&page=2"""
+        query = request.query_params.get('q', '').strip()
+        page_size = self.paginator.get_page_size(request)
+        try:
+            page = max(1, int(request.query_params.get('page', 1)))
+        except ValueError:
+            page = 1
+
+        hits = search_articles(query, limit=page_size + 1, offset=(page - 1) * page_size)
+        has_next = len(hits) > page_size
+        hits = hits[:page_size]
+
+        articles = (
+            Article.objects.select_related('author', 'cover_renditions').defer('body', 'body_html')
+            .in_bulk([hit['id'] for hit in hits])
+        )
+        results = []
+        for hit in hits:
+            article = articles.get(hit['id'])
+            if article is not None:
+                article.search_hit = hit
+                results.append(article)
+
+        url = request.build_absolute_uri()
+        previous_url = None
+        if page == 2:
+            previous_url = remove_query_param(url, 'page')
+        elif page > 2:
+            previous_url = replace_query_param(url, 'page', page - 1)
+        serializer = ArticleSearchResultSerializer(results, many=True, context={'request': request})
+        return Response({
+            'query': query,
+            'next': replace_query_param(url, 'page', page + 1) if has_next else None,
+            'previous': previous_url,
+            'results': serializer.data,
+        })
+
+
+# =====================================================
+# 🏷️ KEYWORD VIEWSET
+# =====================================================
+class KeywordViewSet(viewsets.ReadOnlyModelViewSet):
+    """Keywords with their (incrementally maintained) article counts."""
+    queryset = Keyword.objects.filter(article_count__gt=0).order_by('-article_count', 'name')
+    serializer_class = KeywordSerializer
+    lookup_field = 'slug'
+
 
 # =====================================================
 # ✉️ CONTACT MESSAGE VIEWSET
@@ -108,14 +318,62 @@ class ContactMessageViewSet(viewsets.ModelViewSet):
     queryset = ContactMessage.objects.all()
     serializer_class = ContactMessageSerializer
 
+    @method_decorator(throttle('contact'))  # same bucket as contact_view; this is what the frontend posts to
+    def create(self, request, *args, **kwargs):
+        return super().create(request, *args, **kwargs)
+
+    @action(detail=False, methods=['post'], permission_classes=[IsSuperUser])
+    def bulk(self, request):
+        """Import many contacts in one transaction: POST /api/contacts/bulk/ with a JSON list."""
+        return _bulk_create(request, ContactMessageSerializer, create_contacts)
+
+    @action(detail=False, methods=['get'], permission_classes=[IsSuperUser])
+    def export(self, request):
+        """Stream contacts: /api/contacts/export/?type=ndjson&since=2025-01-01&until=2025-07-01&consent=true"""
+        export_type = request.query_params.get('type', 'csv')
+        if export_type not in EXPORT_FORMATS:
+            return Response({"error": f"type must be one of: {', '.join(EXPORT_FORMATS)}"}, status=400)
+        try:
+            filters = export_filters(request.query_params)
+        except ValueError as exc:
+            return Response({"error": str(exc)}, status=400)
+
+        generate, content_type, extension = EXPORT_FORMATS[export_type]
+        response = StreamingHttpResponse(generate(contact_queryset(**filters)), content_type=content_type)
+        filename = f"contacts-{timezone.now():%Y%m%d-%H%M%S}.{extension}"
+        response['Content-Disposition'] = f'attachment; filename="{filename}"'
+        return response
+
 
 # =====================================================
 # 🌍 BASIC PAGE VIEWS
 # =====================================================
+@cached_page('home')
 def home(request):
     return render(request, 'landing/landing.html')
 
 
+# =====================================================
+# 📡 FEEDS & SITEMAP (built in feeds.py)
+# =====================================================
+@conditional_response(_feed_validators)
+@cached_page('feeds')
+def article_feed(request, kind):
+    response = HttpResponse(content_type=feeds.FEED_TYPES[kind].content_type)
+    feeds.build_feed(kind, response)
+    return response
+
+
+@conditional_response(_feed_validators)
+@cached_page('sitemap')
+def sitemap(request, section=None):
+    response = HttpResponse(content_type='application/xml; charset=utf-8')
+    if not feeds.build_sitemap(response, section):
+        raise Http404("No such sitemap section.")
+    return response
+
+
+@throttle('contact')
 def contact_view(request):
     if request.method == 'POST':
         form = ContactForm(request.POST)
@@ -130,14 +388,27 @@ def contact_view(request):
 
 def unsubscribe(request, token):
     try:
-        pk = verify_unsubscribe_token(token)
+        subscriber = subscriber_from_token(token)
+    except BadSignature:
+        return HttpResponse("Invalid or expired link.", status=400)
+
+    if subscriber is None:
+        raise Http404("Unknown subscriber.")
+    unsubscribe_subscriber(subscriber)
+    return render(request, "contact/unsubscribed.html", {"subscriber": subscriber})
+
+
+def newsletter_delivery(request, token, delivery):
+    """Switch between one email per article and the periodic digest (links in every newsletter)."""
+    try:
+        subscriber = subscriber_from_token(token)
     except BadSignature:
         return HttpResponse("Invalid or expired link.", status=400)
 
-    contact = get_object_or_404(ContactMessage, pk=pk)
-    contact.consent_email_updates = False
-    contact.save(update_fields=["consent_email_updates"])
-    return render(request, "contact/unsubscribed.html", {"contact": contact})
+    if subscriber is None:
+        raise Http404("Unknown subscriber.")
+    set_delivery(subscriber, delivery)
+    return render(request, "contact/delivery_changed.html", {"subscriber": subscriber})
 
 
 # =====================================================
@@ -159,13 +430,23 @@ def article_create(request):
     return render(request, 'articles/article_form.html', {'form': form})
 
 
+@conditional_response(_html_list_validators)
+@cached_page('article_list')
 def article_list(request):
-    articles = Article.objects.all().order_by('-created_at')
-    return render(request, 'articles/article_list.html', {'articles': articles})
-
-
+    keyword = request.GET.get('keyword', '').strip()
+    articles, next_cursor = keyset_page(_article_cards(request), request.GET.get('cursor'))
+    return render(request, 'articles/article_list.html', {
+        'articles': with_page_versions(articles),
+        'keyword': keyword,
+        'next_cursor': next_cursor,
+        'is_first_page': not request.GET.get('cursor'),
+    })
+
+
+@conditional_response(_html_detail_validators)
+@cached_page('article_detail')
 def article_detail(request, pk):
-    article = get_object_or_404(Article, pk=pk)
+    article = get_object_or_404(Article.objects.select_related('author', 'cover_renditions'), pk=pk)
     return render(request, 'articles/article_detail.html', {'article': article})
 
 
@@ -202,6 +483,8 @@ def article_delete(request, pk):
 # =====================================================
 # 👤 TEMPLATE-BASED AUTH (HTML FORMS)
 # =====================================================
+@throttle('signup')
+@limit_password_hashing('signup')
 def signup_view(request):
     if request.method == 'POST':
         form = CustomUserCreationForm(request.POST)
@@ -216,6 +499,8 @@ def signup_view(request):
     return render(request, 'accounts/signup.html', {'form': form})
 
 
+@throttle('login', account=submitted_email)
+@limit_password_hashing('login')
 def login_view(request):
     if request.method == 'POST':
         form = CustomAuthenticationForm(request, data=request.POST)
@@ -3,6 +3,22 @@ ASGI config for website project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
 
+Under ASGI the article pages and the read-only article API are served by the
+async views in ``impalawebsite.async_views`` (via ``website.asgi_urls``); forms
+and writes keep running on the synchronous views. Serve it locally with an
+ASGI server, e.g.::
+
+    pip install "uvicorn[standard]"
+    uvicorn website.asgi:application --host 127.0.0.1 --port 8000 --workers 2
+
+    # or
+    pip install daphne
+    daphne -b 127.0.0.1 -p 8000 website.asgi:application
+
+Static and media files are not served by the ASGI application; run
+``collectstatic`` and put them behind the web server as with WSGI.
+``python manage.py bench_asgi`` compares this path with the WSGI one.
+
 For more information on this file, see
 https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
 """
@@ -12,5 +28,7 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'website.settings')
+os.environ.setdefault('DJANGO_ROOT_URLCONF', 'website.asgi_urls')
+os.environ.setdefault('DJANGO_ASGI', '1')  # persistent DB connections off, see DATABASES in settings.py
 
 application = get_asgi_application()
@@ -0,0 +1,14 @@
+"""
+URL configuration used under ASGI (see ``website/asgi.py``).
+
+Article reads resolve to the async views in ``impalawebsite.async_views``; every
+other route falls through to the regular ``website.urls``.
+"""
+from django.urls import include, path
+
+from .urls import urlpatterns as wsgi_urlpatterns
+
+urlpatterns = [
+    path('', include('impalawebsite.async_urls')),
+    path('api/', include('impalawebsite.async_urls')),
+] + wsgi_urlpatterns
@@ -1,3 +1,4 @@
+import os
 from pathlib import Path
 
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -39,23 +40,30 @@ SITE_ID = 1
 # MIDDLEWARE — CORS must come before CommonMiddleware
 # ---------------------------------------------------------------------
 MIDDLEWARE = [
+    "impalawebsite.instrumentation.PerformanceMiddleware",  # first, so its timings cover the rest
     "django.middleware.security.SecurityMiddleware",
+    "impalawebsite.static_assets.StaticFilesMiddleware",  # serves STATIC_ROOT before sessions etc. run
     "django.contrib.sessions.middleware.SessionMiddleware",
     "corsheaders.middleware.CorsMiddleware",  # 👈 must come before CommonMiddleware
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
     "django.contrib.auth.middleware.AuthenticationMiddleware",
+    "impalawebsite.profiling.ProfilingMiddleware",  # needs request.user
     "allauth.account.middleware.AccountMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
 ]
 
-ROOT_URLCONF = "website.urls"
+# website/asgi.py switches to website.asgi_urls, which routes article reads to async views.
+ROOT_URLCONF = os.environ.get("DJANGO_ROOT_URLCONF", "website.urls")
 
 TEMPLATES = [
     {
-        "BACKEND": "django.template.backends.django.DjangoTemplates",
-        "DIRS": [BASE_DIR / "Templates"],
+        # DjangoTemplates plus render timing for the Server-Timing header.
+        "BACKEND": "impalawebsite.instrumentation.TimedDjangoTemplates",
+        # The app keeps its templates in "Templates/", which APP_DIRS only
+        # finds on case-insensitive filesystems.
+        "DIRS": [BASE_DIR / "Templates", BASE_DIR / "impalawebsite" / "Templates"],
         "APP_DIRS": True,
         "OPTIONS": {
             "context_processors": [
@@ -72,13 +80,45 @@ WSGI_APPLICATION = "website.wsgi.application"
 # ---------------------------------------------------------------------
 # DATABASE
 # ---------------------------------------------------------------------
+# Connections are kept for DB_CONN_MAX_AGE seconds and pinged before reuse.
+# Not under ASGI (website/asgi.py sets DJANGO_ASGI): each async request runs
+# its queries on its own thread, so a kept connection is never reused and
+# leaks instead. There the default is 0; leave DB_CONN_MAX_AGE unset.
+# IMMEDIATE transactions take the write lock up front, so concurrent writers
+# queue on the busy timeout instead of failing with "database is locked".
 DATABASES = {
     "default": {
         "ENGINE": "django.db.backends.sqlite3",
         "NAME": BASE_DIR / "db.sqlite3",
+        "CONN_MAX_AGE": int(os.environ.get("DB_CONN_MAX_AGE", 0 if os.environ.get("DJANGO_ASGI") else 60)),
+        "CONN_HEALTH_CHECKS": True,
+        "OPTIONS": {"transaction_mode": "IMMEDIATE", "timeout": 20},
     }
 }
 
+# DATABASE_REPLICA_PATH: a copy of db.sqlite3 kept current outside Django
+# (Litestream, LiteFS, rsync of a snapshot). Reads are routed to it by
+# impalawebsite.routers.ReadReplicaRouter; tests mirror it onto "default".
+if os.environ.get("DATABASE_REPLICA_PATH"):
+    DATABASES["replica"] = {
+        **DATABASES["default"],
+        "NAME": os.environ["DATABASE_REPLICA_PATH"],
+        "TEST": {"MIRROR": "default"},
+    }
+DATABASE_READ_REPLICA = "replica" if "replica" in DATABASES else None
+DATABASE_ROUTERS = ["impalawebsite.routers.ReadReplicaRouter"]
+
+# Applied to every new SQLite connection (impalawebsite.db). WAL lets readers
+# run while a write is in progress; NORMAL only syncs at checkpoints, which is
+# still safe against corruption in WAL mode.
+SQLITE_PRAGMAS = {
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",
+    "mmap_size": 256 * 1024 * 1024,
+    "cache_size": -64 * 1024,  # negative: KiB, so 64 MiB per connection
+    "temp_store": "MEMORY",
+}
+
 # ---------------------------------------------------------------------
 # AUTHENTICATION
 # ---------------------------------------------------------------------
@@ -92,6 +132,17 @@ AUTH_PASSWORD_VALIDATORS = [
 ]
 
 AUTH_USER_MODEL = "impalawebsite.CustomUser"
+# Sessions, users, tokens and verified Basic-auth credentials are cached in
+# the "sessions" cache (see impalawebsite/sessions.py and authentication.py),
+# so a signed-in request on a warm cache runs no auth queries. That cache must
+# be shared by all workers (PAGE_CACHE_BACKEND=file or redis); with the
+# per-process locmem default nothing is cached and every request reads the
+# database, as the stock backends do.
+AUTHENTICATION_BACKENDS = ["impalawebsite.authentication.CachedModelBackend"]
+SESSION_ENGINE = "impalawebsite.sessions"
+SESSION_CACHE_ALIAS = "sessions"
+AUTH_CACHE_ALIAS = "sessions"
+AUTH_CACHE_TIMEOUT = 300  # seconds; also bounds staleness after QuerySet.update() on users
 LOGIN_REDIRECT_URL = "/"
 LOGOUT_REDIRECT_URL = "/login/"
 
@@ -113,9 +164,22 @@ USE_TZ = True
 # STATIC & MEDIA FILES
 # ---------------------------------------------------------------------
 STATIC_URL = "static/"
+# `collectstatic` writes content-hashed copies of every asset plus .gz (and,
+# with the Brotli package installed, .br) variants here; StaticFilesMiddleware
+# serves them with far-future Cache-Control. Until it has run, {% static %}
+# falls back to the unhashed names.
+STATIC_ROOT = BASE_DIR / "staticfiles"
+STORAGES = {
+    "default": {"BACKEND": "django.core.files.storage.FileSystemStorage"},
+    "staticfiles": {"BACKEND": "impalawebsite.static_assets.CompressedManifestStaticFilesStorage"},
+}
 MEDIA_URL = "/media/"
 MEDIA_ROOT = BASE_DIR / "media"
 
+# Responsive renditions written by `python manage.py process_images`
+IMAGE_RENDITION_WIDTHS = [320, 640, 960, 1280]
+IMAGE_RENDITION_QUALITY = 80
+
 # ---------------------------------------------------------------------
 # EMAIL CONFIGURATION
 # ---------------------------------------------------------------------
@@ -128,20 +192,138 @@ EMAIL_HOST_USER = "testug.email@gmail.com"
 EMAIL_HOST_PASSWORD = "bryx rytb vumr tesa"
 DEFAULT_FROM_EMAIL = "Newsletter <no-reply@impalahealthtech.com>"
 
+# Newsletter emails are queued in the OutboxEmail table and delivered by
+# `python manage.py send_outbox` (run it from cron or with --loop).
+OUTBOX_WORKERS = 4  # parallel SMTP connections, each reused for a whole run
+OUTBOX_BATCH_SIZE = 100
+OUTBOX_MAX_ATTEMPTS = 5
+OUTBOX_RETRY_BASE_SECONDS = 60  # doubled after every failed attempt
+
+# Subscribers with delivery="digest" get one email per period listing the
+# articles published in it, queued by `python manage.py send_digest` (run it
+# from cron at least once per period, before send_outbox).
+NEWSLETTER_DIGEST_HOURS = 24
+NEWSLETTER_DIGEST_BATCH_SIZE = 500  # subscribers queued per transaction
+
 # ---------------------------------------------------------------------
 # REST FRAMEWORK CONFIG
 # ---------------------------------------------------------------------
 REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": [
         "rest_framework.authentication.SessionAuthentication",
-        "rest_framework.authentication.BasicAuthentication",
-        "rest_framework.authentication.TokenAuthentication",
+        "impalawebsite.authentication.CachedBasicAuthentication",
+        "impalawebsite.authentication.CachedTokenAuthentication",
     ],
     "DEFAULT_PERMISSION_CLASSES": [
         "rest_framework.permissions.AllowAny",
     ],
 }
 
+ARTICLES_PER_PAGE = 12  # page size for /list-articles/ and /api/articles/
+
+# POST /api/articles/bulk/ and /api/contacts/bulk/
+BULK_CREATE_MAX_ROWS = 5000  # per request
+BULK_CREATE_BATCH_SIZE = 500  # rows per INSERT
+
+# ---------------------------------------------------------------------
+# CACHING
+# ---------------------------------------------------------------------
+# Rendered article pages and card fragments live in the "pages" cache and are
+# invalidated by the Article signals. PAGE_CACHE_BACKEND picks the store:
+# "locmem" (single process), "file" (shared by workers on one host) or "redis".
+_PAGE_CACHE_BACKENDS = {
+    "locmem": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "impala-pages",
+    },
+    "file": {
+        "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+        "LOCATION": BASE_DIR / ".cache" / "pages",
+    },
+    "redis": {
+        "BACKEND": "django.core.cache.backends.redis.RedisCache",
+        "LOCATION": os.environ.get("REDIS_URL", "redis://127.0.0.1:6379/1"),
+    },
+}
+PAGE_CACHE = _PAGE_CACHE_BACKENDS[os.environ.get("PAGE_CACHE_BACKEND", "locmem")]
+
+CACHES = {
+    "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"},
+    "pages": PAGE_CACHE,
+    "template_fragments": PAGE_CACHE,  # used by {% cache %}
+    "throttle": {**PAGE_CACHE, "KEY_PREFIX": "throttle"},
+    # Shared by all workers (unless PAGE_CACHE_BACKEND is locmem), as sessions require.
+    "sessions": {**PAGE_CACHE, "KEY_PREFIX": "sessions"},
+}
+PAGE_CACHE_TIMEOUT = 60 * 60  # seconds; invalidation normally happens long before this
+
+# Cache-Control for article pages and API responses (public/private is added per
+# request). no-cache lets browsers and proxies keep a copy but revalidate it with
+# the ETag / Last-Modified validators, which costs one indexed query.
+ARTICLE_CACHE_CONTROL = {"no_cache": True}
+
+# /feeds/rss/, /feeds/atom/ and /sitemap.xml are cached like the article list.
+# Past SITEMAP_LIMIT URLs (the protocol maximum is 50,000) the sitemap is split
+# into /sitemap-<n>.xml files listed by a sitemap index.
+FEED_ITEMS = 20
+SITEMAP_LIMIT = 50_000
+
+# ---------------------------------------------------------------------
+# THROTTLING & ADMISSION CONTROL
+# ---------------------------------------------------------------------
+# Token buckets: "N/period" allows bursts of N and refills N per period.
+# "ip" is per client address, "account" per submitted email / signed-in user.
+THROTTLE_CACHE_ALIAS = "throttle"
+THROTTLE_RATES = {
+    "signup": {"ip": "5/h"},
+    "login": {"ip": "20/min", "account": "5/min"},
+    "contact": {"ip": "5/min"},
+    "upload": {"ip": "30/min", "account": "100/h"},
+}
+THROTTLE_TRUSTED_PROXIES = 0  # set to 1 behind a single reverse proxy to use X-Forwarded-For
+
+# Every login/signup runs a full PBKDF2 hash; at most this many run at once per
+# process, others wait PASSWORD_HASH_QUEUE_SECONDS and then get a 503.
+PASSWORD_HASH_CONCURRENCY = 2
+PASSWORD_HASH_QUEUE_SECONDS = 0.5
+
+# ---------------------------------------------------------------------
+# PERFORMANCE INSTRUMENTATION
+# ---------------------------------------------------------------------
+# PerformanceMiddleware reports query count, DB, template and total time per
+# request in a Server-Timing header and on the "impalawebsite.performance"
+# logger: one INFO line per request, WARNINGs for slow requests (with their
+# slowest queries) and for repeated identical SQL (N+1).
+# The header goes to superusers only; True adds it to every response (local profiling).
+PERF_SERVER_TIMING = False
+PERF_SLOW_REQUEST_MS = 1000  # a login alone spends ~0.5s hashing the password
+PERF_N_PLUS_ONE_THRESHOLD = 5  # identical statements in one request
+
+# Static copies of the public article pages and API JSON (see
+# impalawebsite/prerender.py for the layout). With PRERENDER_ON_SAVE, article
+# saves/deletes only queue their pages; run `python manage.py prerender
+# --pending` from cron (e.g. every minute) to render them. `python manage.py
+# prerender` rebuilds everything.
+PRERENDER_ROOT = BASE_DIR / "prerendered"
+PRERENDER_ON_SAVE = True
+
+# Superusers can profile any request with ?profile=download (returns a .prof
+# file) or ?profile=store (kept in PROFILE_ROOT, listed at /api/profiles/).
+PROFILE_ROOT = BASE_DIR / ".profiles"
+
+LOGGING = {
+    "version": 1,
+    "disable_existing_loggers": False,
+    "handlers": {"console": {"class": "logging.StreamHandler"}},
+    "loggers": {
+        # PERF_LOG_LEVEL=INFO logs every request.
+        "impalawebsite.performance": {
+            "handlers": ["console"],
+            "level": os.environ.get("PERF_LOG_LEVEL", "WARNING"),
+        },
+    },
+}
+
 # ---------------------------------------------------------------------
 # CORS & CSRF CONFIG
 # ---------------------------------------------------------------------
@@ -170,6 +352,8 @@ CSRF_TRUSTED_ORIGINS = [
 # ---------------------------------------------------------------------
 SUMMERNOTE_CONFIG = {
     "attachment_require_authentication": False,
+    # One physical file per unique upload; see impalawebsite/storage.py
+    "attachment_storage_class": "impalawebsite.storage.ContentAddressedStorage",
     "summernote": {"width": "100%"},
     "iframe": True,
 }
@@ -17,14 +17,43 @@ Including another URLconf
 from django.contrib import admin
 from django.conf import settings
 from django.conf.urls.static import static
-from django.urls import include, path
+from django.urls import include, path, re_path
+from dj_rest_auth.registration.views import RegisterView
+from dj_rest_auth.views import LoginView, PasswordChangeView, PasswordResetConfirmView
+from django_summernote.views import SummernoteUploadAttachment
+
+from impalawebsite.throttling import authenticated_user, limit_password_hashing, submitted_email, throttle
+
+
+def admitted(scope, view, account=None):
+    """``view`` behind the same throttle and password-hashing limit as login_api/signup_api."""
+    return throttle(scope, account=account)(limit_password_hashing(scope)(view))
 
 
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('', include('impalawebsite.urls')),
+    # Throttled copy of Summernote's upload route; matched before the include below.
+    path(
+        'summernote/upload_attachment/',
+        throttle('upload', account=authenticated_user)(SummernoteUploadAttachment.as_view()),
+        name='django_summernote-upload_attachment',
+    ),
     path('summernote/', include('django_summernote.urls')),  # Summernote upload URLs
-    path('api/', include('impalawebsite.urls')),  # your existing routes
+    # The same routes again under api/; namespaced so reverse() and {% url %} give the canonical paths above.
+    path('api/', include(('impalawebsite.urls', 'impalawebsite'), namespace='api')),  # your existing routes
+    # dj_rest_auth views that run a password hash, admitted like login_api/signup_api;
+    # same optional-slash patterns as the includes below, which they shadow.
+    re_path(r'^api/auth/login/?$', admitted('login', LoginView.as_view(), submitted_email), name='rest_login'),
+    re_path(
+        r'^api/auth/password/change/?$', admitted('login', PasswordChangeView.as_view(), authenticated_user),
+        name='rest_password_change',
+    ),
+    re_path(
+        r'^api/auth/password/reset/confirm/?$', admitted('login', PasswordResetConfirmView.as_view()),
+        name='rest_password_reset_confirm',
+    ),
+    re_path(r'^api/auth/registration/?$', admitted('signup', RegisterView.as_view()), name='rest_register'),
     path('api/auth/', include('dj_rest_auth.urls')),  # login/logout
     path('api/auth/registration/', include('dj_rest_auth.registration.urls')), 
 ]